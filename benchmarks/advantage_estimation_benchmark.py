@@ -0,0 +1,121 @@
+# python3
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the sequential and the associative scan GAE.
+
+The sequential path mirrors the trainer step without stacked agents: one
+vmapped rlax GAE call per agent. The associative scan path computes all
+agents in one stacked call.
+
+Run with:
+    python -m benchmarks.advantage_estimation_benchmark
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Tuple
+
+import jax
+import jax.numpy as jnp
+from absl import app, flags
+
+from mava.components.training.advantage_estimation import GAE, GAEConfig
+from mava.systems.trainer import Trainer
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("batch_size", 32, "Number of sequences per agent.")
+flags.DEFINE_integer("num_agents", 4, "Number of agents.")
+flags.DEFINE_multi_integer(
+    "sequence_lengths", [32, 128, 512, 2048], "Sequence lengths to benchmark."
+)
+flags.DEFINE_integer("num_iterations", 100, "Number of timed calls.")
+
+
+def make_gae_fn(use_associative_scan: bool) -> Callable:
+    """Create the gae_fn of a GAE component."""
+    trainer = Trainer(store=SimpleNamespace())
+    gae = GAE(config=GAEConfig(use_associative_scan=use_associative_scan))
+    gae.on_training_utility_fns(trainer=trainer)
+    return trainer.store.gae_fn
+
+
+def make_agent_data(
+    sequence_length: int,
+) -> Tuple[Dict[str, jnp.ndarray], Dict[str, jnp.ndarray], Dict[str, jnp.ndarray]]:
+    """Create random rewards, discounts and values for every agent."""
+    shape = (FLAGS.batch_size, sequence_length)
+    rewards, discounts, values = {}, {}, {}
+    key = jax.random.PRNGKey(0)
+    for agent_id in range(FLAGS.num_agents):
+        key, reward_key, value_key = jax.random.split(key, 3)
+        agent = f"agent_{agent_id}"
+        rewards[agent] = jax.random.normal(reward_key, shape)
+        discounts[agent] = jnp.full(shape, 0.99)
+        values[agent] = jax.random.normal(value_key, shape)
+    return rewards, discounts, values
+
+
+def time_fn(fn: Callable, *args: Any) -> float:
+    """Return the mean time in milliseconds of a compiled call."""
+    jax.block_until_ready(fn(*args))
+    start_time = time.perf_counter()
+    for _ in range(FLAGS.num_iterations):
+        jax.block_until_ready(fn(*args))
+    return 1000 * (time.perf_counter() - start_time) / FLAGS.num_iterations
+
+
+def main(_: Any) -> None:
+    """Time both GAE implementations for every sequence length."""
+    sequential_gae_fn = jax.vmap(make_gae_fn(use_associative_scan=False))
+    associative_gae_fn = jax.vmap(make_gae_fn(use_associative_scan=True))
+
+    @jax.jit
+    def sequential_gae(
+        rewards: Dict[str, jnp.ndarray],
+        discounts: Dict[str, jnp.ndarray],
+        values: Dict[str, jnp.ndarray],
+    ) -> Dict[str, Tuple[jnp.ndarray, jnp.ndarray]]:
+        """One GAE call per agent."""
+        return {
+            agent: sequential_gae_fn(rewards[agent], discounts[agent], values[agent])
+            for agent in rewards
+        }
+
+    @jax.jit
+    def associative_gae(
+        rewards: Dict[str, jnp.ndarray],
+        discounts: Dict[str, jnp.ndarray],
+        values: Dict[str, jnp.ndarray],
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """One GAE call over the stacked agents."""
+        return associative_gae_fn(
+            *[
+                jnp.stack(list(agent_data.values()), axis=-1)
+                for agent_data in [rewards, discounts, values]
+            ]
+        )
+
+    print(f"{'sequence_length':>16} {'sequential_ms':>14} {'associative_ms':>15}")
+    for sequence_length in FLAGS.sequence_lengths:
+        agent_data = make_agent_data(sequence_length)
+        sequential_time = time_fn(sequential_gae, *agent_data)
+        associative_time = time_fn(associative_gae, *agent_data)
+        print(
+            f"{sequence_length:>16} {sequential_time:>14.3f} {associative_time:>15.3f}"
+        )
+
+
+if __name__ == "__main__":
+    app.run(main)
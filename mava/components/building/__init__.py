@@ -21,12 +21,20 @@ from mava.components.building.adders import (
     UniformAdderPriority,
 )
 from mava.components.building.best_checkpointer import BestCheckpointer
+from mava.components.building.compilation_cache import CompilationCache
 from mava.components.building.data_server import OnPolicyDataServer
-from mava.components.building.datasets import TrajectoryDataset, TransitionDataset
+from mava.components.building.datasets import (
+    DevicePrefetch,
+    TrajectoryDataset,
+    TransitionDataset,
+)
 from mava.components.building.distributor import Distributor
 from mava.components.building.environments import (
     EnvironmentSpec,
     ParallelExecutorEnvironmentLoop,
+    PipelinedExecutorEnvironmentLoop,
+    SharedMemoryExecutorEnvironmentLoop,
+    VectorisedExecutorEnvironmentLoop,
 )
 from mava.components.building.extras_spec import ExtrasSpec
 from mava.components.building.loggers import Logger
@@ -36,8 +44,10 @@ from mava.components.building.parameter_client import (
     ExecutorParameterClient,
     TrainerParameterClient,
 )
+from mava.components.building.profiler import Profiler
 from mava.components.building.system_init import (
     CustomSamplingSystemInit,
     FixedNetworkSystemInit,
     RandomSamplingSystemInit,
 )
+from mava.components.building.warmup import CompilationWarmup
@@ -0,0 +1,130 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent compilation cache component for system builders"""
+
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Type
+
+from absl import logging
+from jax.experimental.compilation_cache import compilation_cache
+
+from mava.callbacks import Callback
+from mava.components import Component
+from mava.core_jax import SystemBuilder
+
+# JAX holds a single persistent compilation cache per process, so the nodes
+# running in the same process must share its directory.
+_cache_dir: Optional[str] = None
+
+
+def initialise_compilation_cache(cache_dir: str) -> None:
+    """Initialise the persistent compilation cache of this process once.
+
+    Args:
+        cache_dir: directory of the cache.
+
+    Raises:
+        ValueError: if the cache of this process uses another directory.
+
+    Returns:
+        None.
+    """
+    global _cache_dir
+    if compilation_cache.is_initialized():
+        if _cache_dir == cache_dir:
+            return
+        raise ValueError(
+            "The compilation cache of this process is already initialised in "
+            f"{_cache_dir or 'another directory'}, so it cannot also use "
+            f"{cache_dir}. Nodes running in the same process must use the same "
+            "compilation_cache_dir."
+        )
+    os.makedirs(cache_dir, exist_ok=True)
+    compilation_cache.initialize_cache(cache_dir)
+    _cache_dir = cache_dir
+    logging.info(f"Initialised the persistent compilation cache in {cache_dir}.")
+
+
+@dataclass
+class CompilationCacheConfig:
+    compilation_cache_dir: Optional[str] = None
+
+
+class CompilationCache(Component):
+    def __init__(
+        self,
+        config: CompilationCacheConfig = CompilationCacheConfig(),
+    ):
+        """Component sets up a persistent compilation cache shared by all nodes.
+
+        The executors and trainers load the functions compiled by other nodes,
+        or by a previous run, from disk instead of compiling them again. The
+        cache is stored in compilation_cache_dir, or in a compilation_cache
+        directory under the experiment path if it is not set. Nodes running in
+        the same process share its cache, so they must use the same directory.
+
+        Args:
+            config: CompilationCacheConfig.
+        """
+        self.config = config
+
+    def _initialise_cache(self, builder: SystemBuilder) -> None:
+        """Initialise the cache of this process."""
+        cache_dir = self.config.compilation_cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                builder.store.global_config.experiment_path, "compilation_cache"
+            )
+        initialise_compilation_cache(os.path.abspath(os.path.expanduser(cache_dir)))
+
+    def on_building_executor_start(self, builder: SystemBuilder) -> None:
+        """Initialise the compilation cache for an executor.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        self._initialise_cache(builder)
+
+    def on_building_trainer_start(self, builder: SystemBuilder) -> None:
+        """Initialise the compilation cache for a trainer.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        self._initialise_cache(builder)
+
+    @staticmethod
+    def name() -> str:
+        """Static method that returns component name."""
+        return "compilation_cache"
+
+    @staticmethod
+    def required_components() -> List[Type[Callback]]:
+        """List of other Components required for this Component to function.
+
+        None required.
+
+        Returns:
+            List of required component classes.
+        """
+        return []
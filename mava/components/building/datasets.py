@@ -15,9 +15,13 @@
 
 """Commonly used dataset components for system builders"""
 import abc
+import queue
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Callable, List, Optional, Type
+from typing import Any, Callable, Iterator, List, Optional, Type
 
+import jax
 import reverb
 from acme import datasets
 
@@ -60,7 +64,7 @@ class TrainerDataset(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         None required.
 
@@ -114,6 +118,8 @@ class TransitionDataset(TrainerDataset):
             postprocess=self.config.postprocess,
         )
 
+        # Sample specs used to compile the trainer before sampling.
+        builder.store.dataset_element_spec = dataset.element_spec
         builder.store.dataset_iterator = iter(dataset)
 
 
@@ -167,4 +173,129 @@ class TrajectoryDataset(TrainerDataset):
         # Add batch dimension.
         dataset = dataset.batch(self.config.epoch_batch_size, drop_remainder=True)
 
+        # Sample specs used to compile the trainer before sampling.
+        builder.store.dataset_element_spec = dataset.element_spec
         builder.store.dataset_iterator = dataset.as_numpy_iterator()
+
+
+class DevicePrefetchIterator:
+    def __init__(
+        self,
+        iterator: Iterator[Any],
+        buffer_size: int,
+        device: Optional[Any] = None,
+    ):
+        """Iterator that moves samples to a device from a background thread.
+
+        A daemon thread pulls up to buffer_size samples ahead of the consumer
+        and calls jax.device_put on each of them. Errors raised by the wrapped
+        iterator are re-raised on the consumer side.
+
+        Args:
+            iterator: iterator of host samples, e.g. a reverb dataset.
+            buffer_size: number of device samples to keep ready.
+            device: device to put the samples on. Uses the default device
+                if None.
+        """
+        if buffer_size < 1:
+            raise ValueError(
+                f"The prefetch buffer size must be positive, got {buffer_size}."
+            )
+        self._iterator = iterator
+        self.device = device
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self._end = object()
+        self._error: Optional[Exception] = None
+        self.wait_time = 0.0
+
+        self._thread = threading.Thread(target=self._producer, daemon=True)
+        self._thread.start()
+
+    def _producer(self) -> None:
+        """Fill the queue with device samples until the iterator ends."""
+        try:
+            for sample in self._iterator:
+                self._queue.put(jax.device_put(sample, self.device))
+        except Exception as e:
+            self._error = e
+        self._queue.put(self._end)
+
+    def __iter__(self) -> "DevicePrefetchIterator":
+        """Return the iterator itself."""
+        return self
+
+    def __next__(self) -> Any:
+        """Return the next device sample.
+
+        The time spent blocking on the queue is stored in wait_time.
+
+        Returns:
+            Next sample, placed on the device.
+        """
+        start_time = time.time()
+        sample = self._queue.get()
+        self.wait_time = time.time() - start_time
+
+        if sample is self._end:
+            # Leave the sentinel for any later call.
+            self._queue.put(self._end)
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return sample
+
+
+@dataclass
+class DevicePrefetchConfig:
+    prefetch_buffer_size: int = 2
+    log_data_wait_time: bool = True
+
+
+class DevicePrefetch(Component):
+    def __init__(
+        self,
+        config: DevicePrefetchConfig = DevicePrefetchConfig(),
+    ):
+        """Component prefetches trainer samples onto the device.
+
+        Wraps the trainer dataset iterator in a DevicePrefetchIterator so
+        reverb sampling and the host to device transfer overlap with the
+        trainer step. With log_data_wait_time the trainer step logs the time
+        it spent waiting on the next sample as data_wait_time.
+
+        Args:
+            config: DevicePrefetchConfig.
+        """
+        self.config = config
+
+    def on_building_trainer_end(self, builder: SystemBuilder) -> None:
+        """Wrap the dataset iterator in a device prefetching iterator.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        builder.store.dataset_iterator = DevicePrefetchIterator(
+            iterator=builder.store.dataset_iterator,
+            buffer_size=self.config.prefetch_buffer_size,
+            device=jax.local_devices()[0],
+        )
+        builder.store.log_data_wait_time = self.config.log_data_wait_time
+
+    @staticmethod
+    def name() -> str:
+        """Static method that returns component name."""
+        return "device_prefetch"
+
+    @staticmethod
+    def required_components() -> List[Type[Callback]]:
+        """List of other Components required for this Component to function.
+
+        TrainerDataset required to set up builder.store.dataset_iterator.
+
+        Returns:
+            List of required component classes.
+        """
+        return [TrainerDataset]
@@ -32,6 +32,7 @@ class DistributorConfig:
     multi_process: bool = True
     nodes_on_gpu: Union[List[str], str] = "trainer"
     run_evaluator: bool = True
+    run_inference_server: bool = False
     distributor_name: str = "System"
     terminal: str = "current_terminal"
     single_process_max_episodes: Optional[int] = None
@@ -54,6 +55,9 @@ class Distributor(Component):
         """Create nodes for the program and save the program in the store.
 
         Create data server, parameter server, executor, trainer, and evaluator nodes.
+        If run_inference_server is set, also create an inference server node
+        that selects the actions of all the executors. The evaluator keeps
+        selecting its own actions.
         Handles both single-process and multi-process.
 
         Args:
@@ -62,6 +66,19 @@ class Distributor(Component):
         Returns:
             None.
         """
+        # Imported here as the executing components import the building ones.
+        from mava.components.executing.action_selection import (
+            InferenceServerExecutorSelectAction,
+        )
+
+        if self.config.run_inference_server and not builder.has(
+            InferenceServerExecutorSelectAction
+        ):
+            raise ValueError(
+                "run_inference_server requires the executors to use the "
+                "InferenceServerExecutorSelectAction component."
+            )
+
         builder.store.program = Launcher(
             multi_process=self.config.multi_process,
             nodes_on_gpu=self.config.nodes_on_gpu,
@@ -83,6 +100,10 @@ class Distributor(Component):
             builder.store.eval_key,
         ) = jax.random.split(builder.store.base_key, 4)
 
+        # Generate a key for the inference server
+        if self.config.run_inference_server:
+            base_key, builder.store.inference_key = jax.random.split(base_key)
+
         # Generate keys for the executors
         keys = jax.random.split(base_key, 1 + self.config.num_executors)
         base_key = keys[0]
@@ -110,11 +131,22 @@ class Distributor(Component):
             name="parameter_server",
         )
 
+        executor_servers = [data_server, parameter_server]
+        if self.config.run_inference_server:
+            # inference server node
+            inference_server = builder.store.program.add(
+                builder.inference_server,
+                [parameter_server],
+                node_type=NodeType.courier,
+                name="inference_server",
+            )
+            executor_servers.append(inference_server)
+
         # executor nodes
         for executor_id in range(self.config.num_executors):
             builder.store.program.add(
                 builder.executor,
-                [f"executor_{executor_id}", data_server, parameter_server],
+                [f"executor_{executor_id}"] + executor_servers,
                 node_type=NodeType.courier,
                 name="executor",
             )
@@ -158,7 +190,7 @@ class Distributor(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseTrainerInit required to set up builder.store.trainer_networks.
 
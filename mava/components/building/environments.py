@@ -15,18 +15,27 @@
 
 """Execution components for system builders"""
 import abc
+import atexit
+import functools
 import os
 from dataclasses import dataclass
-from typing import Callable, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, List, Optional, Tuple, Type, Union
 
 import acme
+import jax
 
 from mava import specs
 from mava.callbacks import Callback
 from mava.components import Component
 from mava.components.building.loggers import Logger
 from mava.core_jax import SystemBuilder
-from mava.environment_loop import ParallelEnvironmentLoop
+from mava.environment_loop import (
+    ParallelEnvironmentLoop,
+    PipelinedEnvironmentLoop,
+    SharedMemoryEnvironmentLoop,
+    VectorisedEnvironmentLoop,
+)
+from mava.environment_pool import SharedMemoryEnvironmentPool
 from mava.utils.sort_utils import sort_str_num
 from mava.wrappers.environment_loop_wrappers import (
     DetailedPerAgentStatistics,
@@ -77,7 +86,7 @@ class EnvironmentSpec(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         None required.
 
@@ -141,7 +150,7 @@ class ExecutorEnvironmentLoop(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         Logger required to set up builder.store.executor_logger.
         EnvironmentSpec required for config environment_factory.
@@ -238,3 +247,253 @@ class MonitorExecutorEnvironmentLoop(ExecutorEnvironmentLoop):
             )
 
         builder.store.system_executor = executor_environment_loop
+
+
+@dataclass
+class VectorisedExecutorEnvironmentLoopConfig(ExecutorEnvironmentLoopConfig):
+    num_envs_per_executor: int = 4
+
+
+class VectorisedExecutorEnvironmentLoop(ExecutorEnvironmentLoop):
+    def __init__(
+        self,
+        config: VectorisedExecutorEnvironmentLoopConfig = VectorisedExecutorEnvironmentLoopConfig(),  # noqa
+    ):
+        """Component creates executors that step several environments each.
+
+        Each executor steps num_envs_per_executor copies of the environment,
+        which are reset as soon as their episodes end. The action selection
+        function of the executor is vectorised over the environments, so the
+        actions of every environment and agent are selected in one jitted
+        call, and each environment has its own adder. The evaluator steps a
+        single environment. As the action selection function is shared by
+        the environments, the agents must use the same networks in every
+        episode, so the network sampling setup must have a single option.
+
+        Args:
+            config: VectorisedExecutorEnvironmentLoopConfig.
+        """
+        super().__init__(config=config)
+        self.config = config
+
+    def on_building_executor_environment(self, builder: SystemBuilder) -> None:
+        """Create and store the executor environments from the factory in config.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        num_envs = (
+            1 if builder.store.is_evaluator else self.config.num_envs_per_executor
+        )
+        builder.store.executor_environments = [
+            builder.store.global_config.environment_factory(
+                evaluation=builder.store.is_evaluator
+            )[0]
+            for _ in range(num_envs)
+        ]
+        builder.store.executor_environment = builder.store.executor_environments[0]
+
+    def on_building_executor_environment_loop(self, builder: SystemBuilder) -> None:
+        """Create and store a vectorised environment loop.
+
+        Also vectorises the action selection function of the executor over the
+        environments, with a random key for each environment, and creates an
+        adder for each environment.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        if builder.store.is_evaluator:
+            executor_environment_loop = ParallelEnvironmentLoop(
+                environment=builder.store.executor_environment,
+                executor=builder.store.executor,
+                logger=builder.store.executor_logger,
+                should_update=self.config.should_update,
+            )
+        else:
+            store = builder.store
+            if len(store.network_sampling_setup) > 1:
+                raise ValueError(
+                    "Vectorised executors select the actions of all their "
+                    "environments with the same agent networks, so the network "
+                    "sampling setup must have a single option."
+                )
+            num_envs = len(store.executor_environments)
+            store.num_executor_envs = num_envs
+
+            # The observations, recurrent states and keys have a leading
+            # environment dimension, and the params are shared.
+            recurrent = any(
+                network.get_init_state() is not None
+                for network in store.networks.values()
+            )
+            in_axes = (0, None, 0, 0) if recurrent else (0, None, 0)
+            store.select_actions_fn = jax.jit(
+                jax.vmap(store.select_actions_fn, in_axes=in_axes)
+            )
+            store.base_key = jax.random.split(store.base_key, num_envs)
+
+            # Each environment needs its own adder to write its trajectories.
+            adders = [store.adder]
+            for _ in range(num_envs - 1):
+                builder.on_building_executor_adder()
+                adders.append(store.adder)
+            store.adder = adders[0]
+
+            executor_environment_loop = self._make_vectorised_environment_loop(
+                builder, adders
+            )
+
+        del builder.store.executor_logger
+
+        if self.config.executor_stats_wrapper_class:
+            executor_environment_loop = self.config.executor_stats_wrapper_class(
+                executor_environment_loop
+            )
+
+        builder.store.system_executor = executor_environment_loop
+
+    def _make_vectorised_environment_loop(
+        self, builder: SystemBuilder, adders: List[Any]
+    ) -> VectorisedEnvironmentLoop:
+        """Create the environment loop of an executor.
+
+        Args:
+            builder: SystemBuilder.
+            adders: one adder per environment.
+
+        Returns:
+            Vectorised environment loop.
+        """
+        return VectorisedEnvironmentLoop(
+            environments=builder.store.executor_environments,
+            executor=builder.store.executor,
+            adders=adders,
+            logger=builder.store.executor_logger,
+            should_update=self.config.should_update,
+        )
+
+
+@dataclass
+class SharedMemoryExecutorEnvironmentLoopConfig(
+    VectorisedExecutorEnvironmentLoopConfig
+):
+    environment_pool_start_method: str = "spawn"
+
+
+class SharedMemoryExecutorEnvironmentLoop(VectorisedExecutorEnvironmentLoop):
+    def __init__(
+        self,
+        config: SharedMemoryExecutorEnvironmentLoopConfig = SharedMemoryExecutorEnvironmentLoopConfig(),  # noqa
+    ):
+        """Component creates executors that step environments in worker processes.
+
+        As with VectorisedExecutorEnvironmentLoop, each executor steps
+        num_envs_per_executor copies of the environment with one call to its
+        vectorised action selection function. The copies run in a
+        SharedMemoryEnvironmentPool, so they are stepped in parallel, one
+        process each, and exchange actions and timesteps with the executor
+        through shared memory. The evaluator steps a single environment in
+        its own process. The pool is closed when the environment loop stops.
+
+        Args:
+            config: SharedMemoryExecutorEnvironmentLoopConfig.
+        """
+        super().__init__(config=config)
+        self.config = config
+
+    def on_building_executor_environment(self, builder: SystemBuilder) -> None:
+        """Create the environment pool of the executor.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        if builder.store.is_evaluator:
+            super().on_building_executor_environment(builder)
+            return
+
+        environment_pool = SharedMemoryEnvironmentPool(
+            environment_factory=functools.partial(
+                builder.store.global_config.environment_factory, evaluation=False
+            ),
+            num_envs=self.config.num_envs_per_executor,
+            start_method=self.config.environment_pool_start_method,
+        )
+        # The environment loop closes the pool when it stops, and the pool is
+        # closed at exit if the loop is never run.
+        atexit.register(environment_pool.close)
+        builder.store.executor_environment_pool = environment_pool
+        builder.store.executor_environments = environment_pool.environments
+        # The local copy of the environment, which is never stepped, provides
+        # the specs and attributes of the environment.
+        builder.store.executor_environment = environment_pool.environment
+
+    def _make_vectorised_environment_loop(
+        self, builder: SystemBuilder, adders: List[Any]
+    ) -> VectorisedEnvironmentLoop:
+        """Create an environment loop stepping the pool in parallel.
+
+        Args:
+            builder: SystemBuilder.
+            adders: one adder per environment.
+
+        Returns:
+            Shared memory environment loop.
+        """
+        return SharedMemoryEnvironmentLoop(
+            environment_pool=builder.store.executor_environment_pool,
+            executor=builder.store.executor,
+            adders=adders,
+            logger=builder.store.executor_logger,
+            should_update=self.config.should_update,
+        )
+
+
+class PipelinedExecutorEnvironmentLoop(SharedMemoryExecutorEnvironmentLoop):
+    def __init__(
+        self,
+        config: SharedMemoryExecutorEnvironmentLoopConfig = SharedMemoryExecutorEnvironmentLoopConfig(),  # noqa
+    ):
+        """Component creates executors that pipeline their environment steps.
+
+        As with SharedMemoryExecutorEnvironmentLoop, each executor steps
+        num_envs_per_executor copies of the environment in worker processes.
+        The copies are split into two groups that are stepped in turn, so the
+        action selection of one group and the adder writes, which run on a
+        background thread, overlap with the environment steps of the other
+        group. num_envs_per_executor must be at least two.
+
+        Args:
+            config: SharedMemoryExecutorEnvironmentLoopConfig.
+        """
+        super().__init__(config=config)
+        self.config = config
+
+    def _make_vectorised_environment_loop(
+        self, builder: SystemBuilder, adders: List[Any]
+    ) -> VectorisedEnvironmentLoop:
+        """Create a pipelined environment loop.
+
+        Args:
+            builder: SystemBuilder.
+            adders: one adder per environment.
+
+        Returns:
+            Pipelined environment loop.
+        """
+        return PipelinedEnvironmentLoop(
+            environment_pool=builder.store.executor_environment_pool,
+            executor=builder.store.executor,
+            adders=adders,
+            logger=builder.store.executor_logger,
+            should_update=self.config.should_update,
+        )
@@ -17,7 +17,7 @@
 
 import abc
 from dataclasses import dataclass
-from typing import Any, List, Optional, Type
+from typing import Any, List, Optional, Tuple, Type
 
 import optax
 from optax._src import base as optax_base
@@ -27,6 +27,31 @@ from mava.components import Component
 from mava.core_jax import SystemBuilder
 
 
+def get_network_optimisers(
+    store: Any, net_key: str
+) -> Tuple[optax.GradientTransformation, optax.GradientTransformation]:
+    """Return the policy and critic optimisers of a network.
+
+    Args:
+        store: builder or trainer store with the optimisers.
+        net_key: key of the network.
+
+    Returns:
+        The network's own optimisers if it has any, otherwise the shared ones.
+    """
+    policy_optimiser = store.policy_optimiser
+    if hasattr(store, "policy_network_optimisers"):
+        policy_optimiser = store.policy_network_optimisers.get(
+            net_key, policy_optimiser
+        )
+    critic_optimiser = store.critic_optimiser
+    if hasattr(store, "critic_network_optimisers"):
+        critic_optimiser = store.critic_network_optimisers.get(
+            net_key, critic_optimiser
+        )
+    return policy_optimiser, critic_optimiser
+
+
 class Optimisers(Component):
     @abc.abstractmethod
     def __init__(
@@ -59,7 +84,7 @@ class Optimisers(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         Returns:
             List of required component classes.
@@ -69,12 +94,23 @@ class Optimisers(Component):
 
 @dataclass
 class DefaultOptimisersConfig:
+    """Configuration for the default optimisers.
+
+    policy_network_learning_rates and critic_network_learning_rates hold
+    (network key, learning rate) pairs. These networks are updated by the
+    default optimiser with their own learning rate instead of the shared
+    optimiser. They are tuples rather than dicts, as the system config
+    flattens dict fields.
+    """
+
     policy_learning_rate: float = 1e-3
     critic_learning_rate: float = 1e-3
     adam_epsilon: float = 1e-5
     max_gradient_norm: float = 0.5
     policy_optimiser: Optional[optax_base.GradientTransformation] = None
     critic_optimiser: Optional[optax_base.GradientTransformation] = None
+    policy_network_learning_rates: Tuple[Tuple[str, float], ...] = ()
+    critic_network_learning_rates: Tuple[Tuple[str, float], ...] = ()
 
 
 class DefaultOptimisers(Optimisers):
@@ -100,19 +136,33 @@ class DefaultOptimisers(Optimisers):
         """
         # Build the optimiser function here
         if not self.config.policy_optimiser:
-            builder.store.policy_optimiser = optax.chain(
-                optax.clip_by_global_norm(self.config.max_gradient_norm),
-                optax.scale_by_adam(eps=self.config.adam_epsilon),
-                optax.scale(-self.config.policy_learning_rate),
+            builder.store.policy_optimiser = self._make_optimiser(
+                self.config.policy_learning_rate
             )
         else:
             builder.store.policy_optimiser = self.config.policy_optimiser
 
         if not self.config.critic_optimiser:
-            builder.store.critic_optimiser = optax.chain(
-                optax.clip_by_global_norm(self.config.max_gradient_norm),
-                optax.scale_by_adam(eps=self.config.adam_epsilon),
-                optax.scale(-self.config.policy_learning_rate),
+            builder.store.critic_optimiser = self._make_optimiser(
+                self.config.critic_learning_rate
             )
         else:
             builder.store.critic_optimiser = self.config.critic_optimiser
+
+        # Networks with their own learning rate use the default optimiser.
+        builder.store.policy_network_optimisers = {
+            net_key: self._make_optimiser(learning_rate)
+            for net_key, learning_rate in self.config.policy_network_learning_rates
+        }
+        builder.store.critic_network_optimisers = {
+            net_key: self._make_optimiser(learning_rate)
+            for net_key, learning_rate in self.config.critic_network_learning_rates
+        }
+
+    def _make_optimiser(self, learning_rate: float) -> optax.GradientTransformation:
+        """Create the default optimiser with the given learning rate."""
+        return optax.chain(
+            optax.clip_by_global_norm(self.config.max_gradient_norm),
+            optax.scale_by_adam(eps=self.config.adam_epsilon),
+            optax.scale(-learning_rate),
+        )
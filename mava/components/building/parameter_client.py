@@ -17,6 +17,7 @@
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple, Type
 
+import jax
 import numpy as np
 
 from mava.callbacks import Callback
@@ -55,7 +56,7 @@ class BaseParameterClient(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseTrainerInit required to set up builder.store.networks
         and builder.store.trainer_networks.
@@ -68,7 +69,15 @@ class BaseParameterClient(Component):
 
 @dataclass
 class ExecutorParameterClientConfig:
+    """Configuration for the executor parameter client.
+
+    If executor_device_params is set, the policy and normalisation parameters
+    are moved to the default device of the executor when they are fetched,
+    instead of on every action selection.
+    """
+
     executor_parameter_update_period: int = 200
+    executor_device_params: bool = True
 
 
 class ExecutorParameterClient(BaseParameterClient):
@@ -88,7 +97,8 @@ class ExecutorParameterClient(BaseParameterClient):
         """Create and store the executor parameter client.
 
         Gets network parameters from store and registers them for tracking.
-        Also works for the evaluator.
+        Also works for the evaluator. Executors that use an inference server
+        do not fetch the network parameters.
 
         Args:
             builder: SystemBuilder.
@@ -99,13 +109,26 @@ class ExecutorParameterClient(BaseParameterClient):
         # and hence set_keys is empty
         set_keys: List[str] = []
         get_keys: List[str] = []
-
-        for agent_net_key in builder.store.networks.keys():
+        # Parameters used in action selection are kept on device.
+        device_keys: List[str] = []
+
+        # Imported here as the executing components import the building ones.
+        from mava.components.executing.action_selection import (
+            InferenceServerExecutorSelectAction,
+        )
+
+        use_inference_server = (
+            builder.has(InferenceServerExecutorSelectAction)
+            and getattr(builder.store, "inference_server_client", None) is not None
+        )
+        network_keys = [] if use_inference_server else builder.store.networks.keys()
+        for agent_net_key in network_keys:
             policy_param_key = f"policy_network-{agent_net_key}"
             params[policy_param_key] = builder.store.networks[
                 agent_net_key
             ].policy_params
             get_keys.append(policy_param_key)
+            device_keys.append(policy_param_key)
 
             critic_param_key = f"critic_network-{agent_net_key}"
             params[critic_param_key] = builder.store.networks[
@@ -116,6 +139,7 @@ class ExecutorParameterClient(BaseParameterClient):
         # Create observations' normalisation parameters
         params["norm_params"] = builder.store.norm_params
         get_keys.append("norm_params")
+        device_keys.append("norm_params")
 
         if (
             builder.store.is_evaluator
@@ -131,6 +155,11 @@ class ExecutorParameterClient(BaseParameterClient):
 
         builder.store.executor_counts = {name: params[name] for name in count_names}
 
+        devices = {}
+        if self.config.executor_device_params:
+            device = jax.local_devices()[0]
+            devices = {key: device for key in device_keys}
+
         parameter_client = None
         if builder.store.parameter_server_client:
             # Create parameter client
@@ -141,6 +170,7 @@ class ExecutorParameterClient(BaseParameterClient):
                 get_keys=get_keys,
                 set_keys=set_keys,
                 update_period=self.config.executor_parameter_update_period,
+                devices=devices,
             )
 
             # Make sure not to use a random policy after checkpoint restoration by
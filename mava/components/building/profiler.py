@@ -0,0 +1,211 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Profiler component for trainers and executors"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Type
+
+import jax
+from absl import logging
+
+from mava.callbacks import Callback
+from mava.components import Component
+from mava.core_jax import SystemBuilder, SystemExecutor, SystemTrainer
+
+# The profiler server is global to the process.
+_profiler_server: Optional[Any] = None
+
+
+@dataclass
+class ProfilerConfig:
+    """Configuration for profiling trainers and executors.
+
+    profiler_trainer_steps and profiler_executor_episodes are [start, stop)
+    ranges of trainer steps and executor episodes, counted from zero, to
+    trace. Only the executor with id profiler_executor_id is traced, since a
+    process can only record one trace at a time. The traces are written to
+    profiler_trace_dir, or to a profiler directory under the experiment path
+    if it is not set, in one directory per node.
+    """
+
+    profiler_trainer_steps: Optional[Tuple[int, int]] = (10, 15)
+    profiler_executor_episodes: Optional[Tuple[int, int]] = None
+    profiler_executor_id: str = "executor_0"
+    profiler_trace_dir: Optional[str] = None
+    profiler_server_port: Optional[int] = None
+
+
+class Profiler(Component):
+    def __init__(
+        self,
+        config: ProfilerConfig = ProfilerConfig(),
+    ):
+        """Component records JAX profiler traces of trainer steps and episodes.
+
+        The traces can be opened in the TensorBoard profile plugin or in
+        Perfetto. If profiler_server_port is set, the profiled nodes also start
+        a profiler server on that port to capture traces on demand.
+
+        Args:
+            config: ProfilerConfig.
+        """
+        self.config = config
+
+    def _trace_dir(self, builder: SystemBuilder, node_id: str) -> str:
+        """Return the trace directory of a node."""
+        trace_dir = self.config.profiler_trace_dir
+        if trace_dir is None:
+            trace_dir = os.path.join(
+                builder.store.global_config.experiment_path, "profiler"
+            )
+        return os.path.join(os.path.expanduser(trace_dir), node_id)
+
+    def _start_server(self) -> None:
+        """Start the profiler server of this process if a port is set."""
+        global _profiler_server
+        if self.config.profiler_server_port is None or _profiler_server is not None:
+            return
+        _profiler_server = jax.profiler.start_server(self.config.profiler_server_port)
+        logging.info(
+            f"Started the profiler server on port {self.config.profiler_server_port}."
+        )
+
+    def on_building_trainer_start(self, builder: SystemBuilder) -> None:
+        """Set up the trace directory of a profiled trainer.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        if self.config.profiler_trainer_steps is None:
+            return
+        builder.store.profiler_trace_dir = self._trace_dir(
+            builder, builder.store.trainer_id
+        )
+        self._start_server()
+
+    def on_building_executor_start(self, builder: SystemBuilder) -> None:
+        """Set up the trace directory of a profiled executor.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        if (
+            self.config.profiler_executor_episodes is None
+            or builder.store.executor_id != self.config.profiler_executor_id
+        ):
+            return
+        builder.store.profiler_trace_dir = self._trace_dir(
+            builder, builder.store.executor_id
+        )
+        self._start_server()
+
+    def _update_trace(
+        self, store: Any, count: int, count_range: Optional[Tuple[int, int]]
+    ) -> None:
+        """Start or stop the trace when the count enters or leaves the range."""
+        if count_range is None or not hasattr(store, "profiler_trace_dir"):
+            return
+        start, stop = count_range
+        if count == start:
+            logging.info(f"Starting the profiler trace in {store.profiler_trace_dir}.")
+            jax.profiler.start_trace(store.profiler_trace_dir)
+        elif count == stop:
+            jax.profiler.stop_trace()
+            logging.info(f"Saved the profiler trace in {store.profiler_trace_dir}.")
+
+    def on_training_init(self, trainer: SystemTrainer) -> None:
+        """Set up the trainer step count.
+
+        Args:
+            trainer: SystemTrainer.
+
+        Returns:
+            None.
+        """
+        trainer.store.profiler_step = 0
+
+    def on_training_step_start(self, trainer: SystemTrainer) -> None:
+        """Start or stop the trace before a trainer step.
+
+        Args:
+            trainer: SystemTrainer.
+
+        Returns:
+            None.
+        """
+        if (
+            self.config.profiler_trainer_steps is not None
+            and trainer.store.profiler_step == self.config.profiler_trainer_steps[1]
+            and hasattr(trainer.store, "training_state")
+        ):
+            # Wait for the traced steps to finish running on the device.
+            jax.block_until_ready(trainer.store.training_state)
+        self._update_trace(
+            trainer.store,
+            trainer.store.profiler_step,
+            self.config.profiler_trainer_steps,
+        )
+        trainer.store.profiler_step += 1
+
+    def on_execution_init_end(self, executor: SystemExecutor) -> None:
+        """Set up the executor episode count.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            None.
+        """
+        executor.store.profiler_episode = 0
+
+    def on_execution_observe_first_start(self, executor: SystemExecutor) -> None:
+        """Start or stop the trace at the start of an episode.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            None.
+        """
+        self._update_trace(
+            executor.store,
+            executor.store.profiler_episode,
+            self.config.profiler_executor_episodes,
+        )
+        executor.store.profiler_episode += 1
+
+    @staticmethod
+    def name() -> str:
+        """Static method that returns component name."""
+        return "profiler"
+
+    @staticmethod
+    def required_components() -> List[Type[Callback]]:
+        """List of other Components required for this Component to function.
+
+        None required.
+
+        Returns:
+            List of required component classes.
+        """
+        return []
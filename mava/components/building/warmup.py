@@ -0,0 +1,181 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compilation warmup component for system builders"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, List, Type
+
+import jax
+import numpy as np
+import tree
+from absl import logging
+
+from mava.callbacks import Callback
+from mava.components import Component
+from mava.components.building.datasets import DevicePrefetchIterator, TrainerDataset
+from mava.components.building.environments import EnvironmentSpec
+from mava.components.building.networks import Networks
+from mava.core_jax import SystemBuilder, SystemTrainer
+from mava.utils.jax_tree_utils import stack_trees
+from mava.utils.sort_utils import sort_str_num
+
+
+def zeros_from_spec(spec: Any) -> Any:
+    """Create numpy zeros matching a nest of array or tensor specs.
+
+    Args:
+        spec: nest of dm_env array specs or tf tensor specs.
+
+    Returns:
+        Nest of numpy arrays of zeros with the spec shapes and dtypes.
+    """
+
+    def zeros(leaf_spec: Any) -> np.ndarray:
+        """Create zeros for a single spec."""
+        dtype = getattr(leaf_spec.dtype, "as_numpy_dtype", leaf_spec.dtype)
+        return np.zeros(tuple(leaf_spec.shape), dtype=dtype)
+
+    return tree.map_structure(zeros, spec)
+
+
+@dataclass
+class CompilationWarmupConfig:
+    warmup_trainer: bool = True
+    warmup_executor: bool = True
+
+
+class CompilationWarmup(Component):
+    def __init__(
+        self,
+        config: CompilationWarmupConfig = CompilationWarmupConfig(),
+    ):
+        """Component compiles the jitted step and action selection functions.
+
+        The trainer step function is compiled against the reverb dataset
+        specs and the executor action selection function against the
+        environment specs when the nodes are built. The first training step
+        then does not stall on compilation while reverb fills up, and the first
+        episodes of the executors report their real steps_per_second.
+
+        The functions are called once on zeros, which compiles them into the
+        same cache as the calls made during training. The compile times are
+        stored as step_compile_time, which is logged by the trainer step, and
+        as select_actions_compile_time, which is logged with the executor
+        episode stats.
+
+        Args:
+            config: CompilationWarmupConfig.
+        """
+        self.config = config
+
+    def on_training_init_end(self, trainer: SystemTrainer) -> None:
+        """Compile the trainer step function on a sample of zeros.
+
+        Args:
+            trainer: SystemTrainer.
+
+        Returns:
+            None.
+        """
+        if not self.config.warmup_trainer or not hasattr(
+            trainer.store, "warmup_step_fn"
+        ):
+            return
+
+        sample = zeros_from_spec(trainer.store.dataset_element_spec)
+        if isinstance(trainer.store.dataset_iterator, DevicePrefetchIterator):
+            # Prefetched samples are committed to the iterator's device.
+            sample = jax.device_put(sample, trainer.store.dataset_iterator.device)
+
+        trainer.store.step_compile_time = trainer.store.warmup_step_fn(sample)
+        logging.info(
+            f"Compiled the step function of {trainer.store.trainer_id} in "
+            f"{trainer.store.step_compile_time:.2f}s."
+        )
+
+    def on_building_executor_end(self, builder: SystemBuilder) -> None:
+        """Compile the executor action selection function on zero observations.
+
+        Args:
+            builder: SystemBuilder.
+
+        Returns:
+            None.
+        """
+        # The executor shares the builder store.
+        store = builder.store
+        if not self.config.warmup_executor or not hasattr(store, "select_actions_fn"):
+            # Executors using an inference server do not select actions locally.
+            return
+
+        agent_specs = store.ma_environment_spec.get_agent_environment_specs()
+        observations = {
+            agent: zeros_from_spec(agent_specs[agent].observations)
+            for agent in store.agent_net_keys.keys()
+        }
+        # The params the action selection component uses, e.g. quantised ones.
+        params = {
+            network: store.select_actions_params_fn(network)
+            for network in store.agent_net_keys.values()
+        }
+        # Recurrent executors stack the policy states in sorted agent order.
+        init_states = [
+            store.networks[store.agent_net_keys[agent]].get_init_state()
+            for agent in sort_str_num(list(store.agent_net_keys.keys()))
+        ]
+        recurrent = any(state is not None for state in init_states)
+        policy_states = stack_trees(init_states) if recurrent else None
+
+        if hasattr(store, "num_executor_envs"):
+            # Vectorised executors select the actions of several environments.
+            observations = stack_trees([observations] * store.num_executor_envs)
+            if recurrent:
+                policy_states = stack_trees([policy_states] * store.num_executor_envs)
+
+        start_time = time.time()
+        if recurrent:
+            outputs = store.select_actions_fn(
+                observations, params, policy_states, store.base_key
+            )
+        else:
+            outputs = store.select_actions_fn(observations, params, store.base_key)
+        jax.block_until_ready(outputs)
+        store.select_actions_compile_time = time.time() - start_time
+
+        logging.info(
+            f"Compiled the action selection function of {store.executor_id} in "
+            f"{store.select_actions_compile_time:.2f}s."
+        )
+
+    @staticmethod
+    def name() -> str:
+        """Static method that returns component name."""
+        return "compilation_warmup"
+
+    @staticmethod
+    def required_components() -> List[Type[Callback]]:
+        """List of other Components required for this Component to function.
+
+        TrainerDataset required to set up builder.store.dataset_element_spec.
+        EnvironmentSpec required to set up builder.store.ma_environment_spec.
+        Networks required to set up builder.store.networks
+        and builder.store.base_key.
+
+        Returns:
+            List of required component classes.
+        """
+        return [TrainerDataset, EnvironmentSpec, Networks]
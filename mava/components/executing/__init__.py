@@ -16,7 +16,11 @@
 """Executor components for Mava systems."""
 from mava.components.executing.action_selection import (
     FeedforwardExecutorSelectAction,
+    InferenceServerExecutorSelectAction,
+    QuantisedFeedforwardExecutorSelectAction,
     RecurrentExecutorSelectAction,
+    VectorisedFeedforwardExecutorSelectAction,
+    VectorisedRecurrentExecutorSelectAction,
 )
 from mava.components.executing.base import ExecutorInit
 from mava.components.executing.observing import (
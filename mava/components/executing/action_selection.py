@@ -16,10 +16,15 @@
 """Execution components for system builders"""
 
 import abc
+import functools
+from dataclasses import dataclass
 from types import SimpleNamespace
 from typing import Any, Dict, List, Tuple, Type
 
 import jax
+import jax.numpy as jnp
+import numpy as np
+from absl import logging
 from acme.jax import networks as networks_lib
 from acme.jax import utils
 
@@ -31,7 +36,17 @@ from mava.components.normalisation import ObservationNormalisation
 from mava.components.training.trainer import BaseTrainerInit
 from mava.core_jax import SystemExecutor
 from mava.types import NestedArray
-from mava.utils.jax_training_utils import executor_normalize_observation
+from mava.utils.jax_quantisation_utils import quantised_apply
+from mava.utils.jax_training_utils import (
+    action_mask_categorical_policies,
+    executor_normalize_observation,
+)
+from mava.utils.jax_tree_utils import (
+    index_stacked_tree,
+    set_stacked_tree_index,
+    stack_trees,
+)
+from mava.utils.sort_utils import sort_str_num
 
 
 class ExecutorSelectAction(Component):
@@ -53,6 +68,66 @@ class ExecutorSelectAction(Component):
         """Hook to override for selecting actions for each agent."""
         pass
 
+    def on_execution_init(self, executor: SystemExecutor) -> None:
+        """Save the function returning the params a network selects actions with.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            None.
+        """
+        executor.store.select_actions_params_fn = functools.partial(
+            self._network_params, executor
+        )
+
+    def _get_current_params(self, executor: SystemExecutor) -> Dict[str, NestedArray]:
+        """Return the device-resident params of the networks used by the agents.
+
+        The params are only moved to device again when the parameter client
+        has received new values or the agents have been assigned new networks.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            Dict with params per network.
+        """
+        parameter_client = (
+            executor.store.executor_parameter_client
+            if hasattr(executor.store, "executor_parameter_client")
+            else None
+        )
+        update_count = parameter_client.update_count if parameter_client else 0
+        net_keys = tuple(sorted(set(executor.store.agent_net_keys.values())))
+
+        if not hasattr(
+            executor.store, "current_params_version"
+        ) or executor.store.current_params_version != (update_count, net_keys):
+            executor.store.current_params = jax.device_put(
+                {
+                    network: self._network_params(executor, network)
+                    for network in net_keys
+                }
+            )
+            executor.store.current_params_version = (update_count, net_keys)
+
+        return executor.store.current_params
+
+    def _network_params(
+        self, executor: SystemExecutor, network: str
+    ) -> Dict[str, NestedArray]:
+        """Return the params of a network used to select actions.
+
+        Args:
+            executor: SystemExecutor.
+            network: network key.
+
+        Returns:
+            Dict with params per network part.
+        """
+        return executor.store.networks[network].get_params()
+
     @staticmethod
     def name() -> str:
         """Static method that returns component name."""
@@ -60,7 +135,7 @@ class ExecutorSelectAction(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseTrainerInit required to set up executor.store.networks.
         BaseSystemInit required to set up executor.store.agent_net_keys.
@@ -104,10 +179,7 @@ class FeedforwardExecutorSelectAction(ExecutorSelectAction):
             observations = executor_normalize_observation(executor, observations)
 
         # Dict with params per network
-        current_agent_params = {
-            network: executor.store.networks[network].get_params()
-            for network in executor.store.agent_net_keys.values()
-        }
+        current_agent_params = self._get_current_params(executor)
         (
             executor.store.actions_info,
             executor.store.policies_info,
@@ -222,10 +294,7 @@ class RecurrentExecutorSelectAction(ExecutorSelectAction):
             observations = executor_normalize_observation(executor, observations)
 
         # Dict with params per network
-        current_agent_params = {
-            network: executor.store.networks[network].get_params()
-            for network in executor.store.agent_net_keys.values()
-        }
+        current_agent_params = self._get_current_params(executor)
 
         (
             executor.store.actions_info,
@@ -250,6 +319,7 @@ class RecurrentExecutorSelectAction(ExecutorSelectAction):
         """
         networks = executor.store.networks
         agent_net_keys = executor.store.agent_net_keys
+        agent_indices = _policy_state_indices(agent_net_keys)
 
         def select_action(
             observation: NestedArray,
@@ -286,12 +356,12 @@ class RecurrentExecutorSelectAction(ExecutorSelectAction):
         def select_actions(
             observations: Dict[str, NestedArray],
             current_params: Dict[str, NestedArray],
-            policy_states: Dict[str, NestedArray],
+            policy_states: NestedArray,
             base_key: networks_lib.PRNGKey,
         ) -> Tuple[
             Dict[str, NestedArray],
             NestedArray,
-            Dict[str, NestedArray],
+            NestedArray,
             networks_lib.PRNGKey,
         ]:
             """Select actions across all agents - this is jitted below.
@@ -299,12 +369,16 @@ class RecurrentExecutorSelectAction(ExecutorSelectAction):
             Args:
                 observations : The observations for all the agents.
                 current_params : The parameters for all the agents.
+                policy_states : The recurrent states of all the agents, stacked
+                    in sorted agent order.
                 base_key : A JAX prng_key.
 
             Returns:
-                action info, policy info and new prng key.
+                action info, policy info, new stacked policy states and new
+                prng key.
             """
-            actions_info, policies_info, new_policy_states = {}, {}, {}
+            actions_info, policies_info = {}, {}
+            new_policy_states = policy_states
             # TODO Look at tree mapping this forloop.
             # Since this is jitted, compiling a forloop with lots of agents could take
             # long, we should vectorize this.
@@ -313,15 +387,484 @@ class RecurrentExecutorSelectAction(ExecutorSelectAction):
                 (
                     actions_info[agent],
                     policies_info[agent],
-                    new_policy_states[agent],
+                    policy_state,
                     base_key,
                 ) = select_action(
                     observation=observation,
                     current_params=current_params[agent_net_keys[agent]],
-                    policy_state=policy_states[agent],
+                    policy_state=index_stacked_tree(
+                        policy_states, agent_indices[agent]
+                    ),
                     network=network,
                     base_key=base_key,
                 )
+                new_policy_states = set_stacked_tree_index(
+                    new_policy_states, agent_indices[agent], policy_state
+                )
+            return actions_info, policies_info, new_policy_states, base_key
+
+        executor.store.select_actions_fn = jax.jit(select_actions)
+
+
+@dataclass
+class InferenceServerSelectActionConfig:
+    """Configuration for selecting actions with an inference server.
+
+    The inference server batches the requests that arrive within
+    inference_server_batch_timeout seconds of each other, up to
+    inference_server_max_batch_size agents, and fetches the policy parameters
+    every inference_server_parameter_update_period batches.
+    """
+
+    inference_server_max_batch_size: int = 256
+    inference_server_batch_timeout: float = 0.002
+    inference_server_parameter_update_period: int = 50
+
+
+class InferenceServerExecutorSelectAction(FeedforwardExecutorSelectAction):
+    def __init__(
+        self,
+        config: InferenceServerSelectActionConfig = InferenceServerSelectActionConfig(),
+    ):
+        """Component selects the actions of the executor on an inference server.
+
+        The inference server node is added by the Distributor when
+        run_inference_server is set. The executors then send their
+        observations to the server, which batches the requests of all the
+        executors into one forward pass per network, and do not fetch the
+        network parameters. Nodes without an inference server, such as the
+        evaluator, select their actions locally as with
+        FeedforwardExecutorSelectAction.
+
+        Args:
+            config: InferenceServerSelectActionConfig.
+        """
+        self.config = config
+
+    @staticmethod
+    def _uses_inference_server(executor: SystemExecutor) -> bool:
+        """Check whether the executor has an inference server client."""
+        return (
+            hasattr(executor.store, "inference_server_client")
+            and executor.store.inference_server_client is not None
+        )
+
+    def on_execution_select_actions(self, executor: SystemExecutor) -> None:
+        """Select actions for each agent and save info in store.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            None.
+        """
+        if not self._uses_inference_server(executor):
+            super().on_execution_select_actions(executor)
+            return
+
+        observations = executor.store.observations
+        # Normalize the observations before selecting actions.
+        if (
+            executor.has(ObservationNormalisation)
+            and executor.store.global_config.normalise_observations
+        ):
+            observations = executor_normalize_observation(executor, observations)
+
+        (
+            executor.store.actions_info,
+            executor.store.policies_info,
+        ) = executor.store.inference_server_client.select_actions(
+            jax.device_get(observations), executor.store.agent_net_keys
+        )
+
+    def on_execution_init_end(self, executor: SystemExecutor) -> None:
+        """Create function that is used to select actions locally.
+
+        Args:
+            executor : SystemExecutor.
+
+        Returns:
+            None.
+        """
+        if not self._uses_inference_server(executor):
+            super().on_execution_init_end(executor)
+
+
+@dataclass
+class QuantisedSelectActionConfig:
+    """Configuration for selecting actions with int8 policy networks.
+
+    If report_quantised_policy_kl is set, the mean KL divergence of the
+    quantised action distributions from the fp32 ones is computed on the
+    current observations after each parameter refresh, and logged with the
+    executor stats.
+    """
+
+    report_quantised_policy_kl: bool = True
+
+
+class QuantisedFeedforwardExecutorSelectAction(FeedforwardExecutorSelectAction):
+    def __init__(
+        self,
+        config: QuantisedSelectActionConfig = QuantisedSelectActionConfig(),
+    ):
+        """Component selects actions with int8 quantised policy networks.
+
+        The weights of the linear layers of the policy networks are quantised
+        to int8 with per output channel scales each time the executor
+        receives new parameters, and the policies are run with int8 matrix
+        multiplications. The cached device params are four times smaller and
+        the forward pass is cheaper on CPU.
+
+        Args:
+            config: QuantisedSelectActionConfig.
+        """
+        self.config = config
+
+    def _network_params(
+        self, executor: SystemExecutor, network: str
+    ) -> Dict[str, NestedArray]:
+        """Return the quantised policy params of a network.
+
+        Args:
+            executor: SystemExecutor.
+            network: network key.
+
+        Returns:
+            Dict with the quantised policy params.
+        """
+        return executor.store.networks[network].get_quantised_params()
+
+    def on_execution_select_actions(self, executor: SystemExecutor) -> None:
+        """Select actions for each agent and save info in store.
+
+        After a parameter refresh, the divergence of the quantised policies
+        from the fp32 policies is saved in executor.store.quantised_policy_kl.
+
+        Args:
+            executor: SystemExecutor.
+
+        Returns:
+            None.
+        """
+        observations = executor.store.observations
+        # Normalize the observations before selecting actions.
+        if (
+            executor.has(ObservationNormalisation)
+            and executor.store.global_config.normalise_observations
+        ):
+            observations = executor_normalize_observation(executor, observations)
+
+        params_version = (
+            executor.store.current_params_version
+            if hasattr(executor.store, "current_params_version")
+            else None
+        )
+        # Dict with quantised params per network
+        current_agent_params = self._get_current_params(executor)
+        (
+            executor.store.actions_info,
+            executor.store.policies_info,
+            executor.store.base_key,
+        ) = executor.store.select_actions_fn(
+            observations, current_agent_params, executor.store.base_key
+        )
+
+        if (
+            self.config.report_quantised_policy_kl
+            and executor.store.current_params_version != params_version
+        ):
+            fp32_params = {
+                network: executor.store.networks[network].get_params()
+                for network in current_agent_params.keys()
+            }
+            executor.store.quantised_policy_kl = float(
+                executor.store.quantised_policy_kl_fn(
+                    observations, fp32_params, current_agent_params
+                )
+            )
+            logging.info(
+                "Quantised policy KL divergence from fp32 policy: "
+                f"{executor.store.quantised_policy_kl:.6f}"
+            )
+
+    def on_execution_init_end(self, executor: SystemExecutor) -> None:
+        """Create the quantised functions used to select actions.
+
+        Args:
+            executor : SystemExecutor.
+
+        Returns:
+            None.
+        """
+        super().on_execution_init_end(executor)
+        executor.store.select_actions_fn = jax.jit(
+            quantised_apply(executor.store.select_actions_fn)
+        )
+
+        networks = executor.store.networks
+        agent_net_keys = executor.store.agent_net_keys
+
+        def policy_kl(
+            observations: Dict[str, NestedArray],
+            fp32_params: Dict[str, NestedArray],
+            quantised_params: Dict[str, NestedArray],
+        ) -> jnp.ndarray:
+            """Mean KL divergence of the quantised policies from the fp32 ones.
+
+            Args:
+                observations : The observations for all the agents.
+                fp32_params : The fp32 parameters for all the networks.
+                quantised_params : The quantised parameters for all the networks.
+
+            Returns:
+                mean KL divergence across agents.
+            """
+            kls = []
+            for agent, observation in observations.items():
+                net_key = agent_net_keys[agent]
+                policy_network = networks[net_key].policy_network
+                observation_data = utils.add_batch_dim(observation.observation)
+                mask = utils.add_batch_dim(observation.legal_actions)
+                fp32_distribution = action_mask_categorical_policies(
+                    policy_network.apply(
+                        fp32_params[net_key]["policy_network"], observation_data
+                    ),
+                    mask,
+                )
+                quantised_distribution = action_mask_categorical_policies(
+                    quantised_apply(policy_network.apply)(
+                        quantised_params[net_key]["policy_network"], observation_data
+                    ),
+                    mask,
+                )
+                kls.append(fp32_distribution.kl_divergence(quantised_distribution))
+            return jnp.mean(jnp.concatenate(kls))
+
+        executor.store.quantised_policy_kl_fn = jax.jit(policy_kl)
+
+
+def _policy_state_indices(agent_net_keys: Dict[str, str]) -> Dict[str, int]:
+    """Index of each agent in the stacked policy states, in sorted agent order."""
+    agents = sort_str_num(list(agent_net_keys.keys()))
+    return {agent: index for index, agent in enumerate(agents)}
+
+
+def _group_agents_by_network(
+    agents: List[str], agent_net_keys: Dict[str, str]
+) -> Dict[str, List[str]]:
+    """Group agents by the network they use, keeping the agent order."""
+    agents_per_network: Dict[str, List[str]] = {}
+    for agent in agents:
+        agents_per_network.setdefault(agent_net_keys[agent], []).append(agent)
+    return agents_per_network
+
+
+class VectorisedFeedforwardExecutorSelectAction(FeedforwardExecutorSelectAction):
+    def __init__(
+        self,
+        config: SimpleNamespace = SimpleNamespace(),
+    ):
+        """Component defines vectorised action selection for the executor.
+
+        The observations of agents that share a network are stacked and the
+        network is called once under vmap, instead of once per agent. All
+        the action keys are drawn from a single key split.
+
+        Args:
+            config: SimpleNamespace.
+        """
+        self.config = config
+
+    def on_execution_init_end(self, executor: SystemExecutor) -> None:
+        """Create the vectorised function that is used to select actions.
+
+        Args:
+            executor : SystemExecutor.
+
+        Returns:
+            None.
+        """
+        networks = executor.store.networks
+        agent_net_keys = executor.store.agent_net_keys
+
+        def select_actions(
+            observations: Dict[str, NestedArray],
+            current_params: Dict[str, NestedArray],
+            base_key: networks_lib.PRNGKey,
+        ) -> Tuple[
+            Dict[str, NestedArray], Dict[str, NestedArray], networks_lib.PRNGKey
+        ]:
+            """Select actions across all agents - this is jitted below.
+
+            Args:
+                observations : The observations for all the agents.
+                current_params : The parameters for all the agents.
+                base_key : A JAX prng_key.
+
+            Returns:
+                action info, policy info and new prng key.
+            """
+            actions_info: Dict[str, NestedArray] = {}
+            policies_info: Dict[str, NestedArray] = {}
+            if not observations:
+                return actions_info, policies_info, base_key
+
+            # Draw the keys for all agents at once and keep the first one for
+            # future splits.
+            keys = jax.random.split(base_key, len(observations) + 1)
+            base_key, action_keys = keys[0], keys[1:]
+
+            agents_per_network = _group_agents_by_network(
+                list(observations.keys()), agent_net_keys
+            )
+            key_index = 0
+            for net_key, agents in agents_per_network.items():
+                network = networks[net_key]
+                params = current_params[net_key]
+
+                def select_action(
+                    observation: NestedArray,
+                    action_key: networks_lib.PRNGKey,
+                    network: Any = network,
+                    params: NestedArray = params,
+                ) -> Tuple[NestedArray, NestedArray]:
+                    """Action selection for a single agent, vmapped below."""
+                    return network.get_action(
+                        observations=utils.add_batch_dim(observation.observation),
+                        params=params,
+                        base_key=action_key,
+                        mask=utils.add_batch_dim(observation.legal_actions),
+                    )
+
+                network_actions_info, network_policies_info = jax.vmap(select_action)(
+                    stack_trees([observations[agent] for agent in agents]),
+                    action_keys[key_index : key_index + len(agents)],
+                )
+                key_index += len(agents)
+
+                for agent_index, agent in enumerate(agents):
+                    actions_info[agent] = index_stacked_tree(
+                        network_actions_info, agent_index
+                    )
+                    policies_info[agent] = index_stacked_tree(
+                        network_policies_info, agent_index
+                    )
+            return actions_info, policies_info, base_key
+
+        executor.store.select_actions_fn = jax.jit(select_actions)
+
+
+class VectorisedRecurrentExecutorSelectAction(RecurrentExecutorSelectAction):
+    def __init__(
+        self,
+        config: SimpleNamespace = SimpleNamespace(),
+    ):
+        """Component defines vectorised recurrent action selection for the executor.
+
+        The observations and policy states of agents that share a network are
+        stacked and the network is called once under vmap, instead of once per
+        agent. All the action keys are drawn from a single key split.
+
+        Args:
+            config: SimpleNamespace.
+        """
+        self.config = config
+
+    def on_execution_init_end(self, executor: SystemExecutor) -> None:
+        """Create the vectorised function that is used to select actions.
+
+        Args:
+            executor : SystemExecutor.
+
+        Returns:
+            None.
+        """
+        networks = executor.store.networks
+        agent_net_keys = executor.store.agent_net_keys
+        agent_indices = _policy_state_indices(agent_net_keys)
+
+        def select_actions(
+            observations: Dict[str, NestedArray],
+            current_params: Dict[str, NestedArray],
+            policy_states: NestedArray,
+            base_key: networks_lib.PRNGKey,
+        ) -> Tuple[
+            Dict[str, NestedArray],
+            NestedArray,
+            NestedArray,
+            networks_lib.PRNGKey,
+        ]:
+            """Select actions across all agents - this is jitted below.
+
+            Args:
+                observations : The observations for all the agents.
+                current_params : The parameters for all the agents.
+                policy_states : The recurrent states of all the agents, stacked
+                    in sorted agent order.
+                base_key : A JAX prng_key.
+
+            Returns:
+                action info, policy info, new stacked policy states and new
+                prng key.
+            """
+            actions_info: Dict[str, NestedArray] = {}
+            policies_info: Dict[str, NestedArray] = {}
+            new_policy_states = policy_states
+            if not observations:
+                return actions_info, policies_info, new_policy_states, base_key
+
+            # Draw the keys for all agents at once and keep the first one for
+            # future splits.
+            keys = jax.random.split(base_key, len(observations) + 1)
+            base_key, action_keys = keys[0], keys[1:]
+
+            agents_per_network = _group_agents_by_network(
+                list(observations.keys()), agent_net_keys
+            )
+            key_index = 0
+            for net_key, agents in agents_per_network.items():
+                network = networks[net_key]
+                params = current_params[net_key]
+                state_indices = np.array([agent_indices[agent] for agent in agents])
+
+                def select_action(
+                    observation: NestedArray,
+                    policy_state: NestedArray,
+                    action_key: networks_lib.PRNGKey,
+                    network: Any = network,
+                    params: NestedArray = params,
+                ) -> Tuple[NestedArray, NestedArray, NestedArray]:
+                    """Action selection for a single agent, vmapped below."""
+                    return network.get_action(
+                        observations=utils.add_batch_dim(observation.observation),
+                        params=params,
+                        policy_state=policy_state,
+                        base_key=action_key,
+                        mask=utils.add_batch_dim(observation.legal_actions),
+                    )
+
+                (
+                    network_actions_info,
+                    network_policies_info,
+                    network_policy_states,
+                ) = jax.vmap(select_action)(
+                    stack_trees([observations[agent] for agent in agents]),
+                    index_stacked_tree(policy_states, state_indices),
+                    action_keys[key_index : key_index + len(agents)],
+                )
+                key_index += len(agents)
+                new_policy_states = set_stacked_tree_index(
+                    new_policy_states, state_indices, network_policy_states
+                )
+
+                for agent_index, agent in enumerate(agents):
+                    actions_info[agent] = index_stacked_tree(
+                        network_actions_info, agent_index
+                    )
+                    policies_info[agent] = index_stacked_tree(
+                        network_policies_info, agent_index
+                    )
             return actions_info, policies_info, new_policy_states, base_key
 
         executor.store.select_actions_fn = jax.jit(select_actions)
@@ -16,10 +16,11 @@
 """Observation components for system builders"""
 
 import abc
-import copy
 from types import SimpleNamespace
 from typing import Any, Dict, List, Type
 
+import jax
+
 from mava.callbacks import Callback
 from mava.components import Component
 from mava.components.building.adders import Adder
@@ -27,6 +28,8 @@ from mava.components.building.parameter_client import ExecutorParameterClient
 from mava.components.building.system_init import BaseSystemInit
 from mava.components.executing.action_selection import ExecutorSelectAction
 from mava.core_jax import SystemExecutor
+from mava.types import NestedArray
+from mava.utils.jax_tree_utils import index_stacked_tree, stack_trees
 from mava.utils.sort_utils import sample_new_agent_keys, sort_str_num
 
 
@@ -67,7 +70,7 @@ class ExecutorObserve(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         Adder required to set up executor.store.adder.
         BaseSystemInit required to set up executor.store.agent_net_keys,
@@ -170,13 +173,51 @@ class FeedforwardExecutorObserve(ExecutorObserve):
 
 class RecurrentExecutorObserve(FeedforwardExecutorObserve):
     def __init__(self, config: SimpleNamespace = SimpleNamespace()):
-        """Component handles observations for a feedforward executor.
+        """Component handles observations for a recurrent executor.
+
+        The policy states of all the agents are kept on device, stacked in
+        sorted agent order, and are only fetched to host in one transfer per
+        step for the adder.
 
         Args:
             config: SimpleNamespace.
         """
         self.config = config
 
+    @staticmethod
+    def _init_policy_states(executor: SystemExecutor) -> NestedArray:
+        """Return the stacked initial policy states of the agents on device.
+
+        The states are cached for the networks used by the agents, so that
+        resetting them at the start of an episode does not copy any arrays.
+        """
+        agents = sort_str_num(list(executor.store.agent_net_keys.keys()))
+        net_keys = tuple(executor.store.agent_net_keys[agent] for agent in agents)
+        if (
+            not hasattr(executor.store, "init_policy_states_net_keys")
+            or executor.store.init_policy_states_net_keys != net_keys
+        ):
+            executor.store.init_policy_states = jax.device_put(
+                stack_trees(
+                    [
+                        executor.store.networks[net_key].get_init_state()
+                        for net_key in net_keys
+                    ]
+                )
+            )
+            executor.store.init_policy_states_net_keys = net_keys
+        return executor.store.init_policy_states
+
+    @staticmethod
+    def _host_policy_states(executor: SystemExecutor) -> Dict[str, NestedArray]:
+        """Fetch the stacked policy states to host and split them per agent."""
+        agents = sort_str_num(list(executor.store.agent_net_keys.keys()))
+        policy_states = jax.device_get(executor.store.policy_states)
+        return {
+            agent: index_stacked_tree(policy_states, index)
+            for index, agent in enumerate(agents)
+        }
+
     def on_execution_observe_first(self, executor: SystemExecutor) -> None:
         """Handle first observation in episode and give to adder.
 
@@ -189,13 +230,9 @@ class RecurrentExecutorObserve(FeedforwardExecutorObserve):
             None.
         """
 
-        # Initialise the recurrent states of the agents
-        executor.store.policy_states = {}
-        for agent in executor.store.agent_net_keys.keys():
-            network = executor.store.agent_net_keys[agent]
-            executor.store.policy_states[agent] = copy.copy(
-                executor.store.networks[network].get_init_state()
-            )
+        # Reset the recurrent states of the agents. Device arrays are immutable,
+        # so the cached initial states can be used as they are.
+        executor.store.policy_states = self._init_policy_states(executor)
 
         # Return if the executor has no adder.
         if not executor.store.adder:
@@ -216,7 +253,7 @@ class RecurrentExecutorObserve(FeedforwardExecutorObserve):
             "network_int_keys"
         ] = executor.store.network_int_keys_extras
 
-        executor.store.extras["policy_states"] = executor.store.policy_states
+        executor.store.extras["policy_states"] = self._host_policy_states(executor)
 
         # executor.store.timestep set by Executor
         executor.store.adder.add_first(executor.store.timestep, executor.store.extras)
@@ -250,7 +287,7 @@ class RecurrentExecutorObserve(FeedforwardExecutorObserve):
         ] = executor.store.network_int_keys_extras
 
         # executor.store.extras set by Executor
-        executor.store.next_extras["policy_states"] = executor.store.policy_states
+        executor.store.next_extras["policy_states"] = self._host_policy_states(executor)
 
         executor.store.adder.add(
             adder_actions, executor.store.next_timestep, executor.store.next_extras
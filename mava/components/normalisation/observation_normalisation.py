@@ -6,8 +6,8 @@ from mava import constants
 from mava.core_jax import SystemBuilder, SystemParameterServer, SystemTrainer
 from mava.utils.jax_training_utils import (
     construct_norm_axes_list,
-    init_norm_params,
-    update_and_normalize_observations,
+    init_agent_norm_params,
+    update_and_normalize_agent_observations,
 )
 
 from .base_normalisation import BaseNormalisation
@@ -31,20 +31,27 @@ class ObservationNormalisation(BaseNormalisation):
         builder.store.norm_params = {}
 
     def on_building_init_end(self, builder: SystemBuilder) -> None:
-        """Initialise observations' normalisation parameters"""
+        """Initialise observations' normalisation parameters
+
+        The parameters of the agents with the same observation shape are
+        stacked, so they are updated and applied in one vectorised call.
+        """
         obs_norm_key = constants.OBS_NORM_STATE_DICT_KEY
         agent_env_specs = builder.store.ma_environment_spec._agent_environment_specs
-        builder.store.norm_params[obs_norm_key] = {}
+        observation_specs = {}
 
         for agent in builder.store.agents:
-            obs_shape = agent_env_specs[agent].observations.observation.shape
+            observation_specs[agent] = agent_env_specs[agent].observations
+            obs_shape = observation_specs[agent].observation.shape
 
             if self.config.normalise_observations and len(obs_shape) > 1:
                 raise NotImplementedError(
                     "Observations normalization only works for 1D feature spaces!"
                 )
 
-            builder.store.norm_params[obs_norm_key][agent] = init_norm_params(obs_shape)
+        builder.store.norm_params[obs_norm_key] = init_agent_norm_params(
+            observation_specs
+        )
 
     def on_training_utility_fns(self, trainer: SystemTrainer) -> None:
         """Initialises observation normalisation function"""
@@ -53,14 +60,15 @@ class ObservationNormalisation(BaseNormalisation):
                 constants.OBS_NORM_STATE_DICT_KEY
             ]
 
-            obs_shape = list(observation_stats.values())[0]["mean"].shape
+            # The stats are stacked over the agents of each group.
+            obs_shape = list(observation_stats.values())[0]["mean"].shape[1:]
             norm_axes = construct_norm_axes_list(
                 trainer.store.obs_normalisation_start,
                 self.config.normalize_axes,
                 obs_shape,
             )
             trainer.store.norm_obs_running_stats_fn = partial(
-                update_and_normalize_observations,
+                update_and_normalize_agent_observations,
                 axes=norm_axes,
             )
 
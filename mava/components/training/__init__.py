@@ -21,6 +21,7 @@ from mava.components.training.losses import (
     MAPGWithTrustRegionClippingLoss,
     SquaredErrorValueLoss,
 )
+from mava.components.training.mixed_precision import MixedPrecision
 from mava.components.training.model_updating import MAPGEpochUpdate, MAPGMinibatchUpdate
 from mava.components.training.step import DefaultTrainerStep, MAPGWithTrustRegionStep
 from mava.components.training.trainer import (
@@ -30,8 +30,58 @@ from mava.core_jax import SystemTrainer
 
 @dataclass
 class GAEConfig:
+    """Configuration for GAE.
+
+    use_associative_scan computes the advantages with a parallel prefix scan
+    over time instead of a sequential reverse scan. The scan also accepts
+    trailing dimensions after time, which lets the trainer step compute the
+    advantages of all agents in one stacked call.
+    """
+
     gae_lambda: float = 0.95
     max_abs_reward: float = np.inf
+    use_associative_scan: bool = False
+
+
+def associative_scan_gae(
+    r_t: jnp.ndarray,
+    discount_t: jnp.ndarray,
+    lambda_: float,
+    values: jnp.ndarray,
+) -> jnp.ndarray:
+    """Truncated GAE computed with a parallel prefix scan over time.
+
+    Matches rlax.truncated_generalized_advantage_estimation, but the
+    recursion A_t = delta_t + discount_t * lambda * A_t+1 is solved with
+    jax.lax.associative_scan, which has a logarithmic instead of a linear
+    depth in the sequence length. Any trailing dimensions after the time
+    dimension are treated as independent sequences.
+
+    Args:
+        r_t: rewards at times [1, k].
+        discount_t: discounts at times [1, k].
+        lambda_: mixing parameter.
+        values: values at times [0, k].
+
+    Returns:
+        Advantages at times [0, k-1].
+    """
+    delta_t = r_t + discount_t * values[1:] - values[:-1]
+    decay_t = discount_t * lambda_
+
+    def compose(
+        later: Tuple[jnp.ndarray, jnp.ndarray], earlier: Tuple[jnp.ndarray, jnp.ndarray]
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """Compose the affine maps x -> decay * x + delta of two segments."""
+        later_decay, later_delta = later
+        earlier_decay, earlier_delta = earlier
+        return (
+            earlier_decay * later_decay,
+            earlier_decay * later_delta + earlier_delta,
+        )
+
+    _, advantage_t = jax.lax.associative_scan(compose, (decay_t, delta_t), reverse=True)
+    return advantage_t
 
 
 class GAE(Utility):
@@ -55,6 +105,10 @@ class GAE(Utility):
         Returns:
             None.
         """
+        if self.config.use_associative_scan:
+            advantage_estimation_fn = associative_scan_gae
+        else:
+            advantage_estimation_fn = rlax.truncated_generalized_advantage_estimation
 
         def gae_advantages(
             rewards: jnp.ndarray,
@@ -63,6 +117,9 @@ class GAE(Utility):
         ) -> Tuple[jnp.ndarray, jnp.ndarray]:
             """Use truncated GAE to compute advantages.
 
+            The time dimension comes first. With use_associative_scan the
+            inputs can have trailing dimensions, e.g. one per agent.
+
             Args:
                 rewards: Agent rewards.
                 discounts: Agent discount factors.
@@ -76,7 +133,7 @@ class GAE(Utility):
             max_abs_reward = self.config.max_abs_reward
             rewards = jnp.clip(rewards, -max_abs_reward, max_abs_reward)
 
-            advantages = rlax.truncated_generalized_advantage_estimation(
+            advantages = advantage_estimation_fn(
                 rewards[:-1],
                 discounts[:-1],
                 self.config.gae_lambda,
@@ -91,6 +148,7 @@ class GAE(Utility):
             return advantages, target_values
 
         trainer.store.gae_fn = gae_advantages
+        trainer.store.gae_over_stacked_agents = self.config.use_associative_scan
 
     @staticmethod
     def name() -> str:
@@ -99,7 +157,7 @@ class GAE(Utility):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         None required.
 
@@ -15,9 +15,10 @@
 
 """Trainer components for calculating losses."""
 import abc
+import functools
 from dataclasses import dataclass
 from types import SimpleNamespace
-from typing import Any, Dict, List, Tuple, Type
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type
 
 import haiku as hk
 import jax
@@ -28,6 +29,7 @@ from haiku._src.basic import merge_leading_dims
 from mava.callbacks import Callback
 from mava.components import Component, training
 from mava.core_jax import SystemTrainer
+from mava.utils.jax_tree_utils import index_stacked_tree, stack_trees
 
 
 class ValueLoss(Component):
@@ -130,7 +132,7 @@ class Loss(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseTrainerInit required to set up trainer.store.trainer_agents,
         trainer.store.trainer_agent_net_keys and trainer.store.networks.
@@ -143,11 +145,64 @@ class Loss(Component):
         ]  # import from training to avoid partial dependency
 
 
+def _vectorised_grad_fn(
+    loss_fn: Callable,
+    network: Any,
+    params: Any,
+    agents: List[str],
+    agent_inputs: Sequence[Dict[str, Any]],
+) -> Tuple[Any, Dict[str, Dict[str, jnp.ndarray]]]:
+    """Gradient of the mean loss over agents that share a network.
+
+    Args:
+        loss_fn: single agent loss function.
+        network: the network shared by the agents.
+        params: the shared network parameters.
+        agents: the agents that use the network.
+        agent_inputs: per agent inputs to the loss function.
+
+    Returns:
+        Tuple[network gradients, loss information per agent]
+    """
+    # Stack the agent data along a new leading axis.
+    stacked_inputs = [
+        stack_trees([agent_input[agent] for agent in agents])
+        for agent_input in agent_inputs
+    ]
+
+    def mean_loss_fn(
+        params: Any, *inputs: Any
+    ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
+        """Mean loss over the stacked agents."""
+        losses, loss_info = jax.vmap(functools.partial(loss_fn, network, params))(
+            *inputs
+        )
+        return jnp.mean(losses), loss_info
+
+    grads, stacked_loss_info = jax.grad(mean_loss_fn, has_aux=True)(
+        params, *stacked_inputs
+    )
+    loss_info = {
+        agent: index_stacked_tree(stacked_loss_info, agent_i)
+        for agent_i, agent in enumerate(agents)
+    }
+    return grads, loss_info
+
+
 @dataclass
 class MAPGTrustRegionClippingLossConfig:
     """The value_clip_parameter should be relatively small when value_normalization is True.
 
     The idea is to scale it to try and match the effect of the normalisation on the target values.
+
+    vectorise_agents computes the losses of agents that share a network in one
+    vmapped call. The network is then updated once with the mean gradient over
+    its agents, instead of once per agent.
+
+    use_dynamic_unroll unrolls recurrent policies with a scan instead of a
+    static unroll, so the compiled graph does not grow with the sequence
+    length. remat_recurrent_core additionally recomputes the activations of
+    the recurrent core in the backward pass instead of storing them.
     """
 
     clipping_epsilon: float = 0.2
@@ -155,6 +210,9 @@ class MAPGTrustRegionClippingLossConfig:
     clip_value: bool = True
     entropy_cost: float = 0.01
     value_cost: float = 0.5
+    vectorise_agents: bool = False
+    use_dynamic_unroll: bool = False
+    remat_recurrent_core: bool = False
 
 
 class MAPGWithTrustRegionClippingLoss(Loss):
@@ -172,6 +230,11 @@ class MAPGWithTrustRegionClippingLoss(Loss):
     def on_training_loss_fns(self, trainer: SystemTrainer) -> None:
         """Create and store MAPGWithTrustRegionClippingLoss loss function.
 
+        If vectorise_agents is set, the agents that share a network are stacked
+        and their losses are computed in a single vmapped forward/backward pass.
+        The gradient functions then return one gradient per network instead of
+        one per agent.
+
         Args:
             trainer: SystemTrainer.
 
@@ -179,6 +242,15 @@ class MAPGWithTrustRegionClippingLoss(Loss):
             None.
         """
 
+        # Group the trainer agents by the network they use.
+        agents_per_network: Dict[str, List[str]] = {}
+        for agent_key in trainer.store.trainer_agents:
+            agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
+            agents_per_network.setdefault(agent_net_key, []).append(agent_key)
+
+        # Let the minibatch update know how the gradients are keyed.
+        trainer.store.vectorise_agents = self.config.vectorise_agents
+
         def policy_loss_grad_fn(
             policy_params: Any,
             policy_states: Any,
@@ -203,93 +275,36 @@ class MAPGWithTrustRegionClippingLoss(Loss):
 
             policy_grads = {}
             loss_info_policy = {}
+            if self.config.vectorise_agents:
+                for agent_net_key, agents in agents_per_network.items():
+                    policy_grads[agent_net_key], net_loss_info = _vectorised_grad_fn(
+                        functools.partial(self._policy_loss_fn, trainer),
+                        trainer.store.networks[agent_net_key],
+                        policy_params[agent_net_key],
+                        agents,
+                        [
+                            policy_states,
+                            {
+                                agent: observations[agent].observation
+                                for agent in agents
+                            },
+                            actions,
+                            behaviour_log_probs,
+                            advantages,
+                        ],
+                    )
+                    loss_info_policy.update(net_loss_info)
+                return policy_grads, loss_info_policy
+
             for agent_key in trainer.store.trainer_agents:
                 agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
+                # Note (dries): The network is passed in here to set the networks
+                # correctly in the case of non-shared weights.
                 network = trainer.store.networks[agent_net_key]
-                # Note (dries): This is placed here to set the networks correctly in
-                # the case of non-shared weights.
-
-                def policy_loss_fn(
-                    policy_params: Any,
-                    policy_states: Any,
-                    observations: Any,
-                    actions: jnp.ndarray,
-                    behaviour_log_probs: jnp.ndarray,
-                    advantages: jnp.ndarray,
-                ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
-                    """Inner policy loss function: see outer function for parameters."""
-
-                    # TODO (dries): Can we implement something more general here? Like a function call?
-                    if policy_states:
-                        # Recurrent actor.
-                        minibatch_size = int(
-                            trainer.store.epoch_batch_size
-                            / trainer.store.num_minibatches
-                        )
-                        seq_len = trainer.store.sequence_length - 1
-
-                        batch_seq_observations = observations.reshape(
-                            minibatch_size, seq_len, -1
-                        )
-
-                        batch_seq_policy_states = policy_states[0].reshape(
-                            minibatch_size, seq_len, -1
-                        )
-
-                        # Use the state at the start of the sequence and unroll the policy.
-                        core = lambda x, y: network.policy_network.apply(
-                            policy_params, [x, y]
-                        )
-                        distribution_params, _ = hk.static_unroll(
-                            core,
-                            batch_seq_observations,
-                            batch_seq_policy_states[:, 0],
-                            time_major=False,
-                        )
-
-                        # Flatten the distribution_params
-
-                        distribution_params = jax.tree_util.tree_map(
-                            lambda x: merge_leading_dims(x, 2),
-                            distribution_params,
-                        )
-                    else:
-                        # Feedforward actor.
-                        distribution_params = network.policy_network.apply(
-                            policy_params, observations
-                        )
-
-                    log_probs = network.log_prob(distribution_params, actions)
-                    entropy = network.entropy(distribution_params)
-
-                    # Compute importance sampling weights:
-                    # current policy / behavior policy.
-                    rhos = jnp.exp(log_probs - behaviour_log_probs)
-                    clipping_epsilon = self.config.clipping_epsilon
-
-                    policy_loss = rlax.clipped_surrogate_pg_loss(
-                        rhos, advantages, clipping_epsilon
-                    )
-
-                    # Entropy regulariser.
-                    entropy_loss = -jnp.mean(entropy)
-
-                    total_policy_loss = (
-                        policy_loss + entropy_loss * self.config.entropy_cost
-                    )
-
-                    # TODO: (Ruan) Keeping the entropy penalty for now.
-                    # can remove or add a flag for including it.
-                    loss_info_policy = {
-                        "policy_loss_total": total_policy_loss,
-                        "loss_policy": policy_loss,
-                        "loss_entropy": entropy_loss,
-                    }
-
-                    return total_policy_loss, loss_info_policy
 
                 policy_grads[agent_key], loss_info_policy[agent_key] = jax.grad(
-                    policy_loss_fn, has_aux=True
+                    functools.partial(self._policy_loss_fn, trainer, network),
+                    has_aux=True,
                 )(
                     policy_params[agent_net_key],
                     policy_states[agent_key],
@@ -323,56 +338,32 @@ class MAPGWithTrustRegionClippingLoss(Loss):
 
             critic_grads = {}
             loss_info_critic = {}
+            if self.config.vectorise_agents:
+                for agent_net_key, agents in agents_per_network.items():
+                    critic_grads[agent_net_key], net_loss_info = _vectorised_grad_fn(
+                        functools.partial(self._critic_loss_fn, trainer),
+                        trainer.store.networks[agent_net_key],
+                        critic_params[agent_net_key],
+                        agents,
+                        [
+                            {
+                                agent: observations[agent].observation
+                                for agent in agents
+                            },
+                            target_values,
+                            behavior_values,
+                        ],
+                    )
+                    loss_info_critic.update(net_loss_info)
+                return critic_grads, loss_info_critic
+
             for agent_key in trainer.store.trainer_agents:
                 agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
                 network = trainer.store.networks[agent_net_key]
 
-                def critic_loss_fn(
-                    critic_params: Any,
-                    observations: Any,
-                    target_values: jnp.ndarray,
-                    behavior_values: jnp.ndarray,
-                ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
-                    """Inner critic loss function: see outer function for parameters."""
-
-                    values = network.critic_network.apply(critic_params, observations)
-
-                    # Value function loss. Exclude the bootstrap value
-                    unclipped_value_error = target_values - values
-
-                    unclipped_value_loss = trainer.store.value_loss_fn(
-                        unclipped_value_error
-                    )
-
-                    value_clip_parameter = self.config.value_clip_parameter
-                    if self.config.clip_value:
-                        # Clip values to reduce variablility during critic training.
-
-                        clipped_values = behavior_values + jnp.clip(
-                            values - behavior_values,
-                            -value_clip_parameter,
-                            value_clip_parameter,
-                        )
-                        clipped_value_error = target_values - clipped_values
-                        clipped_value_loss = trainer.store.value_loss_fn(
-                            clipped_value_error
-                        )
-                        value_loss = jnp.mean(
-                            jnp.fmax(unclipped_value_loss, clipped_value_loss)
-                        )
-                    else:
-                        value_loss = jnp.mean(unclipped_value_loss)
-
-                    # TODO (Ruan): Including value loss parameter in the
-                    # value loss for now but can add a flag
-                    value_loss = value_loss * self.config.value_cost
-
-                    loss_info_critic = {"loss_critic": value_loss}
-
-                    return value_loss, loss_info_critic
-
                 critic_grads[agent_key], loss_info_critic[agent_key] = jax.grad(
-                    critic_loss_fn, has_aux=True
+                    functools.partial(self._critic_loss_fn, trainer, network),
+                    has_aux=True,
                 )(
                     critic_params[agent_net_key],
                     observations[agent_key].observation,
@@ -384,3 +375,140 @@ class MAPGWithTrustRegionClippingLoss(Loss):
         # Save the gradient funcitons.
         trainer.store.policy_grad_fn = policy_loss_grad_fn
         trainer.store.critic_grad_fn = critic_loss_grad_fn
+
+    def _policy_loss_fn(
+        self,
+        trainer: SystemTrainer,
+        network: Any,
+        policy_params: Any,
+        policy_states: Any,
+        observations: Any,
+        actions: jnp.ndarray,
+        behaviour_log_probs: jnp.ndarray,
+        advantages: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
+        """Inner policy loss function for a single agent.
+
+        See policy_loss_grad_fn in on_training_loss_fns for the other parameters.
+
+        Args:
+            trainer: SystemTrainer.
+            network: the network used by the agent.
+        """
+
+        # TODO (dries): Can we implement something more general here?
+        # Like a function call?
+        if policy_states:
+            # Recurrent actor.
+            seq_len = trainer.store.sequence_length - 1
+            minibatch_size = observations.shape[0] // seq_len
+
+            batch_seq_observations = observations.reshape(minibatch_size, seq_len, -1)
+
+            batch_seq_policy_states = policy_states[0].reshape(
+                minibatch_size, seq_len, -1
+            )
+
+            # Use the state at the start of the sequence and unroll the policy.
+            core = lambda x, y: network.policy_network.apply(policy_params, [x, y])
+            if self.config.remat_recurrent_core:
+                core = jax.checkpoint(core)
+            unroll = (
+                hk.dynamic_unroll
+                if self.config.use_dynamic_unroll
+                else hk.static_unroll
+            )
+            distribution_params, _ = unroll(
+                core,
+                batch_seq_observations,
+                batch_seq_policy_states[:, 0],
+                time_major=False,
+            )
+
+            # Flatten the distribution_params
+
+            distribution_params = jax.tree_util.tree_map(
+                lambda x: merge_leading_dims(x, 2),
+                distribution_params,
+            )
+        else:
+            # Feedforward actor.
+            distribution_params = network.policy_network.apply(
+                policy_params, observations
+            )
+
+        log_probs = network.log_prob(distribution_params, actions)
+        entropy = network.entropy(distribution_params)
+
+        # Compute importance sampling weights:
+        # current policy / behavior policy.
+        log_rhos = log_probs - behaviour_log_probs
+        rhos = jnp.exp(log_rhos)
+        clipping_epsilon = self.config.clipping_epsilon
+
+        policy_loss = rlax.clipped_surrogate_pg_loss(rhos, advantages, clipping_epsilon)
+
+        # Entropy regulariser.
+        entropy_loss = -jnp.mean(entropy)
+
+        total_policy_loss = policy_loss + entropy_loss * self.config.entropy_cost
+
+        # TODO: (Ruan) Keeping the entropy penalty for now.
+        # can remove or add a flag for including it.
+        loss_info_policy = {
+            "policy_loss_total": total_policy_loss,
+            "loss_policy": policy_loss,
+            "loss_entropy": entropy_loss,
+            # Low variance estimate of KL(behaviour policy || current policy).
+            "approx_kl": jnp.mean(rhos - 1 - log_rhos),
+        }
+
+        return total_policy_loss, loss_info_policy
+
+    def _critic_loss_fn(
+        self,
+        trainer: SystemTrainer,
+        network: Any,
+        critic_params: Any,
+        observations: Any,
+        target_values: jnp.ndarray,
+        behavior_values: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
+        """Inner critic loss function for a single agent.
+
+        See critic_loss_grad_fn in on_training_loss_fns for the other parameters.
+
+        Args:
+            trainer: SystemTrainer.
+            network: the network used by the agent.
+        """
+
+        values = network.critic_network.apply(critic_params, observations)
+
+        # Value function loss. Exclude the bootstrap value
+        unclipped_value_error = target_values - values
+
+        unclipped_value_loss = trainer.store.value_loss_fn(unclipped_value_error)
+
+        value_clip_parameter = self.config.value_clip_parameter
+        if self.config.clip_value:
+            # Clip values to reduce variablility during critic training.
+
+            clipped_values = behavior_values + jnp.clip(
+                values - behavior_values,
+                -value_clip_parameter,
+                value_clip_parameter,
+            )
+            clipped_value_error = target_values - clipped_values
+            clipped_value_loss = trainer.store.value_loss_fn(clipped_value_error)
+            value_loss = jnp.mean(jnp.fmax(unclipped_value_loss, clipped_value_loss))
+        else:
+            value_loss = jnp.mean(unclipped_value_loss)
+
+        # TODO (Ruan): Including value loss parameter in the
+        # value loss for now but can add a flag
+        value_loss = value_loss * self.config.value_cost
+
+        loss_info_critic = {"loss_critic": value_loss}
+
+        return value_loss, loss_info_critic
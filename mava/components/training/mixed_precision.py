@@ -0,0 +1,101 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Trainer components for mixed precision training."""
+
+from dataclasses import dataclass, field
+from typing import List, Sequence, Type
+
+import haiku as hk
+import jmp
+
+from mava.callbacks import Callback
+from mava.components import Component
+from mava.core_jax import SystemTrainer
+
+
+@dataclass
+class MixedPrecisionConfig:
+    """Configuration for mixed precision training.
+
+    mixed_precision_modules are the outermost haiku modules of the networks,
+    hk.Sequential and hk.DeepRNN for the IPPO networks. Their inputs and
+    parameters are cast to mixed_precision_dtype, so every submodule computes
+    in that dtype, and their outputs are cast back to float32.
+    """
+
+    mixed_precision_dtype: str = "bfloat16"
+    mixed_precision_modules: Sequence[Type[hk.Module]] = field(
+        default_factory=lambda: [hk.Sequential, hk.DeepRNN]
+    )
+
+
+class MixedPrecision(Component):
+    def __init__(
+        self,
+        config: MixedPrecisionConfig = MixedPrecisionConfig(),
+    ):
+        """Component runs the network forward and backward passes in low precision.
+
+        The parameters and optimiser states are kept in float32 and the network
+        outputs, i.e. the policy distributions and values, are cast back to
+        float32 so that the losses are reduced in float32. Layer normalisation
+        is computed in float32.
+
+        Haiku precision policies are global to the process, so networks applied
+        by other nodes of a single process system also use them.
+
+        Args:
+            config: MixedPrecisionConfig.
+        """
+        self.config = config
+
+    def on_training_init_start(self, trainer: SystemTrainer) -> None:
+        """Set the haiku precision policies before the networks are traced.
+
+        Args:
+            trainer: SystemTrainer.
+
+        Returns:
+            None.
+        """
+        dtype = self.config.mixed_precision_dtype
+        network_policy = jmp.get_policy(
+            f"params=float32,compute={dtype},output=float32"
+        )
+        for module in self.config.mixed_precision_modules:
+            hk.mixed_precision.set_policy(module, network_policy)
+
+        # Normalisation statistics are not stable in low precision.
+        norm_policy = jmp.get_policy(f"params=float32,compute=float32,output={dtype}")
+        hk.mixed_precision.set_policy(hk.LayerNorm, norm_policy)
+
+        trainer.store.mixed_precision_policy = network_policy
+
+    @staticmethod
+    def name() -> str:
+        """Static method that returns component name."""
+        return "mixed_precision"
+
+    @staticmethod
+    def required_components() -> List[Type[Callback]]:
+        """List of other Components required for this Component to function.
+
+        None required.
+
+        Returns:
+            List of required component classes.
+        """
+        return []
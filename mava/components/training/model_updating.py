@@ -17,7 +17,7 @@
 
 import abc
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 import jax
 import jax.numpy as jnp
@@ -28,7 +28,7 @@ from jax.random import KeyArray
 
 from mava import constants
 from mava.callbacks import Callback
-from mava.components.building.optimisers import Optimisers
+from mava.components.building.optimisers import Optimisers, get_network_optimisers
 from mava.components.training.base import Batch, Utility
 from mava.components.training.losses import Loss
 from mava.components.training.step import Step
@@ -36,6 +36,130 @@ from mava.components.training.trainer import BaseTrainerInit
 from mava.core_jax import SystemTrainer
 
 
+def _average_agent_gradients(
+    trainer: SystemTrainer, gradients: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Averages the gradients of the agents that share a network."""
+    agent_gradients: Dict[str, List[Any]] = {}
+    for agent_key in trainer.store.trainer_agents:
+        agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
+        agent_gradients.setdefault(agent_net_key, []).append(gradients[agent_key])
+    return {
+        net_key: jax.tree_util.tree_map(lambda *x: sum(x) / len(x), *net_gradients)
+        for net_key, net_gradients in agent_gradients.items()
+    }
+
+
+def _group_networks_by_optimiser(
+    optimisers: Dict[str, optax.GradientTransformation]
+) -> List[Tuple[optax.GradientTransformation, List[str]]]:
+    """Groups the networks that use the same optimiser, keeping their order."""
+    groups: Dict[int, Tuple[optax.GradientTransformation, List[str]]] = {}
+    for net_key, optimiser in optimisers.items():
+        groups.setdefault(id(optimiser), (optimiser, []))[1].append(net_key)
+    return list(groups.values())
+
+
+def _combine_opt_states(
+    optimiser: optax.GradientTransformation,
+    opt_states: Dict[str, Any],
+    params: Dict[str, Any],
+) -> Any:
+    """Combines the optimiser states of networks into the state of their params.
+
+    The nodes of the combined state that mirror the combined params, such as
+    the adam moments, are keyed by network and filled with the matching nodes
+    of the network states. The other nodes, such as the step counts, are
+    shared by networks that are updated together and are taken from the
+    first network.
+    """
+    combined_structure = jax.tree_util.tree_structure(params)
+
+    def is_combined_node(node: Any) -> bool:
+        """Whether a node of the state mirrors the combined params."""
+        return jax.tree_util.tree_structure(node) == combined_structure
+
+    net_keys = list(params.keys())
+    return jax.tree_util.tree_map(
+        lambda template, *nodes: dict(zip(net_keys, nodes))
+        if is_combined_node(template)
+        else nodes[0],
+        jax.eval_shape(optimiser.init, params),
+        *[opt_states[net_key] for net_key in net_keys],
+        is_leaf=is_combined_node,
+    )
+
+
+def _split_opt_state(opt_state: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Splits the optimiser state of combined network params into network states.
+
+    Inverse of _combine_opt_states.
+    """
+    combined_structure = jax.tree_util.tree_structure(params)
+
+    def is_combined_node(node: Any) -> bool:
+        """Whether a node of the state mirrors the combined params."""
+        return jax.tree_util.tree_structure(node) == combined_structure
+
+    return {
+        net_key: jax.tree_util.tree_map(
+            lambda node: node[net_key] if is_combined_node(node) else node,
+            opt_state,
+            is_leaf=is_combined_node,
+        )
+        for net_key in params
+    }
+
+
+def _fused_update(
+    params: Dict[str, Any],
+    opt_states: Dict[str, Any],
+    gradients: Dict[str, Any],
+    optimisers: Dict[str, optax.GradientTransformation],
+) -> Tuple[Dict[str, jnp.ndarray], Dict[str, jnp.ndarray]]:
+    """Applies one optimiser update per distinct optimiser to the networks.
+
+    The networks that share an optimiser are updated by a single update over
+    their combined params, so their gradients are also clipped by their
+    global norm. Networks with their own optimiser settings get their own
+    update, as with a multi_transform label per optimiser. The params and
+    optimiser states are updated in place.
+
+    Args:
+        params: params of each network.
+        opt_states: optimiser states of each network.
+        gradients: gradients of each network.
+        optimisers: optimiser of each network.
+
+    Returns:
+        The gradient and update norms of each network.
+    """
+    gradient_norms = {}
+    update_norms = {}
+    for optimiser, net_keys in _group_networks_by_optimiser(optimisers):
+        net_params = {net_key: params[net_key] for net_key in net_keys}
+        net_gradients = {net_key: gradients[net_key] for net_key in net_keys}
+        opt_state = _combine_opt_states(
+            optimiser,
+            {
+                net_key: opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+                for net_key in net_keys
+            },
+            net_params,
+        )
+
+        updates, opt_state = optimiser.update(net_gradients, opt_state, net_params)
+        new_params = optax.apply_updates(net_params, updates)
+        net_opt_states = _split_opt_state(opt_state, net_params)
+
+        for net_key in net_keys:
+            params[net_key] = new_params[net_key]
+            opt_states[net_key][constants.OPT_STATE_DICT_KEY] = net_opt_states[net_key]
+            gradient_norms[net_key] = optax.global_norm(net_gradients[net_key])
+            update_norms[net_key] = optax.global_norm(updates[net_key])
+    return gradient_norms, update_norms
+
+
 class MinibatchUpdate(Utility):
     @abc.abstractmethod
     def __init__(self, config: Any) -> None:
@@ -49,7 +173,7 @@ class MinibatchUpdate(Utility):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseTrainerInit required to set up trainer.store.trainer_agents and
         trainer.store.trainer_agent_net_keys
@@ -66,7 +190,26 @@ class MinibatchUpdate(Utility):
 
 @dataclass
 class MAPGMinibatchUpdateConfig:
+    """Configuration for the MAPG mini-batch update.
+
+    num_microbatches splits every minibatch into that many micro-batches. Their
+    gradients are accumulated in a scan and averaged before a single optimiser
+    update, so peak memory scales with the micro-batch size instead of the
+    minibatch size. For recurrent policies, the number of sequences in a
+    minibatch must be divisible by num_microbatches.
+
+    fuse_network_updates updates the policy networks that share an optimiser
+    with a single optimiser update over their combined params, and likewise
+    the critic networks, instead of making one update per agent. Their
+    gradients are then clipped by their joint global norm. Networks with
+    their own optimiser settings are updated separately. Agents that share a
+    network are updated with the mean of their gradients, as when the loss
+    vectorises the agents.
+    """
+
     normalize_advantage: bool = True
+    num_microbatches: int = 1
+    fuse_network_updates: bool = False
 
 
 class MAPGMinibatchUpdate(MinibatchUpdate):
@@ -112,73 +255,209 @@ class MAPGMinibatchUpdate(MinibatchUpdate):
             else:
                 advantages = minibatch.advantages
 
-            # Calculate the gradients and agent metrics.
-            policy_gradients, policy_agent_metrics = trainer.store.policy_grad_fn(
-                policy_params,
-                minibatch.policy_states,
-                minibatch.observations,
-                minibatch.actions,
-                minibatch.behavior_log_probs,
-                advantages,
-            )
+            def compute_gradients(
+                batch: Batch, batch_advantages: Any
+            ) -> Tuple[Tuple[Any, Any], Tuple[Any, Any]]:
+                """Computes the policy and critic gradients and agent metrics."""
+                # Calculate the gradients and agent metrics.
+                policy_gradients, policy_agent_metrics = trainer.store.policy_grad_fn(
+                    policy_params,
+                    batch.policy_states,
+                    batch.observations,
+                    batch.actions,
+                    batch.behavior_log_probs,
+                    batch_advantages,
+                )
 
-            # Calculate the gradients and agent metrics.
-            critic_gradients, critic_agent_metrics = trainer.store.critic_grad_fn(
-                critic_params,
-                minibatch.observations,
-                minibatch.target_values,
-                minibatch.behavior_values,
-            )
+                # Calculate the gradients and agent metrics.
+                critic_gradients, critic_agent_metrics = trainer.store.critic_grad_fn(
+                    critic_params,
+                    batch.observations,
+                    batch.target_values,
+                    batch.behavior_values,
+                )
+                return (policy_gradients, critic_gradients), (
+                    policy_agent_metrics,
+                    critic_agent_metrics,
+                )
+
+            num_microbatches = self.config.num_microbatches
+            if num_microbatches == 1:
+                gradients, agent_metrics = compute_gradients(minibatch, advantages)
+            else:
+                minibatch_size = jax.tree_util.tree_leaves(minibatch.advantages)[
+                    0
+                ].shape[0]
+                assert minibatch_size % num_microbatches == 0, (
+                    "Num microbatches must divide the minibatch size. Got"
+                    " minibatch_size={} num_microbatches={}."
+                ).format(minibatch_size, num_microbatches)
+
+                microbatches = jax.tree_util.tree_map(
+                    lambda x: jnp.reshape(
+                        x, [num_microbatches, -1] + list(x.shape[1:])
+                    ),
+                    (minibatch, advantages),
+                )
+
+                def accumulate_gradients(
+                    gradients_sum: Tuple[Any, Any], microbatch: Tuple[Batch, Any]
+                ) -> Tuple[Tuple[Any, Any], Tuple[Any, Any]]:
+                    """Adds the gradients of one micro-batch to the sum."""
+                    gradients, agent_metrics = compute_gradients(*microbatch)
+                    gradients_sum = jax.tree_util.tree_map(
+                        jnp.add, gradients_sum, gradients
+                    )
+                    return gradients_sum, agent_metrics
+
+                gradients_shape, _ = jax.eval_shape(
+                    compute_gradients,
+                    *jax.tree_util.tree_map(lambda x: x[0], microbatches),
+                )
+                gradients_sum, agent_metrics = jax.lax.scan(
+                    accumulate_gradients,
+                    jax.tree_util.tree_map(
+                        lambda x: jnp.zeros(x.shape, x.dtype), gradients_shape
+                    ),
+                    microbatches,
+                )
+
+                # The micro-batches are equally sized, so the mean of their
+                # gradients is the gradient of the whole minibatch.
+                gradients = jax.tree_util.tree_map(
+                    lambda x: x / num_microbatches, gradients_sum
+                )
+                agent_metrics = jax.tree_util.tree_map(
+                    lambda x: jnp.mean(x, axis=0), agent_metrics
+                )
+
+            policy_gradients, critic_gradients = gradients
+            policy_agent_metrics, critic_agent_metrics = agent_metrics
+
+            # Average the gradients over the devices when training data parallel.
+            if hasattr(trainer.store, "data_parallel") and trainer.store.data_parallel:
+                policy_gradients, critic_gradients = jax.lax.pmean(
+                    (policy_gradients, critic_gradients),
+                    axis_name=constants.DATA_PARALLEL_AXIS_NAME,
+                )
+
+            def update_network(
+                net_key: str, policy_grads: Any, critic_grads: Any
+            ) -> Tuple[Dict[str, jnp.ndarray], Dict[str, jnp.ndarray]]:
+                """Applies one optimiser update to a policy and critic network."""
+                policy_optimiser, critic_optimiser = get_network_optimisers(
+                    trainer.store, net_key
+                )
 
-            metrics = {}
-            for agent_key in trainer.store.trainer_agents:
-                agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
                 # Update the policy networks and optimisers.
                 # Apply updates
-                # TODO (dries): Use one optimiser per network type here and not
-                # just one.
                 (
                     policy_updates,
-                    policy_opt_states[agent_net_key][constants.OPT_STATE_DICT_KEY],
-                ) = trainer.store.policy_optimiser.update(
-                    policy_gradients[agent_key],
-                    policy_opt_states[agent_net_key][constants.OPT_STATE_DICT_KEY],
+                    policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY],
+                ) = policy_optimiser.update(
+                    policy_grads,
+                    policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY],
                 )
-                policy_params[agent_net_key] = optax.apply_updates(
-                    policy_params[agent_net_key], policy_updates
+                policy_params[net_key] = optax.apply_updates(
+                    policy_params[net_key], policy_updates
                 )
 
-                policy_agent_metrics[agent_key]["norm_policy_grad"] = optax.global_norm(
-                    policy_gradients[agent_key]
-                )
-                policy_agent_metrics[agent_key][
-                    "norm_policy_updates"
-                ] = optax.global_norm(policy_updates)
-                metrics[agent_key] = policy_agent_metrics[agent_key]
-
                 # Update the critic networks and optimisers.
                 # Apply updates
-                # TODO (dries): Use one optimiser per network type here and not
-                # just one.
                 (
                     critic_updates,
-                    critic_opt_states[agent_net_key][constants.OPT_STATE_DICT_KEY],
-                ) = trainer.store.critic_optimiser.update(
-                    critic_gradients[agent_key],
-                    critic_opt_states[agent_net_key][constants.OPT_STATE_DICT_KEY],
+                    critic_opt_states[net_key][constants.OPT_STATE_DICT_KEY],
+                ) = critic_optimiser.update(
+                    critic_grads,
+                    critic_opt_states[net_key][constants.OPT_STATE_DICT_KEY],
                 )
-                critic_params[agent_net_key] = optax.apply_updates(
-                    critic_params[agent_net_key], critic_updates
+                critic_params[net_key] = optax.apply_updates(
+                    critic_params[net_key], critic_updates
                 )
 
-                critic_agent_metrics[agent_key]["norm_critic_grad"] = optax.global_norm(
-                    critic_gradients[agent_key]
+                policy_metrics = {
+                    "norm_policy_grad": optax.global_norm(policy_grads),
+                    "norm_policy_updates": optax.global_norm(policy_updates),
+                }
+                critic_metrics = {
+                    "norm_critic_grad": optax.global_norm(critic_grads),
+                    "norm_critic_updates": optax.global_norm(critic_updates),
+                }
+                return policy_metrics, critic_metrics
+
+            # The loss returns one gradient per network if the agents that share
+            # a network were vectorised, otherwise one gradient per agent.
+            vectorise_agents = (
+                hasattr(trainer.store, "vectorise_agents")
+                and trainer.store.vectorise_agents
+            )
+            fuse_network_updates = self.config.fuse_network_updates
+            if fuse_network_updates:
+                if not vectorise_agents:
+                    policy_gradients = _average_agent_gradients(
+                        trainer, policy_gradients
+                    )
+                    critic_gradients = _average_agent_gradients(
+                        trainer, critic_gradients
+                    )
+
+                net_keys = list(policy_gradients.keys())
+                network_optimisers = {
+                    net_key: get_network_optimisers(trainer.store, net_key)
+                    for net_key in net_keys
+                }
+                norm_policy_grads, norm_policy_updates = _fused_update(
+                    policy_params,
+                    policy_opt_states,
+                    policy_gradients,
+                    {net_key: network_optimisers[net_key][0] for net_key in net_keys},
+                )
+                norm_critic_grads, norm_critic_updates = _fused_update(
+                    critic_params,
+                    critic_opt_states,
+                    critic_gradients,
+                    {net_key: network_optimisers[net_key][1] for net_key in net_keys},
                 )
-                critic_agent_metrics[agent_key][
-                    "norm_critic_updates"
-                ] = optax.global_norm(critic_updates)
+                network_metrics = {
+                    net_key: (
+                        {
+                            "norm_policy_grad": norm_policy_grads[net_key],
+                            "norm_policy_updates": norm_policy_updates[net_key],
+                        },
+                        {
+                            "norm_critic_grad": norm_critic_grads[net_key],
+                            "norm_critic_updates": norm_critic_updates[net_key],
+                        },
+                    )
+                    for net_key in net_keys
+                }
+            elif vectorise_agents:
+                network_metrics = {
+                    net_key: update_network(
+                        net_key, policy_gradients[net_key], critic_gradients[net_key]
+                    )
+                    for net_key in policy_gradients.keys()
+                }
+
+            metrics = {}
+            for agent_key in trainer.store.trainer_agents:
+                agent_net_key = trainer.store.trainer_agent_net_keys[agent_key]
+                if vectorise_agents or fuse_network_updates:
+                    policy_metrics, critic_metrics = network_metrics[agent_net_key]
+                else:
+                    policy_metrics, critic_metrics = update_network(
+                        agent_net_key,
+                        policy_gradients[agent_key],
+                        critic_gradients[agent_key],
+                    )
+
                 # TODO (Ruan): double check that this was done correctly
-                metrics[agent_key].update(critic_agent_metrics[agent_key])
+                metrics[agent_key] = {
+                    **policy_agent_metrics[agent_key],
+                    **policy_metrics,
+                    **critic_agent_metrics[agent_key],
+                    **critic_metrics,
+                }
 
             return (
                 policy_params,
@@ -203,7 +482,7 @@ class EpochUpdate(Utility):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         MinibatchUpdate required to set up trainer.store.minibatch_update_fn.
 
@@ -215,8 +494,17 @@ class EpochUpdate(Utility):
 
 @dataclass
 class MAPGEpochUpdateConfig:
+    """Configuration for the MAPG epoch update.
+
+    If target_kl is set, the trainer step stops running epochs once the
+    approximate KL between the behaviour policy and the updated policy,
+    averaged over the minibatches of an epoch, exceeds it for any agent. At
+    least one epoch is always run.
+    """
+
     num_epochs: int = 4
     num_minibatches: int = 1
+    target_kl: Optional[float] = None
 
 
 class MAPGEpochUpdate(EpochUpdate):
@@ -242,6 +530,7 @@ class MAPGEpochUpdate(EpochUpdate):
         """
         trainer.store.num_epochs = self.config.num_epochs
         trainer.store.num_minibatches = self.config.num_minibatches
+        trainer.store.target_kl = self.config.target_kl
 
         def model_update_epoch(
             carry: Tuple[KeyArray, Any, Any, optax.OptState, optax.OptState, Batch],
@@ -262,25 +551,36 @@ class MAPGEpochUpdate(EpochUpdate):
 
             base_key, shuffle_key = jax.random.split(key)
 
-            permutation = jax.random.permutation(
-                shuffle_key, trainer.store.epoch_batch_size
+            # The batch is a shard of the epoch batch when training data parallel.
+            advantages = jax.tree_util.tree_leaves(batch.advantages)[0]
+            batch_size = advantages.shape[0]
+            sequence_length = merge_leading_dims(advantages, 2).shape[0] // batch_size
+            permutation = jax.random.permutation(shuffle_key, batch_size)
+
+            # Index the flattened batch with the time steps of the permuted
+            # sequences, so that only one minibatch is gathered at a time
+            # instead of a shuffled copy of the whole batch.
+            flat_permutation = jnp.reshape(
+                permutation[:, None] * sequence_length
+                + jnp.arange(sequence_length)[None, :],
+                [self.config.num_minibatches, -1],
             )
-
-            shuffled_batch = jax.tree_util.tree_map(
-                lambda x: jnp.take(x, permutation, axis=0), batch
-            )
-
-            # Flatten the batch.
-            shuffled_batch = jax.tree_util.tree_map(
-                lambda x: merge_leading_dims(x, 2), shuffled_batch
+            flat_batch = jax.tree_util.tree_map(
+                lambda x: merge_leading_dims(x, 2), batch
             )
 
-            minibatches = jax.tree_util.tree_map(
-                lambda x: jnp.reshape(
-                    x, [self.config.num_minibatches, -1] + list(x.shape[1:])
-                ),
-                shuffled_batch,
-            )
+            def minibatch_update(
+                carry: Tuple[Any, Any, optax.OptState, optax.OptState],
+                minibatch_indices: jnp.ndarray,
+            ) -> Tuple[
+                Tuple[Any, Any, optax.OptState, optax.OptState],
+                Dict[str, jnp.ndarray],
+            ]:
+                """Gathers a minibatch and updates the model on it."""
+                minibatch = jax.tree_util.tree_map(
+                    lambda x: jnp.take(x, minibatch_indices, axis=0), flat_batch
+                )
+                return trainer.store.minibatch_update_fn(carry, minibatch)
 
             (
                 new_policy_params,
@@ -288,9 +588,9 @@ class MAPGEpochUpdate(EpochUpdate):
                 new_policy_opt_states,
                 new_critic_opt_states,
             ), metrics = jax.lax.scan(
-                trainer.store.minibatch_update_fn,
+                minibatch_update,
                 (policy_params, critic_params, policy_opt_states, critic_opt_states),
-                minibatches,
+                flat_permutation,
                 length=self.config.num_minibatches,
             )
 
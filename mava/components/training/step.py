@@ -42,11 +42,13 @@ from mava.components.training.base import Batch, TrainingState
 from mava.components.training.trainer import BaseTrainerInit
 from mava.core_jax import SystemTrainer
 from mava.utils.jax_training_utils import denormalize, normalize
+from mava.utils.jax_tree_utils import stack_trees
 
 
 @dataclass
 class TrainerStepConfig:
     random_key: int = 42
+    metrics_log_interval: int = 1
 
 
 class TrainerStep(Component):
@@ -94,11 +96,27 @@ class DefaultTrainerStep(TrainerStep):
         Sample -> execute step function -> sync parameter client
         -> update counts -> log.
 
+        With a metrics_log_interval above one, the step metrics are summed on
+        the device and their mean is only transferred to the host and logged
+        every metrics_log_interval steps.
+
         Args:
             config: TrainerStepConfig.
         """
         self.config = config
 
+    def on_training_init(self, trainer: SystemTrainer) -> None:
+        """Set up the accumulated step metrics.
+
+        Args:
+            trainer: SystemTrainer.
+
+        Returns:
+            None.
+        """
+        trainer.store.accumulated_metrics = None
+        trainer.store.num_accumulated_steps = 0
+
     def on_training_step(self, trainer: SystemTrainer) -> None:
         """Does a step of SGD and logs the results.
 
@@ -109,8 +127,26 @@ class DefaultTrainerStep(TrainerStep):
             None.
         """
 
+        log_data_wait_time = (
+            hasattr(trainer.store, "log_data_wait_time")
+            and trainer.store.log_data_wait_time
+        )
+        num_sgd_steps = (
+            trainer.store.num_sgd_steps_per_dispatch
+            if hasattr(trainer.store, "num_sgd_steps_per_dispatch")
+            else 1
+        )
+
         # Do a batch of SGD.
-        sample = next(trainer.store.dataset_iterator)
+        data_wait_time = 0.0
+        samples = []
+        for _ in range(num_sgd_steps):
+            samples.append(next(trainer.store.dataset_iterator))
+            if log_data_wait_time:
+                data_wait_time += trainer.store.dataset_iterator.wait_time
+
+        # Several samples are stacked to be consumed by a single step function call.
+        sample = samples[0] if num_sgd_steps == 1 else stack_trees(samples)
 
         results = trainer.store.step_fn(sample)
 
@@ -128,12 +164,41 @@ class DefaultTrainerStep(TrainerStep):
         trainer.store.timestamp = timestamp
 
         trainer.store.trainer_parameter_client.add_async(
-            {"trainer_steps": 1, "trainer_walltime": elapsed_time},
+            {"trainer_steps": num_sgd_steps, "trainer_walltime": elapsed_time},
         )
 
         # Update the variable source and the trainer.
         trainer.store.trainer_parameter_client.set_and_get_async()
 
+        # Time spent waiting on the prefetched samples.
+        if log_data_wait_time:
+            results["data_wait_time"] = data_wait_time
+
+        # Time spent compiling the step function before training.
+        if hasattr(trainer.store, "step_compile_time"):
+            results["step_compile_time"] = trainer.store.step_compile_time
+
+        if self.config.metrics_log_interval > 1:
+            # Sum the metrics on the device to not block on every step.
+            if trainer.store.accumulated_metrics is None:
+                trainer.store.accumulated_metrics = results
+            else:
+                trainer.store.accumulated_metrics = jax.tree_util.tree_map(
+                    jnp.add, trainer.store.accumulated_metrics, results
+                )
+            trainer.store.num_accumulated_steps += 1
+            if trainer.store.num_accumulated_steps < self.config.metrics_log_interval:
+                return
+
+            num_steps = trainer.store.num_accumulated_steps
+            results = jax.device_get(
+                jax.tree_util.tree_map(
+                    lambda x: x / num_steps, trainer.store.accumulated_metrics
+                )
+            )
+            trainer.store.accumulated_metrics = None
+            trainer.store.num_accumulated_steps = 0
+
         # Add the trainer counts.
         results.update(trainer.store.trainer_counts)
 
@@ -176,7 +241,33 @@ class Step(Component):
 
 @dataclass
 class MAPGWithTrustRegionStepConfig:
+    """Configuration for the MAPGWithTrustRegion step.
+
+    donate_training_state lets XLA reuse the buffers of the incoming training
+    state for the updated one. It only applies when the system runs with
+    multi_process, since a single process parameter server shares the
+    trainer's parameter buffers with the executors.
+
+    data_parallel splits the batch dimension of every sample across
+    jax.local_devices() and averages the gradients over the devices. The
+    training state is replicated on every device. On a CPU only host, more
+    devices can be exposed with
+    XLA_FLAGS=--xla_force_host_platform_device_count=<num_devices>.
+
+    num_sgd_steps_per_dispatch runs that many SGD steps, each on its own
+    sample, inside a single jitted call. The trainer step stacks the samples
+    and the metrics are averaged over the steps, so parameter syncing and
+    logging happen once per dispatch.
+
+    log_batch_statistics adds the mean and standard deviation of the
+    observations and rewards of the whole batch to the metrics.
+    """
+
     discount: float = 0.99
+    donate_training_state: bool = True
+    data_parallel: bool = False
+    num_sgd_steps_per_dispatch: int = 1
+    log_batch_statistics: bool = False
 
 
 class MAPGWithTrustRegionStep(Step):
@@ -201,8 +292,86 @@ class MAPGWithTrustRegionStep(Step):
         Returns:
             None.
         """
+        trainer.store.data_parallel = self.config.data_parallel
+        num_sgd_steps = self.config.num_sgd_steps_per_dispatch
+        assert num_sgd_steps >= 1, (
+            "num_sgd_steps_per_dispatch must be positive. Got {}."
+        ).format(num_sgd_steps)
+        trainer.store.num_sgd_steps_per_dispatch = num_sgd_steps
+        devices = jax.local_devices()
+        axis_name = constants.DATA_PARALLEL_AXIS_NAME
+
+        def all_gather_batch(tree: Any) -> Any:
+            """Gather the batch shards of all devices when running data parallel."""
+            if not self.config.data_parallel:
+                return tree
+            return jax.tree_util.tree_map(
+                lambda x: jax.lax.all_gather(x, axis_name, tiled=True), tree
+            )
+
+        def local_batch(tree: Any, batch_size: int) -> Any:
+            """Select this device's shard of a gathered batch."""
+            if not self.config.data_parallel:
+                return tree
+            start = jax.lax.axis_index(axis_name) * batch_size
+            return jax.tree_util.tree_map(
+                lambda x: jax.lax.dynamic_slice_in_dim(x, start, batch_size), tree
+            )
+
+        target_kl = (
+            trainer.store.target_kl if hasattr(trainer.store, "target_kl") else None
+        )
+
+        def epoch_update(carry: Tuple) -> Tuple[Tuple, Dict[str, jnp.ndarray]]:
+            """Runs one epoch update and averages its metrics."""
+            carry, metrics = trainer.store.epoch_update_fn(carry, ())
+            return carry, jax.tree_util.tree_map(jnp.mean, metrics)
+
+        def approx_kl(metrics: Dict[str, Any]) -> jnp.ndarray:
+            """Largest mean approximate KL of the agents over an epoch."""
+            kl = jnp.max(jnp.stack([metrics[agent]["approx_kl"] for agent in metrics]))
+            if self.config.data_parallel:
+                # All devices must run the same number of epochs.
+                kl = jax.lax.pmean(kl, axis_name)
+            return kl
+
+        def run_epochs(carry: Tuple) -> Tuple[Tuple, Dict[str, jnp.ndarray]]:
+            """Runs the epoch updates and averages their metrics.
+
+            Without a target KL every epoch is run in a scan. Otherwise the
+            epochs after the first are run in a while loop that stops once the
+            approximate KL of an epoch exceeds the target, and the number of
+            epochs run is added to the metrics.
+            """
+            num_epochs = trainer.store.global_config.num_epochs
+            if target_kl is None:
+                carry, metrics = jax.lax.scan(
+                    trainer.store.epoch_update_fn, carry, (), length=num_epochs
+                )
+                return carry, jax.tree_util.tree_map(jnp.mean, metrics)
+
+            def cond_fn(loop_state: Tuple) -> jnp.ndarray:
+                """Continue while epochs are left and the KL is below the target."""
+                _, _, num_epochs_run, kl = loop_state
+                return jnp.logical_and(num_epochs_run < num_epochs, kl <= target_kl)
+
+            def body_fn(loop_state: Tuple) -> Tuple:
+                """Runs one more epoch and adds its metrics to the sum."""
+                carry, metrics_sum, num_epochs_run, _ = loop_state
+                carry, metrics = epoch_update(carry)
+                metrics_sum = jax.tree_util.tree_map(jnp.add, metrics_sum, metrics)
+                return carry, metrics_sum, num_epochs_run + 1, approx_kl(metrics)
+
+            carry, metrics = epoch_update(carry)
+            carry, metrics_sum, num_epochs_run, _ = jax.lax.while_loop(
+                cond_fn,
+                body_fn,
+                (carry, metrics, jnp.array(1, jnp.int32), approx_kl(metrics)),
+            )
+            metrics = jax.tree_util.tree_map(lambda x: x / num_epochs_run, metrics_sum)
+            metrics["num_epochs_run"] = num_epochs_run
+            return carry, metrics
 
-        @jit
         def sgd_step(
             states: TrainingState, sample: reverb.ReplaySample
         ) -> Tuple[TrainingState, Dict[str, jnp.ndarray]]:
@@ -228,18 +397,22 @@ class MAPGWithTrustRegionStep(Step):
             )
 
             # Perform observation normalization if neccesary before proceeding
+            # The running statistics are computed over the full batch so that
+            # they stay identical on every device.
             observation_stats = states.observation_stats
             if (
                 trainer.has(ObservationNormalisation)
                 and trainer.store.global_config.normalise_observations
             ):
-                for key in observations.keys():
-                    (
-                        observation_stats[key],
-                        observations[key],
-                    ) = trainer.store.norm_obs_running_stats_fn(
-                        observation_stats[key], observations[key]
-                    )
+                # All agents are normalised in a single vectorised update.
+                local_batch_size = list(observations.values())[0].observation.shape[0]
+                (
+                    observation_stats,
+                    normalised_observations,
+                ) = trainer.store.norm_obs_running_stats_fn(
+                    observation_stats, all_gather_batch(observations)
+                )
+                observations = local_batch(normalised_observations, local_batch_size)
 
             discounts = tree.map_structure(
                 lambda x: x * self.config.discount, termination
@@ -287,17 +460,36 @@ class MAPGWithTrustRegionStep(Step):
 
             advantages = {}
             target_values = {}
-            for key in rewards.keys():
-                advantages[key], target_values[key] = batch_gae_advantages(
-                    rewards[key], discounts[key], behavior_values[key]
+            if (
+                hasattr(trainer.store, "gae_over_stacked_agents")
+                and trainer.store.gae_over_stacked_agents
+            ):
+                # Compute the advantages of all agents in one call by stacking
+                # the agents along a trailing dimension after time.
+                agent_keys = list(rewards.keys())
+                stacked_advantages, stacked_target_values = batch_gae_advantages(
+                    *[
+                        jnp.stack([agent_data[key] for key in agent_keys], axis=-1)
+                        for agent_data in [rewards, discounts, behavior_values]
+                    ]
                 )
+                for i, key in enumerate(agent_keys):
+                    advantages[key] = stacked_advantages[..., i]
+                    target_values[key] = stacked_target_values[..., i]
+            else:
+                for key in rewards.keys():
+                    advantages[key], target_values[key] = batch_gae_advantages(
+                        rewards[key], discounts[key], behavior_values[key]
+                    )
+
+            for key in rewards.keys():
                 if (
                     trainer.has(ValueNormalisation)
                     and trainer.store.global_config.normalise_target_values
                 ):
                     target_value_stats[key] = trainer.store.target_running_stats_fn(
                         target_value_stats[key],
-                        jnp.reshape(target_values[key], (-1, 1)),
+                        jnp.reshape(all_gather_batch(target_values[key]), (-1, 1)),
                     )
                     target_values[key] = normalize(
                         target_value_stats[key], target_values[key]
@@ -353,8 +545,7 @@ class MAPGWithTrustRegionStep(Step):
                 new_policy_opt_states,
                 new_critic_opt_states,
                 _,
-            ), metrics = jax.lax.scan(
-                trainer.store.epoch_update_fn,
+            ), metrics = run_epochs(
                 (
                     states.random_key,
                     states.policy_params,
@@ -362,37 +553,37 @@ class MAPGWithTrustRegionStep(Step):
                     states.policy_opt_states,
                     states.critic_opt_states,
                     trajectories,
-                ),
-                (),
-                length=trainer.store.global_config.num_epochs,
+                )
             )
 
             # Set the metrics
-            metrics = jax.tree_util.tree_map(jnp.mean, metrics)
             metrics["norm_policy_params"] = optax.global_norm(states.policy_params)
             metrics["norm_critic_params"] = optax.global_norm(states.critic_params)
-            metrics["observations_mean"] = jnp.mean(
-                utils.batch_concat(
-                    jax.tree_util.tree_map(
-                        lambda x: jnp.abs(jnp.mean(x, axis=(0, 1))), observations
-                    ),
-                    num_batch_dims=0,
+            if self.config.log_batch_statistics:
+                metrics["observations_mean"] = jnp.mean(
+                    utils.batch_concat(
+                        jax.tree_util.tree_map(
+                            lambda x: jnp.abs(jnp.mean(x, axis=(0, 1))), observations
+                        ),
+                        num_batch_dims=0,
+                    )
                 )
-            )
-            metrics["observations_std"] = jnp.mean(
-                utils.batch_concat(
-                    jax.tree_util.tree_map(
-                        lambda x: jnp.std(x, axis=(0, 1)), observations
-                    ),
-                    num_batch_dims=0,
+                metrics["observations_std"] = jnp.mean(
+                    utils.batch_concat(
+                        jax.tree_util.tree_map(
+                            lambda x: jnp.std(x, axis=(0, 1)), observations
+                        ),
+                        num_batch_dims=0,
+                    )
                 )
-            )
-            metrics["rewards_mean"] = jax.tree_util.tree_map(
-                lambda x: jnp.mean(jnp.abs(jnp.mean(x, axis=(0, 1)))), rewards
-            )
-            metrics["rewards_std"] = jax.tree_util.tree_map(
-                lambda x: jnp.std(x, axis=(0, 1)), rewards
-            )
+                metrics["rewards_mean"] = jax.tree_util.tree_map(
+                    lambda x: jnp.mean(jnp.abs(jnp.mean(x, axis=(0, 1)))), rewards
+                )
+                metrics["rewards_std"] = jax.tree_util.tree_map(
+                    lambda x: jnp.std(x, axis=(0, 1)), rewards
+                )
+            if self.config.data_parallel:
+                metrics = jax.lax.pmean(metrics, axis_name)
 
             new_states = TrainingState(
                 policy_params=new_policy_params,
@@ -405,6 +596,160 @@ class MAPGWithTrustRegionStep(Step):
             )
             return new_states, metrics
 
+        def multi_sgd_step(
+            states: TrainingState, samples: reverb.ReplaySample
+        ) -> Tuple[TrainingState, Dict[str, jnp.ndarray]]:
+            """Performs one SGD step per stacked sample in a single scan.
+
+            Args:
+                states: Training states (network params and optimiser states).
+                samples: Reverb samples stacked along a leading axis.
+
+            Returns:
+                Tuple[new state, metrics averaged over the steps].
+            """
+            new_states, metrics = jax.lax.scan(sgd_step, states, samples)
+            metrics = jax.tree_util.tree_map(lambda x: jnp.mean(x, axis=0), metrics)
+            return new_states, metrics
+
+        step_fn = multi_sgd_step if num_sgd_steps > 1 else sgd_step
+
+        # Donated buffers are invalid after the call, so only donate when no
+        # other node in this process holds a reference to the parameters.
+        donate_training_state = (
+            self.config.donate_training_state
+            and trainer.store.global_config.multi_process
+        )
+        donate_argnums = (0,) if donate_training_state else ()
+        if self.config.data_parallel:
+            step_fn = jax.pmap(
+                step_fn,
+                axis_name=axis_name,
+                devices=devices,
+                donate_argnums=donate_argnums,
+            )
+        else:
+            step_fn = jit(step_fn, donate_argnums=donate_argnums)
+
+        def replicate(tree: Any) -> Any:
+            """Place a copy of the tree on every local device."""
+            if not self.config.data_parallel:
+                return tree
+            return jax.device_put_replicated(tree, devices)
+
+        def unreplicate(tree: Any) -> Any:
+            """Take the copy of a replicated tree from the first device."""
+            if not self.config.data_parallel:
+                return tree
+            return jax.tree_util.tree_map(lambda x: x[0], tree)
+
+        def shard(sample: reverb.ReplaySample) -> reverb.ReplaySample:
+            """Split the batch dimension of the sample across local devices."""
+            if not self.config.data_parallel:
+                return sample
+            num_devices = len(devices)
+            # Stacked samples have a leading SGD step axis before the batch axis.
+            batch_axis = 0 if num_sgd_steps == 1 else 1
+            batch_size = jax.tree_util.tree_leaves(sample.data)[0].shape[batch_axis]
+            assert batch_size % num_devices == 0, (
+                "The number of local devices must divide the batch size. Got"
+                " batch_size={} num_devices={}."
+            ).format(batch_size, num_devices)
+
+            def split_batch(x: jnp.ndarray) -> jnp.ndarray:
+                """Split the batch axis and move the device axis to the front."""
+                x = jnp.reshape(
+                    x,
+                    x.shape[:batch_axis]
+                    + (num_devices, -1)
+                    + x.shape[batch_axis + 1 :],
+                )
+                return jnp.moveaxis(x, batch_axis, 0)
+
+            return jax.tree_util.tree_map(split_batch, sample)
+
+        trainer_networks = [
+            net_key
+            for net_key in trainer.store.networks.keys()
+            if net_key in set(trainer.store.trainer_agent_net_keys.values())
+        ]
+        trainer.store.training_state = None
+
+        def init_training_state() -> TrainingState:
+            """Gather the trainer's params and optimiser states into one state."""
+            networks = trainer.store.networks
+            return TrainingState(
+                policy_params={
+                    net_key: dict(networks[net_key].policy_params)
+                    for net_key in trainer_networks
+                },
+                critic_params={
+                    net_key: dict(networks[net_key].critic_params)
+                    for net_key in trainer_networks
+                },
+                policy_opt_states={
+                    net_key: dict(trainer.store.policy_opt_states[net_key])
+                    for net_key in trainer_networks
+                },
+                critic_opt_states={
+                    net_key: dict(trainer.store.critic_opt_states[net_key])
+                    for net_key in trainer_networks
+                },
+                random_key=trainer.store.base_key,
+                target_value_stats=trainer.store.norm_params[
+                    constants.VALUES_NORM_STATE_DICT_KEY
+                ],
+                observation_stats=trainer.store.norm_params[
+                    constants.OBS_NORM_STATE_DICT_KEY
+                ],
+            )
+
+        trainer.store.training_state_synced = True
+
+        def sync_training_state() -> None:
+            """Point the tracked params and optimiser states at the training state.
+
+            The training state is the source of truth during training. The
+            parameter client calls this before it sends the tracked params, so
+            the per network views are only updated when they are read rather
+            than after every step. They are updated in place to not lose the
+            references held by the parameter client.
+            """
+            if trainer.store.training_state_synced:
+                return
+            trainer.store.training_state_synced = True
+
+            # The parameter client tracks a single copy of the parameters.
+            new_states = unreplicate(trainer.store.training_state)
+            networks = trainer.store.networks
+            for net_key in trainer_networks:
+                networks[net_key].policy_params.update(
+                    new_states.policy_params[net_key]
+                )
+                networks[net_key].critic_params.update(
+                    new_states.critic_params[net_key]
+                )
+                trainer.store.policy_opt_states[net_key][
+                    constants.OPT_STATE_DICT_KEY
+                ] = new_states.policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+                trainer.store.critic_opt_states[net_key][
+                    constants.OPT_STATE_DICT_KEY
+                ] = new_states.critic_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+
+            # Update the observation and target value normalisation parameters
+            obs_norm_key = constants.OBS_NORM_STATE_DICT_KEY
+            values_norm_key = constants.VALUES_NORM_STATE_DICT_KEY
+            for group_key, group_stats in new_states.observation_stats.items():
+                trainer.store.norm_params[obs_norm_key][group_key].update(group_stats)
+            for agent in trainer.store.trainer_agent_net_keys.keys():
+                trainer.store.norm_params[values_norm_key][agent].update(
+                    new_states.target_value_stats[agent]
+                )
+
+        trainer.store.sync_training_state_fn = sync_training_state
+        if getattr(trainer.store, "trainer_parameter_client", None) is not None:
+            trainer.store.trainer_parameter_client.register_sync_fn(sync_training_state)
+
         def step(sample: reverb.ReplaySample) -> Tuple[Dict[str, jnp.ndarray]]:
             """Step over the reverb sample and update the parameters / optimiser states.
 
@@ -414,103 +759,59 @@ class MAPGWithTrustRegionStep(Step):
             Returns:
                 Metrics from SGD step.
             """
+            if trainer.store.training_state is None:
+                trainer.store.training_state = replicate(init_training_state())
 
             # Repeat training for the given number of epoch, taking a random
             # permutation for every epoch.
-            networks = trainer.store.networks
-            policy_params = {
-                net_key: networks[net_key].policy_params for net_key in networks.keys()
-            }
-            critic_params = {
-                net_key: networks[net_key].critic_params for net_key in networks.keys()
-            }
-            policy_opt_states = trainer.store.policy_opt_states
-            critic_opt_states = trainer.store.critic_opt_states
-
             _, random_key = jax.random.split(trainer.store.base_key)
-
-            target_value_stats = trainer.store.norm_params[
-                constants.VALUES_NORM_STATE_DICT_KEY
-            ]
-
-            observation_stats = trainer.store.norm_params[
-                constants.OBS_NORM_STATE_DICT_KEY
-            ]
-
-            states = TrainingState(
-                policy_params=policy_params,
-                critic_params=critic_params,
-                policy_opt_states=policy_opt_states,
-                critic_opt_states=critic_opt_states,
-                random_key=random_key,
-                target_value_stats=target_value_stats,
-                observation_stats=observation_stats,
+            states = trainer.store.training_state._replace(
+                random_key=replicate(random_key)
             )
 
-            new_states, metrics = sgd_step(states, sample)
+            # The store holds a single training state which is swapped for the
+            # new one, so the old buffers can be donated to the update.
+            trainer.store.training_state, metrics = step_fn(states, shard(sample))
+
+            metrics = unreplicate(metrics)
 
             # Set the new variables
             # TODO (dries): key is probably not being store correctly.
             # The variable client might lose reference to it when checkpointing.
             # We also need to add the optimiser and random_key to the variable
             # server.
-            trainer.store.base_key = new_states.random_key
+            trainer.store.base_key = unreplicate(
+                trainer.store.training_state.random_key
+            )
 
-            # These updates must remain separate for loops since the policy and critic
-            # networks could have different layers.
-            networks = trainer.store.networks
+            # The tracked params are only synced when they are read.
+            trainer.store.training_state_synced = False
 
-            policy_params = {
-                net_key: networks[net_key].policy_params for net_key in networks.keys()
-            }
-            for net_key in policy_params.keys():
-                # The for loop below is needed to not lose the param reference.
-                net_params = trainer.store.networks[net_key].policy_params
-                for param_key in net_params.keys():
-                    net_params[param_key] = new_states.policy_params[net_key][param_key]
+            return metrics
 
-                # Update the policy optimiser
-                # The opt_states need to be wrapped in a dict so as not to lose
-                # the reference.
+        def warmup(sample: reverb.ReplaySample) -> float:
+            """Compile the step function without updating the training state.
 
-                trainer.store.policy_opt_states[net_key][
-                    constants.OPT_STATE_DICT_KEY
-                ] = new_states.policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
-            critic_params = {
-                net_key: networks[net_key].critic_params for net_key in networks.keys()
-            }
-            for net_key in critic_params.keys():
-                # The for loop below is needed to not lose the param reference.
-                net_params = trainer.store.networks[net_key].critic_params
-                for param_key in net_params.keys():
-                    net_params[param_key] = new_states.critic_params[net_key][param_key]
-
-                # Update the critic optimiser
-                # The opt_states need to be wrapped in a dict so as not to lose
-                # the reference.
-                trainer.store.critic_opt_states[net_key][
-                    constants.OPT_STATE_DICT_KEY
-                ] = new_states.critic_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+            The step function is run once on a copy of the training state, so
+            the parameters, optimiser states and random key in the store are
+            left untouched and donated buffers are never the tracked ones.
 
-            # Update the observation normalization parameters
-            obs_norm_key = constants.OBS_NORM_STATE_DICT_KEY
-            for agent in trainer.store.trainer_agent_net_keys.keys():
-                for param_key in new_states.observation_stats[agent].keys():
-                    trainer.store.norm_params[obs_norm_key][agent][
-                        param_key
-                    ] = new_states.observation_stats[agent][param_key]
+            Args:
+                sample: Reverb sample with the shapes and dtypes of the dataset.
 
-            # update the running target stats
-            values_norm_key = constants.VALUES_NORM_STATE_DICT_KEY
-            for agent in trainer.store.trainer_agent_net_keys.keys():
-                for param_key in new_states.target_value_stats[agent].keys():
-                    trainer.store.norm_params[values_norm_key][agent][
-                        param_key
-                    ] = new_states.target_value_stats[agent][param_key]
+            Returns:
+                Time in seconds to compile and run the step function.
+            """
+            states = replicate(jax.tree_util.tree_map(jnp.copy, init_training_state()))
+            if num_sgd_steps > 1:
+                sample = stack_trees([sample] * num_sgd_steps)
 
-            return metrics
+            start_time = time.time()
+            jax.block_until_ready(step_fn(states, shard(sample)))
+            return time.time() - start_time
 
         trainer.store.step_fn = step
+        trainer.store.warmup_step_fn = warmup
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
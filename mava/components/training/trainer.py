@@ -25,7 +25,7 @@ from mava.callbacks import Callback
 from mava.components import Component
 from mava.components.building.environments import EnvironmentSpec
 from mava.components.building.networks import Networks
-from mava.components.building.optimisers import Optimisers
+from mava.components.building.optimisers import Optimisers, get_network_optimisers
 from mava.components.building.system_init import BaseSystemInit
 from mava.core_jax import SystemBuilder, SystemTrainer
 from mava.utils.sort_utils import sort_str_num
@@ -83,13 +83,16 @@ class BaseTrainerInit(Component):
         builder.store.policy_opt_states = {}
         builder.store.critic_opt_states = {}
         for net_key in builder.store.networks.keys():
+            policy_optimiser, critic_optimiser = get_network_optimisers(
+                builder.store, net_key
+            )
             builder.store.policy_opt_states[net_key] = {
-                constants.OPT_STATE_DICT_KEY: builder.store.policy_optimiser.init(
+                constants.OPT_STATE_DICT_KEY: policy_optimiser.init(
                     builder.store.networks[net_key].policy_params
                 )
             }  # pytype: disable=attribute-error
             builder.store.critic_opt_states[net_key] = {
-                constants.OPT_STATE_DICT_KEY: builder.store.critic_optimiser.init(
+                constants.OPT_STATE_DICT_KEY: critic_optimiser.init(
                     builder.store.networks[net_key].critic_params
                 )
             }  # pytype: disable=attribute-error
@@ -120,7 +123,7 @@ class BaseTrainerInit(Component):
 
     @staticmethod
     def required_components() -> List[Type[Callback]]:
-        """List of other Components required in the system for this Component to function.
+        """List of other Components required for this Component to function.
 
         BaseSystemInit required to set up builder.store.unique_net_keys
         and builder.store.network_sampling_setup.
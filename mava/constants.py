@@ -3,3 +3,4 @@ from typing_extensions import Final
 OPT_STATE_DICT_KEY: Final[str] = "opt_state"
 OBS_NORM_STATE_DICT_KEY: Final[str] = "obs_norm_params"
 VALUES_NORM_STATE_DICT_KEY: Final[str] = "values_norm_params"
+DATA_PARALLEL_AXIS_NAME: Final[str] = "devices"
@@ -17,7 +17,8 @@
 import copy
 import logging
 import time
-from typing import Any, Dict, Tuple
+from concurrent import futures
+from typing import Any, Dict, List, Optional, Tuple
 
 import acme
 import dm_env
@@ -27,7 +28,9 @@ import numpy as np
 from acme.utils import counting, loggers
 
 import mava
+from mava.environment_pool import SharedMemoryEnvironmentPool
 from mava.utils.checkpointing_utils import update_best_checkpoint, update_evaluator_net
+from mava.utils.jax_tree_utils import reset_stacked_tree, stack_trees
 from mava.utils.training_utils import check_count_condition
 from mava.utils.wrapper_utils import generate_zeros_from_spec
 
@@ -89,6 +92,11 @@ class ParallelEnvironmentLoop(acme.core.Worker):
     def _compute_step_statistics(self, rewards: Dict[str, float]) -> None:
         pass
 
+    def _get_executor_stats(self) -> Dict[str, float]:
+        """Return the stats recorded by the executor, if it records any."""
+        executor_stats = getattr(self._executor, "get_stats", None)
+        return executor_stats() if callable(executor_stats) else {}
+
     def _compute_episode_statistics(
         self,
         episode_returns: Dict[str, float],
@@ -127,25 +135,15 @@ class ParallelEnvironmentLoop(acme.core.Worker):
 
         # Make the first observation.
         self._executor.observe_first(timestep, extras=env_extras)
-        print('start running episode')
+
         # For evaluation, this keeps track of the total undiscounted reward
         # for each agent accumulated during the episode.
         rewards: Dict[str, float] = {}
-        rewards_SOC: Dict[str, float] = {}
-        rewards_loading: Dict[str, float] = {}
         episode_returns: Dict[str, float] = {}
-        episode_returns_SOC: Dict[str, float] = {}
-        episode_returns_loading: Dict[str, float] = {}
-        #actions: Dict[str, float] = {}
         for agent, spec in self._environment.reward_spec().items():
             rewards.update({agent: generate_zeros_from_spec(spec)})
-            rewards_SOC.update({agent: generate_zeros_from_spec(spec)})
-            rewards_load.update({agent: generate_zeros_from_spec(spec)})
             episode_returns.update({agent: generate_zeros_from_spec(spec)})
-            episode_returns_SOC.update({agent: generate_zeros_from_spec(spec)})
-            episode_returns_loading.update({agent: generate_zeros_from_spec(spec)})
-            #actions.update({agent: generate_zeros_from_spec(spec)})
-        print('dict created')
+
         # Run an episode.
         while not timestep.last():
 
@@ -165,11 +163,8 @@ class ParallelEnvironmentLoop(acme.core.Worker):
                 timestep, env_extras = timestep
             else:
                 env_extras = {}
-            print('extract reward')
+
             rewards = timestep.reward
-            print('extract reward SOC')
-            rewards_SOC = self._environment.world.SOC_reward
-            rewards_loading = self._environment.world.loading_reward
 
             # Have the agent observe the timestep and let the actor update itself.
             self._executor.observe(
@@ -181,50 +176,40 @@ class ParallelEnvironmentLoop(acme.core.Worker):
 
             # Book-keeping.
             episode_steps += 1
-            print('step statistics')
+
             self._compute_step_statistics(rewards)
 
             for agent, reward in rewards.items():
                 episode_returns[agent] = episode_returns[agent] + reward
-                print('assigning rewards to agents')
-                episode_returns_SOC[agent] = episode_returns_SOC[agent] + rewards_SOC[agent]
-                episode_returns_loading[agent] = episode_returns_loading[agent] + rewards_loading[agent]
-        print('ep statistics')
+
         self._compute_episode_statistics(
             episode_returns,
-            episode_returns_SOC,
-            episode_returns_loading
             episode_steps,
             start_time,
         )
-        print('ep statistics end')
         if self._get_running_stats():
-            return self._get_running_stats()
+            result = dict(self._get_running_stats())
         else:
             counts = self.record_counts(episode_steps)
 
             # Collect the results and combine with counts.
             steps_per_second = episode_steps / (time.time() - start_time)
-            print('collecting results')
             result = {
                 "episode_length": episode_steps,
                 "mean_episode_return": np.mean(list(episode_returns.values())),
-                "mean_episode_return_SOC": np.mean(list(episode_returns_SOC.values())),
-                "mean_episode_return_loading": np.mean(list(episode_returns_loading.values())),
                 "steps_per_second": steps_per_second,
             }
-            print('upd counts')
             result.update(counts)
-            print('end')
-            return result
+
+        # The executor stats are logged whichever stats wrapper is used.
+        result.update(self._get_executor_stats())
+        return result
 
     def run_episode_and_log(self) -> loggers.LoggingData:
         """Run an episode and log the results"""
 
         results = self.run_episode()
-        print('bef logs')
         self._logger.write(results)
-        print('after logs logs')
         return results
 
     def run(self) -> None:  # pragma: no cover # noqa: C901
@@ -400,11 +385,11 @@ class ParallelEnvironmentLoop(acme.core.Worker):
                             metric,
                             best_performance,
                         ) in self._executor.store.checkpointing_metric.items():
-                            assert (
-                                metric in results.keys()
-                            ), f"The metric, {metric}, chosen for checkpointing doesn't exist.\
-                                 This experiment has only the following metrics:\
-                                 {results.keys()}"
+                            assert metric in results.keys(), (
+                                f"The metric, {metric}, chosen for checkpointing "
+                                "doesn't exist. This experiment has only the "
+                                f"following metrics: {results.keys()}"
+                            )
 
                             if (
                                 best_performance is None
@@ -446,3 +431,583 @@ class ParallelEnvironmentLoop(acme.core.Worker):
                     )
                 self._executor.force_update()
                 break
+
+
+def _stack_host_trees(trees: List[Any]) -> Any:
+    """Stack a list of nests of host arrays along a new leading axis."""
+    return jax.tree_util.tree_map(lambda *leaves: np.stack(leaves), *trees)
+
+
+def _index_host_tree(tree: Any, index: int) -> Any:
+    """Select an entry of a nest of stacked host arrays."""
+    return jax.tree_util.tree_map(lambda leaf: leaf[index], tree)
+
+
+class VectorisedEnvironmentLoop(ParallelEnvironmentLoop):
+    """A MARL environment loop stepping several environments with one executor.
+
+    The observations of all the environments are stacked and the actions of
+    every environment and agent are selected in a single call to the executor,
+    whose action selection function is vectorised over the environments. Each
+    environment has its own adder, so every environment feeds its own
+    trajectory to the data server. Environments are reset as soon as their
+    episode ends, and run_episode returns the results of the episodes that
+    ended during the call, so the other environments carry on where they were.
+    The recurrent states of all the environments are kept stacked on device
+    and the states of an environment are reset with a mask when it starts a
+    new episode.
+    """
+
+    # Executor store entries that are kept separately for each environment.
+    _ENV_STATE_KEYS = [
+        "adder",
+        "agent_net_keys",
+        "network_int_keys_extras",
+    ]
+
+    def __init__(
+        self,
+        environments: List[dm_env.Environment],
+        executor: mava.core.Executor,
+        adders: Optional[List[Any]] = None,
+        counter: counting.Counter = None,
+        logger: loggers.Logger = None,
+        should_update: bool = True,
+        label: str = "parallel_environment_loop",
+    ):
+        """Vectorised environment loop init
+
+        Args:
+            environments: copies of the environment to step together.
+            executor: a Mava executor whose action selection function is
+                vectorised over the environments.
+            adders: one adder per environment. Defaults to None, which is used
+                by executors without an adder.
+            counter: an optional counter. Defaults to None.
+            logger: an optional counter. Defaults to None.
+            should_update: should update. Defaults to True.
+            label: optional label. Defaults to "parallel_environment_loop".
+        """
+        # The first environment is used for the specs and environment stats.
+        super().__init__(
+            environment=environments[0],
+            executor=executor,
+            counter=counter,
+            logger=logger,
+            should_update=should_update,
+            label=label,
+        )
+        self._environments = environments
+        self._adders = adders if adders is not None else [None] * len(environments)
+
+        # The state of the episode running in each environment.
+        self._timesteps: List[Optional[dm_env.TimeStep]] = [None] * len(environments)
+        self._env_states: List[Dict[str, Any]] = [{} for _ in environments]
+        self._episode_returns: List[Dict[str, float]] = [{} for _ in environments]
+        self._episode_steps = [0] * len(environments)
+        self._start_times = [0.0] * len(environments)
+        # Recurrent states of all the environments, stacked on device.
+        self._policy_states: Any = None
+
+    def _load_env_state(self, env_index: int) -> None:
+        """Point the executor store to the state of an environment."""
+        for key, value in self._env_states[env_index].items():
+            setattr(self._executor.store, key, value)
+
+    def _save_env_state(self, env_index: int) -> None:
+        """Save the executor store state of an environment."""
+        self._env_states[env_index] = {
+            key: getattr(self._executor.store, key)
+            for key in self._ENV_STATE_KEYS
+            if hasattr(self._executor.store, key)
+        }
+
+    def _reset(self, env_index: int) -> None:
+        """Reset an environment and start a new episode in the executor."""
+        timestep = self._environments[env_index].reset()
+        if type(timestep) == tuple:
+            timestep, env_extras = timestep
+        else:
+            env_extras = {}
+
+        self._load_env_state(env_index)
+        self._executor.store.adder = self._adders[env_index]
+        self._executor.observe_first(timestep, extras=env_extras)
+        self._save_env_state(env_index)
+        if hasattr(self._executor.store, "policy_states"):
+            self._reset_policy_states(env_index)
+
+        self._timesteps[env_index] = timestep
+        self._episode_returns[env_index] = {
+            agent: generate_zeros_from_spec(spec)
+            for agent, spec in self._environments[env_index].reward_spec().items()
+        }
+        self._episode_steps[env_index] = 0
+        self._start_times[env_index] = time.time()
+
+    def _reset_policy_states(self, env_index: int) -> None:
+        """Reset the recurrent states of an environment to the initial states."""
+        init_policy_states = self._executor.store.policy_states
+        num_envs = len(self._environments)
+        if self._policy_states is None:
+            self._policy_states = stack_trees([init_policy_states] * num_envs)
+        else:
+            self._policy_states = reset_stacked_tree(
+                self._policy_states,
+                init_policy_states,
+                jnp.arange(num_envs) == env_index,
+            )
+
+    def _end_episode(self, env_index: int) -> loggers.LoggingData:
+        """Compute the results of the episode that ended in an environment."""
+        episode_returns = self._episode_returns[env_index]
+        episode_steps = self._episode_steps[env_index]
+        start_time = self._start_times[env_index]
+
+        self._compute_episode_statistics(episode_returns, episode_steps, start_time)
+        if self._get_running_stats():
+            result = dict(self._get_running_stats())
+        else:
+            counts = self.record_counts(episode_steps)
+            result = {
+                "episode_length": episode_steps,
+                "mean_episode_return": np.mean(list(episode_returns.values())),
+                "steps_per_second": episode_steps / (time.time() - start_time),
+            }
+            result.update(counts)
+
+        # The executor stats are logged whichever stats wrapper is used.
+        result.update(self._get_executor_stats())
+        return result
+
+    def _step_environments(self, actions: List[Dict[str, Any]]) -> List[Any]:
+        """Step each environment with its actions.
+
+        Args:
+            actions: actions of each environment.
+
+        Returns:
+            The timestep, or timestep and extras, of each environment.
+        """
+        return [
+            environment.step(env_actions)
+            for environment, env_actions in zip(self._environments, actions)
+        ]
+
+    def _select_actions(
+        self, env_indices: List[int]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Any]:
+        """Select the actions of a group of environments in a single call.
+
+        Args:
+            env_indices: environments to select actions for.
+
+        Returns:
+            The actions and policy info of each environment, and their stacked
+            recurrent states on host, or None for feedforward executors.
+        """
+        store = self._executor.store
+        recurrent = self._policy_states is not None
+        all_envs = env_indices == list(range(len(self._environments)))
+        group_indices = np.asarray(env_indices)
+        if recurrent:
+            store.policy_states = (
+                self._policy_states
+                if all_envs
+                else jax.tree_util.tree_map(
+                    lambda states: states[group_indices],
+                    self._policy_states,
+                )
+            )
+
+        observations = _stack_host_trees(
+            [self._timesteps[env_index].observation for env_index in env_indices]
+        )
+        # Each environment death masks its own agents.
+        store.env_death_masked_agents = [
+            getattr(self._environments[env_index], "death_masked_agents", [])
+            for env_index in env_indices
+        ]
+        actions_info, policies_info = jax.device_get(
+            self._executor.select_actions(observations)
+        )
+
+        policy_states = None
+        if recurrent:
+            self._policy_states = (
+                store.policy_states
+                if all_envs
+                else jax.tree_util.tree_map(
+                    lambda states, group_states: states.at[group_indices].set(
+                        group_states
+                    ),
+                    self._policy_states,
+                    store.policy_states,
+                )
+            )
+            # Fetch the states of the environments to host in one transfer for
+            # the adders.
+            policy_states = jax.device_get(store.policy_states)
+
+        return (
+            [_index_host_tree(actions_info, i) for i in range(len(env_indices))],
+            [_index_host_tree(policies_info, i) for i in range(len(env_indices))],
+            policy_states,
+        )
+
+    def _observe(
+        self,
+        env_index: int,
+        timestep: Any,
+        env_actions: Dict[str, Any],
+        env_policies_info: Dict[str, Any],
+        env_policy_states: Any = None,
+    ) -> Optional[loggers.LoggingData]:
+        """Have the executor observe the transition of an environment.
+
+        Args:
+            env_index: index of the environment.
+            timestep: timestep, or timestep and extras, of the environment.
+            env_actions: actions that led to the timestep.
+            env_policies_info: policy info of the actions.
+            env_policy_states: recurrent states of the environment on host.
+
+        Returns:
+            The results of the episode if it ended, in which case a new
+            episode is started.
+        """
+        store = self._executor.store
+        if type(timestep) == tuple:
+            timestep, env_extras = timestep
+        else:
+            env_extras = {}
+
+        self._load_env_state(env_index)
+        if env_policy_states is not None:
+            store.policy_states = env_policy_states
+        store.actions_info = env_actions
+        store.policies_info = env_policies_info
+        self._executor.observe(
+            (env_actions, env_policies_info),
+            next_timestep=timestep,
+            next_extras=env_extras,
+        )
+        self._save_env_state(env_index)
+
+        # Book-keeping.
+        self._timesteps[env_index] = timestep
+        self._episode_steps[env_index] += 1
+        self._compute_step_statistics(timestep.reward)
+        episode_returns = self._episode_returns[env_index]
+        for agent, reward in timestep.reward.items():
+            episode_returns[agent] = episode_returns[agent] + reward
+
+        # Start a new episode as soon as this one ends.
+        if timestep.last():
+            result = self._end_episode(env_index)
+            self._reset(env_index)
+            return result
+        return None
+
+    def _step(self) -> List[loggers.LoggingData]:
+        """Step all the environments once.
+
+        Returns:
+            The results of the episodes that ended in this step.
+        """
+        # Select the actions of every environment and agent in a single call.
+        env_indices = list(range(len(self._environments)))
+        actions, policies_info, policy_states = self._select_actions(env_indices)
+        env_timesteps = self._step_environments(actions)
+
+        results = []
+        for env_index, timestep in enumerate(env_timesteps):
+            result = self._observe(
+                env_index,
+                timestep,
+                actions[env_index],
+                policies_info[env_index],
+                None
+                if policy_states is None
+                else _index_host_tree(policy_states, env_index),
+            )
+            if result is not None:
+                results.append(result)
+
+        if self._should_update:
+            self._executor.update()
+
+        return results
+
+    def run_episode(self) -> loggers.LoggingData:
+        """Step the environments until at least one episode ends.
+
+        Returns:
+            The results of the last episode that ended.
+        """
+        for env_index, timestep in enumerate(self._timesteps):
+            if timestep is None:
+                self._reset(env_index)
+
+        results: List[loggers.LoggingData] = []
+        while not results:
+            results = self._step()
+
+        return results[-1]
+
+
+class SharedMemoryEnvironmentLoop(VectorisedEnvironmentLoop):
+    """A vectorised environment loop stepping an environment pool in parallel.
+
+    The environments of the pool run in worker processes and are stepped at
+    the same time, so a step of the loop takes as long as the slowest
+    environment rather than the sum of their step times.
+    """
+
+    def __init__(
+        self,
+        environment_pool: SharedMemoryEnvironmentPool,
+        executor: mava.core.Executor,
+        adders: Optional[List[Any]] = None,
+        counter: counting.Counter = None,
+        logger: loggers.Logger = None,
+        should_update: bool = True,
+        label: str = "parallel_environment_loop",
+    ):
+        """Shared memory environment loop init
+
+        Args:
+            environment_pool: pool of environments to step together.
+            executor: a Mava executor whose action selection function is
+                vectorised over the environments.
+            adders: one adder per environment. Defaults to None, which is used
+                by executors without an adder.
+            counter: an optional counter. Defaults to None.
+            logger: an optional counter. Defaults to None.
+            should_update: should update. Defaults to True.
+            label: optional label. Defaults to "parallel_environment_loop".
+        """
+        super().__init__(
+            environments=environment_pool.environments,
+            executor=executor,
+            adders=adders,
+            counter=counter,
+            logger=logger,
+            should_update=should_update,
+            label=label,
+        )
+        self._environment_pool = environment_pool
+
+    def _step_environments(self, actions: List[Dict[str, Any]]) -> List[Any]:
+        """Step all the environments of the pool in parallel.
+
+        Args:
+            actions: actions of each environment.
+
+        Returns:
+            The timestep and extras of each environment.
+        """
+        return self._environment_pool.step(actions)
+
+    def run(self) -> None:
+        """Run the environment loop, closing the pool when the loop stops."""
+        try:
+            super().run()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the workers of the pool and free its shared memory."""
+        self._environment_pool.close()
+
+    def __del__(self) -> None:
+        """Close the pool when the loop is garbage collected."""
+        # The pool is not set if the init of a subclass raised before it.
+        if hasattr(self, "_environment_pool"):
+            self.close()
+
+
+class _BackgroundAdder:
+    """Adder proxy running the writes of an adder on a background thread."""
+
+    def __init__(self, adder: Any, writer: futures.ThreadPoolExecutor) -> None:
+        """Initialise the proxy.
+
+        Args:
+            adder: adder to write with.
+            writer: single thread executor running the writes in order.
+        """
+        self._adder = adder
+        self._writer = writer
+        self._pending: List[futures.Future] = []
+
+    def add_first(self, *args: Any, **kwargs: Any) -> None:
+        """Queue the first step of an episode."""
+        self._pending.append(
+            self._writer.submit(self._adder.add_first, *args, **kwargs)
+        )
+
+    def add(self, *args: Any, **kwargs: Any) -> None:
+        """Queue a step."""
+        self._pending.append(self._writer.submit(self._adder.add, *args, **kwargs))
+
+    def wait(self) -> None:
+        """Wait for the queued writes, raising their errors."""
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def __getattr__(self, name: str) -> Any:
+        """Forward other attributes to the adder."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._adder, name)
+
+
+class PipelinedEnvironmentLoop(SharedMemoryEnvironmentLoop):
+    """A shared memory environment loop keeping two environment groups in flight.
+
+    The environments of the pool are split into two groups that are stepped in
+    turn. While the environments of one group step in their worker processes,
+    the executor observes the last transitions of the other group and selects
+    its next actions, and the adders write the transitions to the data server
+    on a background thread. Each group has its own random keys, and the
+    actions of a group are selected from the observations of its previous
+    step, as in VectorisedEnvironmentLoop.
+    """
+
+    def __init__(
+        self,
+        environment_pool: SharedMemoryEnvironmentPool,
+        executor: mava.core.Executor,
+        adders: Optional[List[Any]] = None,
+        counter: counting.Counter = None,
+        logger: loggers.Logger = None,
+        should_update: bool = True,
+        label: str = "parallel_environment_loop",
+    ):
+        """Pipelined environment loop init
+
+        Args:
+            environment_pool: pool of at least two environments.
+            executor: a Mava executor whose action selection function is
+                vectorised over the environments.
+            adders: one adder per environment. Defaults to None, which is used
+                by executors without an adder.
+            counter: an optional counter. Defaults to None.
+            logger: an optional counter. Defaults to None.
+            should_update: should update. Defaults to True.
+            label: optional label. Defaults to "parallel_environment_loop".
+
+        Raises:
+            ValueError: if the pool has fewer than two environments.
+        """
+        if len(environment_pool) < 2:
+            raise ValueError(
+                "The pipelined environment loop needs at least two environments, "
+                f"got {len(environment_pool)}."
+            )
+        super().__init__(
+            environment_pool=environment_pool,
+            executor=executor,
+            adders=adders,
+            counter=counter,
+            logger=logger,
+            should_update=should_update,
+            label=label,
+        )
+        self._writer = futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="adder"
+        )
+        self._adders = [
+            _BackgroundAdder(adder, self._writer) if adder is not None else None
+            for adder in self._adders
+        ]
+
+        num_envs = len(environment_pool)
+        self._groups = [
+            list(range(num_envs // 2)),
+            list(range(num_envs // 2, num_envs)),
+        ]
+        self._group_base_keys: List[Any] = [None, None]
+        # Actions, policy info and recurrent states of the in flight steps.
+        self._in_flight: List[Any] = [None, None]
+
+    def close(self) -> None:
+        """Finish the queued adder writes and close the pool."""
+        self._writer.shutdown(wait=True)
+        super().close()
+
+    def _launch_group(self, group: int) -> None:
+        """Select the actions of a group and start stepping its environments."""
+        env_indices = self._groups[group]
+        store = self._executor.store
+        store.base_key = self._group_base_keys[group]
+        self._in_flight[group] = self._select_actions(env_indices)
+        self._group_base_keys[group] = store.base_key
+        self._environment_pool.step_async(self._in_flight[group][0], env_indices)
+
+    def _step_group(self, group: int) -> List[loggers.LoggingData]:
+        """Observe the step of a group and start its next step.
+
+        Args:
+            group: index of the group.
+
+        Returns:
+            The results of the episodes that ended in the step.
+        """
+        env_indices = self._groups[group]
+        actions, policies_info, policy_states = self._in_flight[group]
+        env_timesteps = self._environment_pool.step_wait(env_indices)
+
+        # The previous writes of the group are done before new ones are queued,
+        # which bounds the queue and raises the errors of the adders.
+        for env_index in env_indices:
+            if self._adders[env_index] is not None:
+                self._adders[env_index].wait()
+
+        results = []
+        for position, env_index in enumerate(env_indices):
+            result = self._observe(
+                env_index,
+                env_timesteps[position],
+                actions[position],
+                policies_info[position],
+                None
+                if policy_states is None
+                else _index_host_tree(policy_states, position),
+            )
+            if result is not None:
+                results.append(result)
+
+        self._launch_group(group)
+        return results
+
+    def run_episode(self) -> loggers.LoggingData:
+        """Step the environment groups until at least one episode ends.
+
+        Returns:
+            The results of the last episode that ended.
+        """
+        if self._in_flight[0] is None:
+            for env_index, timestep in enumerate(self._timesteps):
+                if timestep is None:
+                    self._reset(env_index)
+
+            # Split the random keys of the environments between the groups.
+            base_keys = self._executor.store.base_key
+            self._group_base_keys = [
+                base_keys[np.asarray(env_indices)] for env_indices in self._groups
+            ]
+            for group in range(len(self._groups)):
+                self._launch_group(group)
+
+        results: List[loggers.LoggingData] = []
+        while not results:
+            for group in range(len(self._groups)):
+                results.extend(self._step_group(group))
+
+            if self._should_update:
+                self._executor.update()
+
+        return results[-1]
@@ -0,0 +1,400 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pool of environments stepped in worker processes through shared memory."""
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import dm_env
+import jax
+import numpy as np
+
+from mava.utils.wrapper_utils import generate_zeros_from_spec
+
+# Commands sent to the workers, as raw bytes so nothing is pickled per step.
+_RESET = b"reset"
+_STEP = b"step"
+_CLOSE = b"close"
+
+# Size in bytes the buffers are aligned to. The buffers of each environment
+# start on their own cache line, so workers do not write to shared lines.
+_ALIGNMENT = 64
+
+# Offset, shape and dtype of each leaf of a group of buffers.
+BufferLayout = List[Tuple[int, Tuple[int, ...], str]]
+
+
+def _make_environment(environment_factory: Callable[[], Any]) -> dm_env.Environment:
+    """Create an environment, dropping the extra outputs of mava factories."""
+    environment = environment_factory()
+    if type(environment) == tuple:
+        environment = environment[0]
+    return environment
+
+
+def _align(size: int) -> int:
+    """Round a size in bytes up to the alignment."""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _buffer_views(
+    buffer: memoryview, layout: Dict[str, BufferLayout], env_offset: int
+) -> Dict[str, List[np.ndarray]]:
+    """Numpy views of the buffers of one environment."""
+    return {
+        group: [
+            np.ndarray(shape, dtype, buffer=buffer, offset=env_offset + offset)
+            for offset, shape, dtype in leaves
+        ]
+        for group, leaves in layout.items()
+    }
+
+
+def _write_tree(views: List[np.ndarray], tree: Any) -> None:
+    """Copy the leaves of a nest into buffers."""
+    leaves = jax.tree_util.tree_leaves(tree)
+    if len(leaves) != len(views):
+        raise ValueError(
+            f"Expected a nest with {len(views)} leaves, got {len(leaves)} leaves."
+        )
+    for view, leaf in zip(views, leaves):
+        view[...] = leaf
+
+
+def _read_tree(views: List[np.ndarray], treedef: Any) -> Any:
+    """Copy a nest out of buffers."""
+    return jax.tree_util.tree_unflatten(
+        treedef, [view[()] if view.ndim == 0 else view.copy() for view in views]
+    )
+
+
+def _environment_worker(
+    environment_factory: Callable[[], Any],
+    connection: Connection,
+    buffer_name: str,
+    layout: Dict[str, BufferLayout],
+    action_agents: List[str],
+    env_offset: int,
+) -> None:
+    """Step an environment on the commands of the pool.
+
+    The actions are read from and the timesteps, along with the agents the
+    environment death masks, written to the shared memory of the environment.
+    The worker answers each command with an empty message, or with the
+    traceback of the error raised by the environment.
+    """
+    environment = _make_environment(environment_factory)
+    memory = shared_memory.SharedMemory(name=buffer_name)
+    views = _buffer_views(memory.buf, layout, env_offset)
+    try:
+        while True:
+            command = connection.recv_bytes()
+            if command == _CLOSE:
+                break
+            try:
+                if command == _STEP:
+                    actions = {
+                        agent: view[()] if view.ndim == 0 else view.copy()
+                        for agent, view in zip(action_agents, views["actions"])
+                    }
+                    result = environment.step(actions)
+                else:
+                    result = environment.reset()
+
+                if type(result) == tuple:
+                    timestep, extras = result
+                else:
+                    timestep, extras = result, {}
+                views["step_type"][0][...] = timestep.step_type
+                views["has_reward"][0][...] = timestep.reward is not None
+                _write_tree(views["observation"], timestep.observation)
+                if timestep.reward is not None:
+                    _write_tree(views["reward"], timestep.reward)
+                    _write_tree(views["discount"], timestep.discount)
+                _write_tree(views["extras"], extras)
+                death_masked_agents = getattr(environment, "death_masked_agents", [])
+                views["death_mask"][0][...] = [
+                    agent in death_masked_agents for agent in action_agents
+                ]
+                connection.send_bytes(b"")
+            except Exception:
+                connection.send_bytes(traceback.format_exc().encode())
+    finally:
+        del views
+        memory.close()
+        connection.close()
+
+
+class PooledEnvironment:
+    """Handle on one environment of a SharedMemoryEnvironmentPool."""
+
+    def __init__(self, pool: "SharedMemoryEnvironmentPool", env_index: int) -> None:
+        """Initialise the handle.
+
+        Args:
+            pool: pool running the environment.
+            env_index: index of the environment in the pool.
+        """
+        self._pool = pool
+        self._env_index = env_index
+
+    def reset(self) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Reset the environment."""
+        return self._pool.reset(self._env_index)
+
+    def step(self, actions: Dict[str, Any]) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Step the environment on its own."""
+        return self._pool.step([actions], [self._env_index])[0]
+
+    @property
+    def death_masked_agents(self) -> List[str]:
+        """Agents death masked by the environment after its last timestep."""
+        return self._pool.death_masked_agents(self._env_index)
+
+    def __getattr__(self, name: str) -> Any:
+        """Read other attributes, such as the specs, from the local environment."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._pool.environment, name)
+
+
+class SharedMemoryEnvironmentPool:
+    """Copies of an environment stepped in parallel in worker processes.
+
+    The actions and timesteps are exchanged through a preallocated block of
+    shared memory, laid out from the first timestep of a local copy of the
+    environment, and the workers are driven by byte commands, so nothing is
+    pickled on the step path. The timesteps must keep the structure, shapes
+    and dtypes of the first timestep. The local copy is never stepped and is
+    used for the specs and attributes of the environment.
+    """
+
+    def __init__(
+        self,
+        environment_factory: Callable[[], Any],
+        num_envs: int,
+        start_method: str = "spawn",
+    ) -> None:
+        """Create the environments and start the workers.
+
+        Args:
+            environment_factory: picklable function creating the environment,
+                or a tuple whose first entry is the environment.
+            num_envs: number of environments, each in its own worker process.
+            start_method: multiprocessing start method of the workers.
+        """
+        self.environment = _make_environment(environment_factory)
+        self._num_envs = num_envs
+
+        # Lay out the buffers from the first timestep of the local environment.
+        result = self.environment.reset()
+        if type(result) == tuple:
+            timestep, extras = result
+        else:
+            timestep, extras = result, {}
+        reward = timestep.reward
+        if reward is None:
+            reward = jax.tree_util.tree_map(
+                generate_zeros_from_spec, self.environment.reward_spec()
+            )
+        discount = timestep.discount
+        if discount is None:
+            discount = jax.tree_util.tree_map(
+                generate_zeros_from_spec, self.environment.discount_spec()
+            )
+        action_spec = self.environment.action_spec()
+        self._action_agents = sorted(action_spec.keys())
+        templates = {
+            "step_type": [np.int8(timestep.step_type)],
+            "has_reward": [np.bool_(True)],
+            "observation": timestep.observation,
+            "reward": reward,
+            "discount": discount,
+            "extras": extras,
+            "actions": [
+                generate_zeros_from_spec(action_spec[agent])
+                for agent in self._action_agents
+            ],
+            "death_mask": [np.zeros(len(self._action_agents), dtype=np.bool_)],
+        }
+        self._treedefs = {
+            group: jax.tree_util.tree_structure(template)
+            for group, template in templates.items()
+        }
+
+        layout: Dict[str, BufferLayout] = {}
+        env_size = 0
+        for group, template in templates.items():
+            layout[group] = []
+            for leaf in jax.tree_util.tree_leaves(template):
+                leaf = np.asarray(leaf)
+                layout[group].append((env_size, leaf.shape, leaf.dtype.str))
+                env_size += _align(leaf.nbytes)
+        env_size = max(env_size, _ALIGNMENT)
+
+        self._memory = shared_memory.SharedMemory(create=True, size=env_size * num_envs)
+        self._views = [
+            _buffer_views(self._memory.buf, layout, env_index * env_size)
+            for env_index in range(num_envs)
+        ]
+
+        context = multiprocessing.get_context(start_method)
+        self._connections: List[Connection] = []
+        self._workers = []
+        for env_index in range(num_envs):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=_environment_worker,
+                args=(
+                    environment_factory,
+                    worker_connection,
+                    self._memory.name,
+                    layout,
+                    self._action_agents,
+                    env_index * env_size,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+        self.environments = [
+            PooledEnvironment(self, env_index) for env_index in range(num_envs)
+        ]
+        self._closed = False
+
+    def __len__(self) -> int:
+        """Number of environments in the pool."""
+        return self._num_envs
+
+    def _wait(self, env_index: int) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Wait for a worker and read the timestep it wrote."""
+        error = self._connections[env_index].recv_bytes()
+        if error:
+            raise RuntimeError(
+                f"Environment {env_index} of the pool raised:\n{error.decode()}"
+            )
+
+        views = self._views[env_index]
+        reward, discount = None, None
+        if views["has_reward"][0]:
+            reward = _read_tree(views["reward"], self._treedefs["reward"])
+            discount = _read_tree(views["discount"], self._treedefs["discount"])
+        timestep = dm_env.TimeStep(
+            step_type=dm_env.StepType(int(views["step_type"][0])),
+            reward=reward,
+            discount=discount,
+            observation=_read_tree(views["observation"], self._treedefs["observation"]),
+        )
+        return timestep, _read_tree(views["extras"], self._treedefs["extras"])
+
+    def reset(self, env_index: int) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Reset an environment.
+
+        Args:
+            env_index: index of the environment.
+
+        Returns:
+            The first timestep and extras of the environment.
+        """
+        self._connections[env_index].send_bytes(_RESET)
+        return self._wait(env_index)
+
+    def death_masked_agents(self, env_index: int) -> List[str]:
+        """Agents death masked by an environment after its last timestep.
+
+        Args:
+            env_index: index of the environment.
+
+        Returns:
+            The death masked agents.
+        """
+        death_mask = self._views[env_index]["death_mask"][0]
+        return [agent for agent, dead in zip(self._action_agents, death_mask) if dead]
+
+    def step_async(
+        self, actions: List[Dict[str, Any]], env_indices: Optional[List[int]] = None
+    ) -> None:
+        """Start stepping environments without waiting for their timesteps.
+
+        Args:
+            actions: actions of each stepped environment.
+            env_indices: environments to step. Defaults to None, which steps
+                all the environments.
+        """
+        if env_indices is None:
+            env_indices = list(range(self._num_envs))
+
+        for env_index, env_actions in zip(env_indices, actions):
+            views = self._views[env_index]["actions"]
+            for agent, view in zip(self._action_agents, views):
+                view[...] = env_actions[agent]
+            self._connections[env_index].send_bytes(_STEP)
+
+    def step_wait(
+        self, env_indices: Optional[List[int]] = None
+    ) -> List[Tuple[dm_env.TimeStep, Dict[str, Any]]]:
+        """Wait for the environments started by step_async.
+
+        Args:
+            env_indices: environments to wait for. Defaults to None, which
+                waits for all the environments.
+
+        Returns:
+            The timestep and extras of each environment.
+        """
+        if env_indices is None:
+            env_indices = list(range(self._num_envs))
+        return [self._wait(env_index) for env_index in env_indices]
+
+    def step(
+        self, actions: List[Dict[str, Any]], env_indices: Optional[List[int]] = None
+    ) -> List[Tuple[dm_env.TimeStep, Dict[str, Any]]]:
+        """Step environments in parallel.
+
+        Args:
+            actions: actions of each stepped environment.
+            env_indices: environments to step. Defaults to None, which steps
+                all the environments.
+
+        Returns:
+            The timestep and extras of each stepped environment.
+        """
+        self.step_async(actions, env_indices)
+        return self.step_wait(env_indices)
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        for connection in self._connections:
+            try:
+                connection.send_bytes(_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        del self._views
+        self._memory.close()
+        self._memory.unlink()
@@ -17,6 +17,7 @@
 from mava.systems.builder import Builder
 from mava.systems.config import Config
 from mava.systems.executor import Executor
+from mava.systems.inference_server import InferenceServer
 from mava.systems.launcher import Launcher
 from mava.systems.parameter_client import ParameterClient
 from mava.systems.parameter_server import ParameterServer
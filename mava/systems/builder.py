@@ -23,6 +23,7 @@ from typing import Any, List
 from mava.callbacks import BuilderHookMixin, Callback
 from mava.core_jax import SystemBuilder
 from mava.systems.executor import Executor
+from mava.systems.inference_server import InferenceServer
 from mava.systems.parameter_server import ParameterServer
 from mava.systems.trainer import Trainer
 
@@ -101,8 +102,30 @@ class Builder(SystemBuilder, BuilderHookMixin):
             components=self.callbacks,
         )
 
+    def inference_server(self, parameter_server_client: Any) -> Any:
+        """Inference server to select the actions of the executors in batches.
+
+        Args:
+            parameter_server_client : parameter server client for pulling parameters.
+
+        Returns:
+            System inference server.
+        """
+
+        # Set the rng key for the inference server.
+        self.store.base_key = self.store.inference_key
+
+        return InferenceServer(
+            store=self.store,
+            parameter_server_client=parameter_server_client,
+        )
+
     def executor(
-        self, executor_id: str, data_server_client: Any, parameter_server_client: Any
+        self,
+        executor_id: str,
+        data_server_client: Any,
+        parameter_server_client: Any,
+        inference_server_client: Any = None,
     ) -> Any:
         """Executor, a collection of agents in an environment to gather experience.
 
@@ -110,6 +133,8 @@ class Builder(SystemBuilder, BuilderHookMixin):
             executor_id : id to identify the executor process for logging purposes.
             data_server_client : data server client for pushing transition data.
             parameter_server_client : parameter server client for pulling parameters.
+            inference_server_client : optional inference server client for
+                selecting actions.
 
         Returns:
             System executor.
@@ -118,6 +143,7 @@ class Builder(SystemBuilder, BuilderHookMixin):
         self.store.executor_id = executor_id
         self.store.data_server_client = data_server_client
         self.store.parameter_server_client = parameter_server_client
+        self.store.inference_server_client = inference_server_client
         self.store.is_evaluator = self.store.executor_id == "evaluator"
 
         if self.store.is_evaluator:
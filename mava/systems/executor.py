@@ -138,6 +138,28 @@ class Executor(SystemExecutor, ExecutorHookMixin):
 
         self.on_execution_update_end()
 
+    def get_stats(self) -> Dict[str, float]:
+        """Return the stats recorded by the executor components.
+
+        The environment loop logs these stats with the results of each episode.
+
+        Returns:
+            Dict with the stats.
+        """
+        stats: Dict[str, float] = {}
+
+        # Time spent compiling the action selection before execution.
+        if hasattr(self.store, "select_actions_compile_time"):
+            stats[
+                "select_actions_compile_time"
+            ] = self.store.select_actions_compile_time
+
+        # Divergence of the quantised policies from the fp32 policies.
+        if hasattr(self.store, "quantised_policy_kl"):
+            stats["quantised_policy_kl"] = self.store.quantised_policy_kl
+
+        return stats
+
     def force_update(self, wait: bool = False) -> None:
         """Force immediate update executor parameters.
 
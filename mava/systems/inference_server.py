@@ -0,0 +1,250 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Jax systems inference server."""
+
+import queue
+import threading
+import time
+from concurrent import futures
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jax
+import numpy as np
+from acme.jax import networks as networks_lib
+
+from mava.systems.parameter_client import ParameterClient
+from mava.types import OLT, NestedArray
+
+
+class InferenceRequest:
+    """Observations of a single executor waiting for their actions."""
+
+    def __init__(
+        self, observations: Dict[str, OLT], agent_net_keys: Dict[str, str]
+    ) -> None:
+        """Initialise the request.
+
+        Args:
+            observations: observations of the agents of the executor.
+            agent_net_keys: network used by each agent of the executor.
+        """
+        self.observations = observations
+        self.agent_net_keys = agent_net_keys
+        self.future: futures.Future = futures.Future()
+
+
+class InferenceServer:
+    def __init__(
+        self,
+        store: SimpleNamespace,
+        parameter_server_client: Optional[Any] = None,
+    ) -> None:
+        """Initialise the inference server.
+
+        The server selects the actions of many executors. The observations of
+        the requests that arrive within inference_server_batch_timeout seconds
+        of each other, up to inference_server_max_batch_size agents, are
+        batched into one forward pass per network. Batch sizes are padded to
+        powers of two to bound the number of compilations. The policy
+        parameters are fetched from the parameter server every
+        inference_server_parameter_update_period batches.
+
+        Args:
+            store: builder store.
+            parameter_server_client: parameter server client for pulling
+                parameters.
+        """
+        self.store = store
+        config = store.global_config
+        self._max_batch_size = config.inference_server_max_batch_size
+        self._batch_timeout = config.inference_server_batch_timeout
+        self._base_key = store.base_key
+
+        # The parameter client updates the policy params of the networks in place.
+        params = {
+            f"policy_network-{net_key}": network.policy_params
+            for net_key, network in store.networks.items()
+        }
+        self._parameter_client = None
+        if parameter_server_client:
+            device = jax.local_devices()[0]
+            self._parameter_client = ParameterClient(
+                server=parameter_server_client,
+                parameters=params,
+                multi_process=config.multi_process,
+                get_keys=list(params.keys()),
+                update_period=config.inference_server_parameter_update_period,
+                devices={key: device for key in params.keys()},
+            )
+            self._parameter_client.get_and_wait()
+
+        self._forward_fns = {
+            net_key: self._make_forward_fn(network)
+            for net_key, network in store.networks.items()
+        }
+
+        self._requests: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _make_forward_fn(network: Any) -> Callable:
+        """Create the jitted forward pass of a network on a batch of observations."""
+
+        def forward(
+            params: NestedArray,
+            observations: NestedArray,
+            legal_actions: NestedArray,
+            base_key: networks_lib.PRNGKey,
+        ) -> Tuple[NestedArray, NestedArray]:
+            """Select the actions of a batch of observations."""
+            return network.get_action(
+                observations=observations,
+                params=params,
+                base_key=base_key,
+                mask=legal_actions,
+            )
+
+        return jax.jit(forward)
+
+    def _padded_batch_size(self, batch_size: int) -> int:
+        """Round the batch size up to the next power of two."""
+        return 1 << (batch_size - 1).bit_length()
+
+    def select_actions_batch(
+        self, requests: List[InferenceRequest]
+    ) -> List[Tuple[Dict[str, NestedArray], Dict[str, NestedArray]]]:
+        """Select the actions of several requests with one forward pass per network.
+
+        Args:
+            requests: requests to batch.
+
+        Returns:
+            Actions info and policies info of each request, with a batch
+            dimension of one per agent as for executor side action selection.
+        """
+        # Rows of the batch of each network, as (request index, agent).
+        network_rows: Dict[str, List[Tuple[int, str]]] = {}
+        for index, request in enumerate(requests):
+            for agent in request.observations.keys():
+                network_rows.setdefault(request.agent_net_keys[agent], []).append(
+                    (index, agent)
+                )
+
+        results: List[Tuple[Dict[str, NestedArray], Dict[str, NestedArray]]] = [
+            ({}, {}) for _ in requests
+        ]
+        for net_key, rows in network_rows.items():
+            observations = [
+                requests[index].observations[agent] for index, agent in rows
+            ]
+            batch_observations = np.stack([olt.observation for olt in observations])
+            batch_legal_actions = np.stack([olt.legal_actions for olt in observations])
+
+            # Pad with copies of the first row to reuse compiled batch sizes.
+            num_padding = self._padded_batch_size(len(rows)) - len(rows)
+            if num_padding:
+                batch_observations = np.concatenate(
+                    [
+                        batch_observations,
+                        np.repeat(batch_observations[:1], num_padding, 0),
+                    ]
+                )
+                batch_legal_actions = np.concatenate(
+                    [
+                        batch_legal_actions,
+                        np.repeat(batch_legal_actions[:1], num_padding, 0),
+                    ]
+                )
+
+            self._base_key, action_key = jax.random.split(self._base_key)
+            actions_info, policies_info = jax.device_get(
+                self._forward_fns[net_key](
+                    self.store.networks[net_key].get_params(),
+                    batch_observations,
+                    batch_legal_actions,
+                    action_key,
+                )
+            )
+
+            for row, (index, agent) in enumerate(rows):
+                results[index][0][agent] = jax.tree_util.tree_map(
+                    lambda x: x[row : row + 1], actions_info
+                )
+                results[index][1][agent] = jax.tree_util.tree_map(
+                    lambda x: x[row : row + 1], policies_info
+                )
+        return results
+
+    def _next_requests(self) -> List[InferenceRequest]:
+        """Wait for a request and gather the requests that follow it."""
+        requests = [self._requests.get()]
+        num_agents = len(requests[0].observations)
+        deadline = time.time() + self._batch_timeout
+        while num_agents < self._max_batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            requests.append(request)
+            num_agents += len(request.observations)
+        return requests
+
+    def _serve(self) -> None:
+        """Answer the requests in batches, updating the parameters in between."""
+        while True:
+            requests = self._next_requests()
+            try:
+                results = self.select_actions_batch(requests)
+            except Exception as error:
+                for request in requests:
+                    request.future.set_exception(error)
+            else:
+                for request, result in zip(requests, results):
+                    request.future.set_result(result)
+
+            if self._parameter_client:
+                self._parameter_client.get_async()
+
+    def select_actions(
+        self, observations: Dict[str, OLT], agent_net_keys: Dict[str, str]
+    ) -> Tuple[Dict[str, NestedArray], Dict[str, NestedArray]]:
+        """Select the actions of the agents of an executor.
+
+        The call blocks until the batch holding the request has been run.
+
+        Args:
+            observations: observations of the agents of the executor.
+            agent_net_keys: network used by each agent of the executor.
+
+        Returns:
+            Actions info and policies info of the agents.
+        """
+        request = InferenceRequest(observations, agent_net_keys)
+        self._requests.put(request)
+        return request.future.result()
+
+    def run(self) -> None:
+        """Run the inference server until the program is terminated.
+
+        Returns:
+            None.
+        """
+        self._thread.join()
@@ -28,6 +28,7 @@ from dm_env import specs as dm_specs
 
 from mava import specs as mava_specs
 from mava.types import NestedArray
+from mava.utils.jax_quantisation_utils import quantise_params
 from mava.utils.jax_training_utils import action_mask_categorical_policies
 from mava.utils.networks_utils import MLP_NORM
 
@@ -166,6 +167,19 @@ class PPONetworks:
             "critic_network": self.critic_params,
         }
 
+    def get_quantised_params(
+        self,
+    ) -> Dict[str, jnp.ndarray]:
+        """Return the policy params with int8 linear layer weights.
+
+        The params are used by get_action when it is run with
+        quantised_apply.
+
+        Returns:
+            quantised policy params.
+        """
+        return {"policy_network": quantise_params(self.policy_params)}
+
 
 # This class is made to replicate the behaviour of the categorical value head
 # which squeezes the value inside the __call__ method before returning it.
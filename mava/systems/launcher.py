@@ -81,6 +81,7 @@ class Launcher:
             self._node_dict: Dict = {
                 "data_server": None,
                 "parameter_server": None,
+                "inference_server": None,
                 "executor": None,
                 "evaluator": None,
                 "trainer": None,
@@ -16,7 +16,7 @@
 """Parameter client for Jax system. Adapted from Deepmind's Acme library"""
 
 from concurrent import futures
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import jax
 import numpy as np
@@ -63,6 +63,8 @@ class ParameterClient:
         self._update_period = update_period
         self._server = server
         self._devices = devices
+        self._update_count = 0
+        self._sync_fn: Optional[Callable[[], None]] = None
 
         # note below it is assumed that if one device is specified with a string
         # they all are - need to test this works
@@ -75,7 +77,7 @@ class ParameterClient:
         self._request_all = lambda: server.get_parameters(self._all_keys)
 
         self._adjust = lambda: server.set_parameters(
-            {key: self._parameters[key] for key in self._set_keys},
+            self._set_parameters(),
         )
         self._adjust_param = lambda params: server.set_parameters(params)
 
@@ -84,10 +86,13 @@ class ParameterClient:
 
         # parameter server only has `futures` attribute if it is a launchpad node
         # and it is only a launchpad node if we are running in multiprocess
+        # The parameters are copied to host before async calls, since the trainer
+        # can donate the device buffers to its next update while the request
+        # is still being sent.
         if multi_process:
             self._async_request = lambda: server.futures.get_parameters(self._get_keys)  # type: ignore # noqa
             self._async_adjust = lambda: server.futures.set_parameters(  # type: ignore
-                {key: self._parameters[key] for key in self._set_keys},
+                jax.device_get(self._set_parameters()),
             )
             self._async_adjust_param = lambda params: server.futures.set_parameters(params)  # type: ignore # noqa
             self._async_add = lambda params: server.futures.add_to_parameters(params)  # type: ignore # noqa
@@ -106,6 +111,32 @@ class ParameterClient:
         self._set_get_future: Optional[Tuple[futures.Future, futures.Future]] = None
         self._add_future: Optional[futures.Future] = None
 
+    def register_sync_fn(self, sync_fn: Callable[[], None]) -> None:
+        """Register a function syncing the tracked parameters with their source.
+
+        The function is called before the set parameters are sent to the server,
+        so the owner of the parameters only has to update them when they are
+        read.
+
+        Args:
+            sync_fn: function updating the tracked parameters in place.
+
+        Returns:
+            None.
+        """
+        self._sync_fn = sync_fn
+
+    def _set_parameters(self) -> Dict[str, Any]:
+        """Return the set parameters, synced with their source."""
+        if self._sync_fn is not None:
+            self._sync_fn()
+        return {key: self._parameters[key] for key in self._set_keys}
+
+    @property
+    def update_count(self) -> int:
+        """Number of times new parameter values were copied into the client."""
+        return self._update_count
+
     def _adjust_and_request(self) -> None:
         """Set the parameters in the server, then update local params from the server.
 
@@ -113,7 +144,7 @@ class ParameterClient:
             None.
         """
         self._server.set_parameters(
-            {key: self._parameters[key] for key in self._set_keys},
+            self._set_parameters(),
         )
         self._copy(self._server.get_parameters(self._get_keys))
 
@@ -133,7 +164,7 @@ class ParameterClient:
         # parameter server only has `futures` attribute if it is a launchpad node
         # and it is only a launchpad node if we are running in multiprocess
         set_future = self._server.futures.set_parameters(  # type: ignore
-            {key: self._parameters[key] for key in self._set_keys},
+            jax.device_get(self._set_parameters()),
         )
         # Get all parameters in _get_keys that we didn't set above with _set_keys
         get_keys = set(self._get_keys) - set(self._set_keys)
@@ -310,29 +341,17 @@ class ParameterClient:
                     # Check if nested dictionary
                     if isinstance(new_parameters[key][type1_key], dict):
                         for type2_key in self._parameters[key][type1_key].keys():
-                            if self._devices:
-                                # Move variables to a proper device.
-                                # self._parameters[key][type1_key][
-                                #     type2_key
-                                # ] = jax.device_put(  # type: ignore
-                                #     new_parameters[key][type1_key],
-                                #     self._devices[key][type1_key],
-                                # )
-                                raise NotImplementedError(
-                                    "Support for devices"
-                                    + "have not been implemented"
-                                    + "yet in the parameter client."
-                                )
-                            else:
-                                self._parameters[key][type1_key][
-                                    type2_key
-                                ] = new_parameters[key][type1_key][type2_key]
+                            self._parameters[key][type1_key][
+                                type2_key
+                            ] = self._put_on_device(
+                                key, new_parameters[key][type1_key][type2_key]
+                            )
                     else:
-                        self._parameters[key][type1_key] = new_parameters[key][
-                            type1_key
-                        ]
+                        self._parameters[key][type1_key] = self._put_on_device(
+                            key, new_parameters[key][type1_key]
+                        )
             elif isinstance(new_parameters[key], np.ndarray):
-                if self._devices:
+                if key in self._devices:
                     self._parameters[key] = jax.device_put(
                         new_parameters[key], self._devices[key]  # type: ignore
                     )
@@ -349,15 +368,27 @@ class ParameterClient:
                         self._parameters[key] += new_parameters[key]
             elif isinstance(new_parameters[key], tuple):
                 for i in range(len(self._parameters[key])):
-                    if self._devices:
-                        self._parameters[key][i] = jax.device_put(
-                            new_parameters[key][i],
-                            self._devices[key][i],  # type: ignore
-                        )
-                    else:
-                        self._parameters[key][i] = new_parameters[key][i]
+                    self._parameters[key][i] = self._put_on_device(
+                        key, new_parameters[key][i]
+                    )
             else:
                 raise NotImplementedError(
-                    f"""Parameter type {type(new_parameters[key])} of '{key}' not implemented.
-                    Please use a mutable type for '{key}'"""
+                    f"Parameter type {type(new_parameters[key])} of '{key}' not "
+                    f"implemented. Please use a mutable type for '{key}'"
                 )
+
+        self._update_count += 1
+
+    def _put_on_device(self, key: str, value: Any) -> Any:
+        """Move a parameter value to the device of its parameter, if one is set.
+
+        Args:
+            key: parameter name.
+            value: new value of the parameter, which can be a nested structure.
+
+        Returns:
+            The value on the device of the parameter, or the unchanged value.
+        """
+        if key not in self._devices:
+            return value
+        return jax.device_put(value, self._devices[key])
@@ -0,0 +1,134 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilities for int8 quantised inference of haiku networks."""
+
+import functools
+from typing import Any, Callable, Dict, Tuple
+
+import haiku as hk
+import jax
+import jax.numpy as jnp
+
+INT8_MAX = 127
+
+
+def _symmetric_scale(array: jnp.ndarray, axis: int) -> jnp.ndarray:
+    """Scale mapping the largest absolute value along an axis to INT8_MAX."""
+    scale = jnp.max(jnp.abs(array), axis=axis, keepdims=True) / INT8_MAX
+    return jnp.where(scale == 0, 1.0, scale)
+
+
+def _to_int8(array: jnp.ndarray, scale: jnp.ndarray) -> jnp.ndarray:
+    """Round a scaled array to int8."""
+    return jnp.clip(jnp.round(array / scale), -INT8_MAX, INT8_MAX).astype(jnp.int8)
+
+
+def quantise_weights(weights: jnp.ndarray) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    """Quantise the weights of a linear layer to int8 per output channel.
+
+    Args:
+        weights: [input_size, output_size] float weights.
+
+    Returns:
+        int8 weights and the float scale of each output channel.
+    """
+    scale = _symmetric_scale(weights, axis=0)
+    return _to_int8(weights, scale), jnp.squeeze(scale, axis=0)
+
+
+@jax.jit
+def quantise_params(params: hk.Params) -> hk.Params:
+    """Quantise the weights of the linear layers of a haiku network.
+
+    The 2D "w" parameters, which belong to hk.Linear modules, are replaced by
+    int8 weights and a "w_scale" parameter holding their per output channel
+    scales. Other parameters, such as biases and layer norm scales, are kept
+    in float.
+
+    Args:
+        params: haiku network params.
+
+    Returns:
+        Params for a network run with quantised_apply.
+    """
+    quantised_params: Dict[str, Dict[str, jnp.ndarray]] = {}
+    for module_name, module_params in params.items():
+        module_params = dict(module_params)
+        if "w" in module_params and module_params["w"].ndim == 2:
+            module_params["w"], module_params["w_scale"] = quantise_weights(
+                module_params["w"]
+            )
+        quantised_params[module_name] = module_params
+    return quantised_params
+
+
+def int8_linear_interceptor(
+    next_f: Callable, args: Tuple, kwargs: Dict, context: hk.MethodContext
+) -> Any:
+    """Run hk.Linear layers as int8 matrix multiplications.
+
+    The inputs are quantised per row with a dynamic scale, multiplied with the
+    int8 weights into int32 accumulators, and rescaled to float before the
+    bias is added. Other modules run unchanged.
+    """
+    module = context.module
+    if not isinstance(module, hk.Linear) or context.method_name != "__call__":
+        return next_f(*args, **kwargs)
+
+    inputs = args[0] if args else kwargs["inputs"]
+    weights = hk.get_parameter(
+        "w", [inputs.shape[-1], module.output_size], jnp.int8, init=jnp.zeros
+    )
+    weights_scale = hk.get_parameter(
+        "w_scale", [module.output_size], jnp.float32, init=jnp.ones
+    )
+
+    inputs_scale = _symmetric_scale(inputs, axis=-1)
+    outputs = jax.lax.dot_general(
+        _to_int8(inputs, inputs_scale),
+        weights,
+        (((inputs.ndim - 1,), (0,)), ((), ())),
+        preferred_element_type=jnp.int32,
+    )
+    outputs = outputs.astype(jnp.float32) * inputs_scale * weights_scale
+    if module.with_bias:
+        outputs = outputs + hk.get_parameter(
+            "b", [module.output_size], jnp.float32, init=jnp.zeros
+        )
+    return outputs.astype(inputs.dtype)
+
+
+def quantised_apply(fn: Callable) -> Callable:
+    """Wrap a function applying haiku networks to run them with int8 layers.
+
+    The linear layers of the networks applied in fn must be given params
+    created by quantise_params. The interceptor is entered inside the wrapped
+    function, so it is active whenever the function is traced by jit.
+
+    Args:
+        fn: function applying haiku networks.
+
+    Returns:
+        The wrapped function.
+    """
+
+    @functools.wraps(fn)
+    def wrapped_fn(*args: Any, **kwargs: Any) -> Any:
+        """Run fn with the int8 linear interceptor."""
+        with hk.intercept_methods(int8_linear_interceptor):
+            return fn(*args, **kwargs)
+
+    return wrapped_fn
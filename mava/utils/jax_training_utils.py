@@ -13,6 +13,7 @@ from jax.config import config as jax_config
 from mava import constants
 from mava.core_jax import SystemExecutor
 from mava.types import OLT
+from mava.utils.jax_tree_utils import index_stacked_tree, stack_trees
 
 
 def action_mask_categorical_policies(
@@ -41,6 +42,61 @@ def init_norm_params(stats_shape: Tuple) -> Dict[str, Union[jnp.ndarray, float]]
     return stats
 
 
+def init_agent_norm_params(observation_specs: Dict[str, Any]) -> Dict[str, Any]:
+    """Initialise the normalisation parameters of every agent group
+
+    The agents with the same observation shape and dtype share a group, whose
+    stats are stacked along a leading agent axis, so they are updated and
+    applied in a single vectorised call without being restacked.
+
+    Args:
+        observation_specs (Dictionary) -- OLT namespace of specs of every agent.
+
+    Returns:
+        stacked stats of every agent group (Dictionary) keyed by agent_group_key.
+    """
+
+    return {
+        agent_group_key(agents): stack_trees(
+            [
+                init_norm_params(observation_specs[agent].observation.shape)
+                for agent in agents
+            ]
+        )
+        for agents in group_agents_by_observation(observation_specs)
+    }
+
+
+def agent_group_key(agents: List[str]) -> str:
+    """Key of the stacked normalisation parameters of a group of agents"""
+    return ",".join(agents)
+
+
+def agent_group_agents(group_key: str) -> List[str]:
+    """Agents of a group, in the order of its stacked normalisation parameters"""
+    return group_key.split(",")
+
+
+def get_agent_norm_params(
+    stats: Dict[str, Dict[str, jnp.ndarray]], agent: str
+) -> Dict[str, jnp.ndarray]:
+    """Return the normalisation parameters of an agent from its group
+
+    Args:
+        stats (Dictionary)   -- stacked stats of every agent group.
+        agent (str) -- agent id.
+
+    Returns:
+        running mean, var, std and count of the agent (Dictionary)
+    """
+
+    for group_key, group_stats in stats.items():
+        agents = agent_group_agents(group_key)
+        if agent in agents:
+            return index_stacked_tree(group_stats, agents.index(agent))
+    raise KeyError(f"No normalisation parameters for {agent}.")
+
+
 def construct_norm_axes_list(
     start_axes: int,
     elements_to_norm: Union[List[Any], None],
@@ -226,6 +282,75 @@ def update_and_normalize_observations(
     return upd_stats, observation._replace(observation=norm_obs)
 
 
+def group_agents_by_observation(observations: Dict[str, Any]) -> List[List[str]]:
+    """Group the agents whose observations have the same shape and dtype
+
+    Args:
+        observations (Dictionary) -- OLT namespace of every agent, which can
+            hold the observation specs.
+
+    Returns:
+        groups of agent ids, which can be stacked and normalised together.
+    """
+
+    groups: Dict[Tuple, List[str]] = {}
+    for agent, observation in observations.items():
+        obs = observation.observation
+        groups.setdefault((obs.shape, obs.dtype), []).append(agent)
+
+    return list(groups.values())
+
+
+def update_and_normalize_agent_observations(
+    stats: Dict[str, Dict[str, Union[jnp.array, float]]],
+    observations: Dict[str, OLT],
+    axes: Any = slice(0, 1),
+) -> Tuple[Dict[str, Any], Dict[str, OLT]]:
+    """Update running stats and normalise the observations of all agents
+
+    The stats of each agent group are stored stacked, and are updated with the
+    stacked observations of the group in a single vectorised call.
+
+    Args:
+        stats (Dictionary)   -- stacked running mean, var, count of every
+            agent group.
+        observations (Dictionary) -- OLT namespace of every agent.
+        axes (tuple of slices) -- which axes to normalise
+
+    Returns:
+        updated stats and normalised observations of every agent (Dictionaries)
+            the stats and observations of groups whose agents do not all have
+            observations are left unchanged.
+    """
+
+    def update_and_normalize(
+        agent_stats: Dict[str, Union[jnp.array, float]], obs: jnp.ndarray
+    ) -> Tuple[Any, jnp.ndarray]:
+        """Update the stats and normalise the observations of a single agent."""
+        upd_stats, norm_obs = update_and_normalize_observations(
+            agent_stats,
+            OLT(observation=obs, legal_actions=None, terminal=None),
+            axes=axes,
+        )
+        return upd_stats, norm_obs.observation
+
+    upd_stats, norm_observations = dict(stats), dict(observations)
+    for group_key, group_stats in stats.items():
+        agents = agent_group_agents(group_key)
+        if not all(agent in observations for agent in agents):
+            continue
+        stacked_obs = jnp.stack([observations[agent].observation for agent in agents])
+        upd_stats[group_key], norm_obs = jax.vmap(update_and_normalize)(
+            group_stats, stacked_obs
+        )
+        for i, agent in enumerate(agents):
+            norm_observations[agent] = observations[agent]._replace(
+                observation=norm_obs[i]
+            )
+
+    return upd_stats, norm_observations
+
+
 @jit
 def normalize_observations(
     stats: Dict[str, Union[jnp.array, float]], observation: Any
@@ -252,9 +377,57 @@ def normalize_observations(
     return observation._replace(observation=norm_obs)
 
 
+@jit
+def normalize_agent_observations(
+    stats: Dict[str, Dict[str, Union[jnp.array, float]]],
+    observations: Dict[str, Any],
+) -> Dict[str, OLT]:
+    """Normalise the observations of all agents in a single call
+
+    The observations of each agent group are stacked and normalised with the
+    stacked stats of the group.
+
+    Args:
+        stats (Dictionary)   -- stacked running mean, var, count of every
+            agent group.
+        observations (Dictionary) -- OLT namespace of every agent.
+
+    Returns:
+        normalised observations of every agent (Dictionary)
+            the observations of groups whose agents do not all have
+            observations are left unchanged.
+    """
+
+    norm_observations = dict(observations)
+    for group_key, group_stats in stats.items():
+        agents = agent_group_agents(group_key)
+        if not all(agent in observations for agent in agents):
+            continue
+        # The stats are cast to the observation dtype as in
+        # normalize_observations.
+        dtype = observations[agents[0]].observation.dtype
+        stacked_stats = {
+            key: jnp.array(group_stats[key], dtype=dtype) for key in ["mean", "std"]
+        }
+        stacked_obs = jnp.stack([observations[agent].observation for agent in agents])
+        norm_obs = jax.vmap(normalize)(stacked_stats, stacked_obs)
+        for i, agent in enumerate(agents):
+            norm_observations[agent] = observations[agent]._replace(
+                observation=norm_obs[i]
+            )
+
+    return norm_observations
+
+
 def executor_normalize_observation(executor: SystemExecutor, observations: Any) -> Any:
     """Execute the observations normalization before action selection
 
+    The observations of all agents are normalised in one jitted call. The
+    death masked agents keep their original observations afterwards, so the
+    call compiles once regardless of which agents are alive. The observations
+    of vectorised executors are stacked over their environments, which each
+    death mask their own agents.
+
     Args:
         executor (SystemExecutor) -- an environment executor
         observation (OLT namespace) -- current batch of observations
@@ -265,13 +438,28 @@ def executor_normalize_observation(executor: SystemExecutor, observations: Any)
 
     observations_stats = executor.store.norm_params[constants.OBS_NORM_STATE_DICT_KEY]
     agents = list(observations.keys())
+
+    norm_observations = normalize_agent_observations(observations_stats, observations)
+
+    if hasattr(executor.store, "env_death_masked_agents"):
+        env_death_masked_agents = executor.store.env_death_masked_agents
+        for key in agents:
+            observation = observations[key].observation
+            alive = np.array(
+                [key not in death_masked for death_masked in env_death_masked_agents]
+            )
+            alive = alive.reshape(alive.shape + (1,) * (observation.ndim - 1))
+            observations[key] = observations[key]._replace(
+                observation=jnp.where(
+                    alive, norm_observations[key].observation, observation
+                )
+            )
+        return observations
+
     death_masked_agents = executor.store.executor_environment.death_masked_agents
     agents_alive = list(set(agents) - set(death_masked_agents))
-
     for key in agents_alive:
-        observations[key] = normalize_observations(
-            observations_stats[key], observations[key]
-        )
+        observations[key] = norm_observations[key]
 
     return observations
 
@@ -22,3 +22,32 @@ def index_stacked_tree(tree: Any, index: int) -> Any:
 def stack_trees(trees: List) -> Any:
     """_description_"""
     return jax.tree_util.tree_map(lambda *leaves: jnp.stack(leaves), *trees)
+
+
+def set_stacked_tree_index(tree: Any, index: Any, value: Any) -> Any:
+    """Set the entries of a stacked tree at an index, or an array of indices."""
+    return jax.tree_util.tree_map(
+        lambda leaf, value_leaf: leaf.at[index].set(value_leaf), tree, value
+    )
+
+
+@jax.jit
+def reset_stacked_tree(tree: Any, reset_tree: Any, reset_mask: jnp.ndarray) -> Any:
+    """Replace the entries of a stacked tree where the reset mask is set.
+
+    Args:
+        tree: tree of arrays stacked along their first axis.
+        reset_tree: tree holding the reset values, either stacked like tree or
+            with the shape of a single stacked element.
+        reset_mask: boolean array with one entry per stacked element.
+
+    Returns:
+        Tree with the reset entries taken from reset_tree.
+    """
+
+    def reset(leaf: jnp.ndarray, reset_leaf: jnp.ndarray) -> jnp.ndarray:
+        """Reset the entries of a single leaf."""
+        mask = jnp.reshape(reset_mask, reset_mask.shape + (1,) * (leaf.ndim - 1))
+        return jnp.where(mask, reset_leaf, leaf)
+
+    return jax.tree_util.tree_map(reset, tree, reset_tree)
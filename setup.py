@@ -41,6 +41,7 @@ jax_requirements = [
     "jax==0.3.24",
     "jaxlib==0.3.24",
     "dm-haiku==0.0.8",
+    "jmp",
     "flax",
     "optax",
     "rlax",
@@ -0,0 +1,88 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the CompilationCache class for Jax-based Mava systems"""
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+import pytest
+from jax.experimental.compilation_cache import compilation_cache
+
+from mava.components.building.compilation_cache import (
+    CompilationCache,
+    CompilationCacheConfig,
+)
+from mava.systems.builder import Builder
+
+
+@pytest.fixture
+def mock_builder(tmp_path: Path) -> Builder:
+    """Mock builder with an experiment path"""
+    builder = Builder(components=[])
+    builder.store.global_config = SimpleNamespace(experiment_path=str(tmp_path))
+    builder.store.executor_id = "executor_0"
+    builder.store.trainer_id = "trainer_0"
+    return builder
+
+
+@pytest.fixture(autouse=True)
+def reset_cache() -> Iterator[None]:
+    """Reset the global compilation cache after every test"""
+    yield
+    if compilation_cache.is_initialized():
+        compilation_cache.reset_cache()
+
+
+def test_on_building_trainer_start(mock_builder: Builder, tmp_path: Path) -> None:
+    """Test that the trainer sets up the cache under the experiment path"""
+    CompilationCache().on_building_trainer_start(builder=mock_builder)
+
+    assert compilation_cache.is_initialized()
+    assert os.path.isdir(tmp_path / "compilation_cache")
+
+
+def test_on_building_executor_start_custom_dir(
+    mock_builder: Builder, tmp_path: Path
+) -> None:
+    """Test that the executor uses the configured cache directory"""
+    cache_dir = tmp_path / "shared_cache"
+    compilation_cache_component = CompilationCache(
+        config=CompilationCacheConfig(compilation_cache_dir=str(cache_dir))
+    )
+
+    compilation_cache_component.on_building_executor_start(builder=mock_builder)
+
+    assert compilation_cache.is_initialized()
+    assert os.path.isdir(cache_dir)
+
+
+def test_nodes_share_the_cache_of_their_process(
+    mock_builder: Builder, tmp_path: Path
+) -> None:
+    """Test that nodes in the same process can only use the same cache"""
+    compilation_cache_component = CompilationCache()
+    compilation_cache_component.on_building_trainer_start(builder=mock_builder)
+    compilation_cache_component.on_building_executor_start(builder=mock_builder)
+    assert compilation_cache.is_initialized()
+
+    other_cache_dir = tmp_path / "other_cache"
+    with pytest.raises(ValueError, match="already initialised"):
+        CompilationCache(
+            config=CompilationCacheConfig(compilation_cache_dir=str(other_cache_dir))
+        ).on_building_executor_start(builder=mock_builder)
+    assert not os.path.isdir(other_cache_dir)
@@ -13,11 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Tests for TransitionDataset and TrajectoryDataset classes for Jax-based Mava"""
+"""Tests for the dataset components for Jax-based Mava"""
 
 from types import SimpleNamespace
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Iterator
 
+import jax
+import numpy as np
 import pytest
 import reverb
 from tensorflow.python.framework import dtypes, ops
@@ -25,6 +27,9 @@ from tensorflow.python.framework import dtypes, ops
 from mava import specs
 from mava.adders import reverb as reverb_adders
 from mava.components.building.datasets import (
+    DevicePrefetch,
+    DevicePrefetchConfig,
+    DevicePrefetchIterator,
     TrajectoryDataset,
     TrajectoryDatasetConfig,
     TransitionDataset,
@@ -283,3 +288,58 @@ def test_on_building_trainer_dataset_trajectory_dataset(
         dataset._input_dataset._rate_limiter_timeout_ms
         == trajectory_dataset.config.rate_limiter_timeout_ms
     )
+
+
+def test_device_prefetch_iterator() -> None:
+    """Test DevicePrefetchIterator returns all samples in order on device"""
+    samples = [{"obs": np.full((2, 3), i)} for i in range(5)]
+    iterator = DevicePrefetchIterator(iter(samples), buffer_size=2)
+
+    prefetched = list(iterator)
+
+    assert len(prefetched) == len(samples)
+    for sample, prefetched_sample in zip(samples, prefetched):
+        assert isinstance(prefetched_sample["obs"], jax.Array)
+        np.testing.assert_array_equal(prefetched_sample["obs"], sample["obs"])
+    assert iterator.wait_time >= 0
+
+    # The iterator stays exhausted.
+    with pytest.raises(StopIteration):
+        next(iterator)
+
+
+def test_device_prefetch_iterator_error() -> None:
+    """Test DevicePrefetchIterator re-raises errors of the wrapped iterator"""
+
+    def failing_iterator() -> Iterator[np.ndarray]:
+        """Yield one sample and fail"""
+        yield np.zeros(2)
+        raise RuntimeError("sampling failed")
+
+    iterator = DevicePrefetchIterator(failing_iterator(), buffer_size=1)
+
+    np.testing.assert_array_equal(next(iterator), np.zeros(2))
+    with pytest.raises(RuntimeError, match="sampling failed"):
+        next(iterator)
+
+
+def test_device_prefetch_iterator_invalid_buffer_size() -> None:
+    """Test DevicePrefetchIterator rejects a non positive buffer size"""
+    with pytest.raises(ValueError):
+        DevicePrefetchIterator(iter([]), buffer_size=0)
+
+
+def test_on_building_trainer_end_device_prefetch() -> None:
+    """Test on_building_trainer_end of DevicePrefetch Component"""
+    config = DevicePrefetchConfig(prefetch_buffer_size=3)
+    device_prefetch = DevicePrefetch(config=config)
+    builder = SimpleNamespace(
+        store=SimpleNamespace(dataset_iterator=iter([np.ones(2), np.zeros(2)]))
+    )
+
+    device_prefetch.on_building_trainer_end(builder=builder)  # type: ignore
+
+    assert isinstance(builder.store.dataset_iterator, DevicePrefetchIterator)
+    assert builder.store.log_data_wait_time is True
+    np.testing.assert_array_equal(next(builder.store.dataset_iterator), np.ones(2))
+    np.testing.assert_array_equal(next(builder.store.dataset_iterator), np.zeros(2))
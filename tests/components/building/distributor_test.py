@@ -24,7 +24,8 @@ from reverb import client as reverb_client
 from reverb import item_selectors, rate_limiters
 from reverb import server as reverb_server
 
-from mava.components.building.distributor import Distributor
+from mava.components.building.distributor import Distributor, DistributorConfig
+from mava.components.executing import InferenceServerExecutorSelectAction
 from mava.systems.builder import Builder
 from mava.systems.launcher import Launcher
 
@@ -50,6 +51,7 @@ class MockBuilder(Builder):
             trainer_networks=trainer_networks, base_key=base_key, program=program
         )
         self.store = store
+        self.callbacks: List[Any] = []
         self.program_launched = False
 
     def data_server(self) -> List[Any]:
@@ -72,13 +74,24 @@ class MockBuilder(Builder):
         """parameter_server to test on_building_program_nodes"""
         return "Parameter Server Test"
 
+    def inference_server(self, parameter_server_client: Any) -> str:
+        """Inference server to test on_building_program_nodes method"""
+        return "Inference Server Test"
+
     def executor(
-        self, executor_id: str, data_server_client: Any, parameter_server_client: Any
+        self,
+        executor_id: str,
+        data_server_client: Any,
+        parameter_server_client: Any,
+        inference_server_client: Any = None,
     ) -> str:
         """Executor to test on_building_program_nodes method"""
         if executor_id == "evaluator":
             return "Evaluator Test"
 
+        elif inference_server_client is not None:
+            return "Executor Test with " + inference_server_client
+
         else:
             return "Executor Test"
 
@@ -278,6 +291,70 @@ def test_on_building_program_nodes_no_evaluator(
     assert trainer == "Trainer Test"
 
 
+def test_on_building_program_nodes_inference_server(
+    mock_builder: MockBuilder,
+) -> None:
+    """Test on_building_program_nodes with an inference server"""
+    mock_builder.callbacks = [InferenceServerExecutorSelectAction()]
+    distributor = Distributor(DistributorConfig(run_inference_server=True))
+    distributor.on_building_program_nodes(builder=mock_builder)
+
+    assert list(mock_builder.store.program._program._groups.keys()) == [
+        "data_server",
+        "parameter_server",
+        "inference_server",
+        "executor",
+        "evaluator",
+        "trainer",
+    ]
+    assert mock_builder.store.inference_key.shape == (2,)
+    assert (
+        mock_builder.store.program._program._groups["inference_server"][
+            -1
+        ]._constructor("fake_parameter_server")
+        == "Inference Server Test"
+    )
+    assert (
+        mock_builder.store.program._program._groups["executor"][-1]._constructor(
+            "executor", "fake_data_server", "fake_parameter_server", "fake_server"
+        )
+        == "Executor Test with fake_server"
+    )
+
+
+def test_on_building_program_nodes_inference_server_single_process(
+    mock_builder: MockBuilder,
+) -> None:
+    """Test on_building_program_nodes, single process, with an inference server"""
+    mock_builder.callbacks = [InferenceServerExecutorSelectAction()]
+    distributor = Distributor(
+        DistributorConfig(multi_process=False, run_inference_server=True)
+    )
+    distributor.on_building_program_nodes(builder=mock_builder)
+
+    (
+        _,
+        _,
+        inference_server,
+        executor,
+        evaluator,
+        _,
+    ) = mock_builder.store.system_build
+
+    assert inference_server == "Inference Server Test"
+    assert executor == "Executor Test with Inference Server Test"
+    assert evaluator == "Evaluator Test"
+
+
+def test_on_building_program_nodes_inference_server_requires_component(
+    mock_builder: MockBuilder,
+) -> None:
+    """Test that an inference server needs the inference server select action"""
+    distributor = Distributor(DistributorConfig(run_inference_server=True))
+    with pytest.raises(ValueError, match="InferenceServerExecutorSelectAction"):
+        distributor.on_building_program_nodes(builder=mock_builder)
+
+
 def test_on_building_launch(
     mock_builder: MockBuilder, distributor: Distributor
 ) -> None:
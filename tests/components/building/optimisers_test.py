@@ -15,6 +15,7 @@
 
 """Optimisers unit tests"""
 
+import jax.numpy as jnp
 import optax
 import pytest
 
@@ -22,6 +23,7 @@ from mava.components.building.optimisers import (
     DefaultOptimisers,
     DefaultOptimisersConfig,
     Optimisers,
+    get_network_optimisers,
 )
 from mava.core_jax import SystemBuilder
 from mava.systems import Builder
@@ -123,3 +125,68 @@ def test_default_optimisers_empty_config_optimisers(
         == default_optimisers_empty_config_optimisers.config.critic_optimiser
     )
     assert isinstance(test_builder.store.critic_optimiser, optax.GradientTransformation)
+
+
+def test_default_optimisers_network_learning_rates(
+    test_builder: SystemBuilder,
+) -> None:
+    """Test that networks with their own learning rate get their own optimiser.
+
+    Args:
+        test_builder: Pytest fixture for test system builder
+
+    Returns:
+        None.
+    """
+    optimisers = DefaultOptimisers(
+        config=DefaultOptimisersConfig(
+            policy_network_learning_rates=(("network_agent_1", 1e-2),)
+        )
+    )
+    optimisers.on_building_init_start(test_builder)
+
+    assert list(test_builder.store.policy_network_optimisers.keys()) == [
+        "network_agent_1"
+    ]
+    assert test_builder.store.critic_network_optimisers == {}
+
+    policy_optimiser, critic_optimiser = get_network_optimisers(
+        test_builder.store, "network_agent_1"
+    )
+    assert (
+        policy_optimiser
+        == test_builder.store.policy_network_optimisers["network_agent_1"]
+    )
+    assert critic_optimiser == test_builder.store.critic_optimiser
+
+    policy_optimiser, _ = get_network_optimisers(test_builder.store, "network_agent_0")
+    assert policy_optimiser == test_builder.store.policy_optimiser
+
+
+def test_default_optimisers_critic_learning_rate(
+    test_builder: SystemBuilder,
+) -> None:
+    """Test that the critic optimiser uses the critic learning rate.
+
+    Args:
+        test_builder: Pytest fixture for test system builder
+
+    Returns:
+        None.
+    """
+    optimisers = DefaultOptimisers(
+        config=DefaultOptimisersConfig(
+            policy_learning_rate=1e-3, critic_learning_rate=1e-2
+        )
+    )
+    optimisers.on_building_init_start(test_builder)
+
+    params = {"w": jnp.zeros(2)}
+    gradients = {"w": jnp.array([0.1, -0.1])}
+    updates = {}
+    for name in ["policy_optimiser", "critic_optimiser"]:
+        optimiser = getattr(test_builder.store, name)
+        updates[name], _ = optimiser.update(gradients, optimiser.init(params), params)
+    assert jnp.allclose(
+        updates["critic_optimiser"]["w"], 10 * updates["policy_optimiser"]["w"]
+    )
@@ -18,6 +18,7 @@
 from types import SimpleNamespace
 from typing import Any
 
+import jax
 import numpy as np
 import pytest
 from optax import EmptyState
@@ -30,6 +31,7 @@ from mava.components.building.parameter_client import (
     TrainerParameterClient,
     TrainerParameterClientConfig,
 )
+from mava.components.executing import InferenceServerExecutorSelectAction
 from mava.systems.builder import Builder
 from mava.systems.parameter_server import ParameterServer
 
@@ -271,6 +273,75 @@ def test_executor_parameter_client_no_evaluator_with_parameter_client(
     assert mock_builder.store.executor_counts == initial_count_parameters
 
 
+def test_executor_parameter_client_device_params(
+    mock_builder_with_parameter_client: Builder,
+) -> None:
+    """Test that the executor keeps its action selection params on device.
+
+    Args:
+        mock_builder_with_parameter_client : mava builder object
+    """
+    mock_builder = mock_builder_with_parameter_client
+    exec_param_client = ExecutorParameterClient()
+    exec_param_client.on_building_executor_parameter_client(builder=mock_builder)
+
+    devices = mock_builder.store.executor_parameter_client._devices
+    assert sorted(devices.keys()) == [
+        "norm_params",
+        "policy_network-network_agent_0",
+        "policy_network-network_agent_1",
+        "policy_network-network_agent_2",
+    ]
+    assert all(device == jax.local_devices()[0] for device in devices.values())
+
+    exec_param_client = ExecutorParameterClient(
+        ExecutorParameterClientConfig(executor_device_params=False)
+    )
+    exec_param_client.on_building_executor_parameter_client(builder=mock_builder)
+    assert mock_builder.store.executor_parameter_client._devices == {}
+
+
+def test_executor_parameter_client_with_inference_server(
+    mock_builder_with_parameter_client: Builder,
+) -> None:
+    """Test that executors using an inference server do not fetch network params.
+
+    Args:
+        mock_builder_with_parameter_client : mava builder object
+    """
+    mock_builder = mock_builder_with_parameter_client
+    mock_builder.callbacks = [InferenceServerExecutorSelectAction()]
+    mock_builder.store.inference_server_client = "inference_server"
+    exec_param_client = ExecutorParameterClient()
+    exec_param_client.on_building_executor_parameter_client(builder=mock_builder)
+
+    parameter_client = mock_builder.store.executor_parameter_client
+    assert not any(
+        key.startswith(("policy_network", "critic_network"))
+        for key in parameter_client._get_keys
+    )
+    assert "norm_params" in parameter_client._get_keys
+    assert "executor_steps" in parameter_client._get_keys
+
+
+def test_executor_parameter_client_with_inference_server_no_component(
+    mock_builder_with_parameter_client: Builder,
+) -> None:
+    """Test that executors selecting their own actions fetch network params.
+
+    Args:
+        mock_builder_with_parameter_client : mava builder object
+    """
+    mock_builder = mock_builder_with_parameter_client
+    mock_builder.store.inference_server_client = "inference_server"
+    exec_param_client = ExecutorParameterClient()
+    exec_param_client.on_building_executor_parameter_client(builder=mock_builder)
+
+    parameter_client = mock_builder.store.executor_parameter_client
+    assert "policy_network-network_agent_0" in parameter_client._get_keys
+    assert "critic_network-network_agent_0" in parameter_client._get_keys
+
+
 def test_executor_parameter_client_evaluator_with_parameter_client(
     mock_builder_with_parameter_client: Builder,
 ) -> None:
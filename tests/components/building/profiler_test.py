@@ -0,0 +1,102 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Profiler class for Jax-based Mava systems"""
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import jax.numpy as jnp
+import pytest
+
+from mava.components.building.profiler import Profiler, ProfilerConfig
+from mava.systems.builder import Builder
+from mava.systems.executor import Executor
+from mava.systems.trainer import Trainer
+
+
+@pytest.fixture
+def mock_builder(tmp_path: Path) -> Builder:
+    """Mock builder with an experiment path"""
+    builder = Builder(components=[])
+    builder.store.global_config = SimpleNamespace(experiment_path=str(tmp_path))
+    builder.store.executor_id = "executor_0"
+    builder.store.trainer_id = "trainer_0"
+    builder.store.is_evaluator = False
+    return builder
+
+
+def has_trace(trace_dir: str) -> bool:
+    """Check that a trace was written in the directory"""
+    return any(
+        file_name.endswith(".xplane.pb")
+        for _, _, file_names in os.walk(trace_dir)
+        for file_name in file_names
+    )
+
+
+def test_profile_trainer_steps(mock_builder: Builder, tmp_path: Path) -> None:
+    """Test that the chosen trainer steps are traced"""
+    profiler = Profiler(ProfilerConfig(profiler_trainer_steps=(1, 2)))
+    profiler.on_building_trainer_start(builder=mock_builder)
+    trace_dir = str(tmp_path / "profiler" / "trainer_0")
+    assert mock_builder.store.profiler_trace_dir == trace_dir
+
+    trainer = Trainer(store=mock_builder.store)
+    profiler.on_training_init(trainer=trainer)
+    for _ in range(3):
+        profiler.on_training_step_start(trainer=trainer)
+        jnp.ones(3).sum().block_until_ready()
+
+    assert trainer.store.profiler_step == 3
+    assert has_trace(trace_dir)
+
+
+def test_profile_executor_episodes(mock_builder: Builder, tmp_path: Path) -> None:
+    """Test that the chosen episodes of the profiled executor are traced"""
+    profiler = Profiler(
+        ProfilerConfig(
+            profiler_trainer_steps=None,
+            profiler_executor_episodes=(0, 1),
+            profiler_trace_dir=str(tmp_path / "traces"),
+        )
+    )
+    profiler.on_building_executor_start(builder=mock_builder)
+
+    executor = Executor(store=mock_builder.store)
+    profiler.on_execution_init_end(executor=executor)
+    for _ in range(2):
+        profiler.on_execution_observe_first_start(executor=executor)
+        jnp.ones(3).sum().block_until_ready()
+
+    assert has_trace(str(tmp_path / "traces" / "executor_0"))
+
+
+def test_skip_unprofiled_nodes(mock_builder: Builder) -> None:
+    """Test that other executors and disabled trainers are not traced"""
+    profiler = Profiler(
+        ProfilerConfig(profiler_trainer_steps=None, profiler_executor_episodes=(0, 1))
+    )
+    mock_builder.store.executor_id = "executor_1"
+
+    profiler.on_building_trainer_start(builder=mock_builder)
+    profiler.on_building_executor_start(builder=mock_builder)
+    assert not hasattr(mock_builder.store, "profiler_trace_dir")
+
+    executor = Executor(store=mock_builder.store)
+    profiler.on_execution_init_end(executor=executor)
+    profiler.on_execution_observe_first_start(executor=executor)
+    assert executor.store.profiler_episode == 1
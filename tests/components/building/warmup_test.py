@@ -0,0 +1,215 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the CompilationWarmup class for Jax-based Mava systems"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+import tensorflow as tf
+from acme import specs
+
+from mava.components.building.warmup import (
+    CompilationWarmup,
+    CompilationWarmupConfig,
+    zeros_from_spec,
+)
+from mava.systems.builder import Builder
+from mava.systems.trainer import Trainer
+
+
+class MockNetwork:
+    """Mock of a network with optional recurrent state"""
+
+    def __init__(self, init_state: Optional[jnp.ndarray] = None) -> None:
+        """Initialise mock network"""
+        self.params = {"w": jnp.ones(3)}
+        self.init_state = init_state
+
+    def get_params(self) -> Dict[str, jnp.ndarray]:
+        """Return the network params"""
+        return self.params
+
+    def get_init_state(self) -> Optional[jnp.ndarray]:
+        """Return the initial recurrent state"""
+        return self.init_state
+
+
+class MockAgentSpecs:
+    """Mock of a multi-agent environment spec"""
+
+    def get_agent_environment_specs(self) -> Dict[str, Any]:
+        """Return the specs of every agent"""
+        agent_spec = SimpleNamespace(
+            observations=specs.Array(shape=(3,), dtype=np.float32)
+        )
+        return {"agent_0": agent_spec, "agent_1": agent_spec}
+
+
+def make_mock_builder(init_state: Optional[jnp.ndarray] = None) -> Builder:
+    """Create a mock builder with a jitted action selection function"""
+    builder = Builder(components=[])
+    builder.store.executor_id = "executor_0"
+    builder.store.ma_environment_spec = MockAgentSpecs()
+    builder.store.agent_net_keys = {"agent_0": "network", "agent_1": "network"}
+    builder.store.networks = {"network": MockNetwork(init_state)}
+    builder.store.base_key = jax.random.PRNGKey(0)
+    builder.store.num_traces = 0
+
+    def select_actions(observations: Any, params: Any, *args: Any) -> Any:
+        """Action selection that counts its traces"""
+        builder.store.num_traces += 1
+        return {
+            agent: jnp.sum(params["network"]["w"] * obs)
+            for agent, obs in observations.items()
+        }, args
+
+    builder.store.select_actions_fn = jax.jit(select_actions)
+    builder.store.select_actions_params_fn = lambda network: builder.store.networks[
+        network
+    ].get_params()
+    return builder
+
+
+@pytest.fixture
+def mock_trainer() -> Trainer:
+    """Mock trainer with a warmup step function"""
+    trainer = Trainer(store=SimpleNamespace())
+    trainer.store.trainer_id = "trainer_0"
+    trainer.store.dataset_iterator = iter([])
+    trainer.store.dataset_element_spec = {
+        "observations": tf.TensorSpec(shape=(2, 3), dtype=tf.float32),
+        "actions": tf.TensorSpec(shape=(2,), dtype=tf.int32),
+    }
+
+    def warmup_step_fn(sample: Any) -> float:
+        """Store the warmup sample"""
+        trainer.store.warmup_sample = sample
+        return 1.5
+
+    trainer.store.warmup_step_fn = warmup_step_fn
+    return trainer
+
+
+def test_zeros_from_spec() -> None:
+    """Test that zeros are created for array and tensor specs"""
+    zeros = zeros_from_spec(
+        {
+            "array": specs.Array(shape=(2,), dtype=np.int64),
+            "tensor": tf.TensorSpec(shape=(3, 1), dtype=tf.float32),
+        }
+    )
+
+    assert zeros["array"].shape == (2,) and zeros["array"].dtype == np.int64
+    assert zeros["tensor"].shape == (3, 1) and zeros["tensor"].dtype == np.float32
+    assert not zeros["tensor"].any()
+
+
+def test_on_training_init_end(mock_trainer: Trainer) -> None:
+    """Test that the step function is warmed up on a sample of zeros"""
+    CompilationWarmup().on_training_init_end(trainer=mock_trainer)
+
+    sample = mock_trainer.store.warmup_sample
+    assert sample["observations"].shape == (2, 3)
+    assert sample["actions"].dtype == np.int32
+    assert mock_trainer.store.step_compile_time == 1.5
+
+
+def test_on_training_init_end_disabled(mock_trainer: Trainer) -> None:
+    """Test that the trainer warmup can be turned off"""
+    warmup = CompilationWarmup(CompilationWarmupConfig(warmup_trainer=False))
+    warmup.on_training_init_end(trainer=mock_trainer)
+
+    assert not hasattr(mock_trainer.store, "warmup_sample")
+    assert not hasattr(mock_trainer.store, "step_compile_time")
+
+
+def test_on_building_executor_end_feedforward() -> None:
+    """Test that a warmed up action selection does not compile again"""
+    builder = make_mock_builder()
+    CompilationWarmup().on_building_executor_end(builder=builder)
+
+    assert builder.store.num_traces == 1
+    assert builder.store.select_actions_compile_time > 0
+
+    observations = {
+        "agent_0": np.ones(3, dtype=np.float32),
+        "agent_1": np.ones(3, dtype=np.float32),
+    }
+    params = {"network": builder.store.networks["network"].get_params()}
+    builder.store.select_actions_fn(observations, params, builder.store.base_key)
+    assert builder.store.num_traces == 1
+
+
+def test_on_building_executor_end_recurrent() -> None:
+    """Test that recurrent executors are warmed up with their initial states"""
+    builder = make_mock_builder(init_state=jnp.zeros(4))
+    CompilationWarmup().on_building_executor_end(builder=builder)
+
+    assert builder.store.num_traces == 1
+
+    observations = {
+        "agent_0": np.ones(3, dtype=np.float32),
+        "agent_1": np.ones(3, dtype=np.float32),
+    }
+    params = {"network": builder.store.networks["network"].get_params()}
+    policy_states = jnp.zeros((2, 4))
+    builder.store.select_actions_fn(
+        observations, params, policy_states, builder.store.base_key
+    )
+    assert builder.store.num_traces == 1
+
+
+def test_on_building_executor_end_select_actions_params() -> None:
+    """Test that the warmup uses the params of the action selection component"""
+    builder = make_mock_builder()
+    # e.g. the int8 params of the quantised action selection.
+    builder.store.select_actions_params_fn = lambda network: {
+        "w": jnp.ones(3, dtype=jnp.int8)
+    }
+    CompilationWarmup().on_building_executor_end(builder=builder)
+
+    assert builder.store.num_traces == 1
+
+    observations = {
+        "agent_0": np.ones(3, dtype=np.float32),
+        "agent_1": np.ones(3, dtype=np.float32),
+    }
+    params = {"network": {"w": jnp.ones(3, dtype=jnp.int8)}}
+    builder.store.select_actions_fn(observations, params, builder.store.base_key)
+    assert builder.store.num_traces == 1
+
+
+def test_on_building_executor_end_disabled() -> None:
+    """Test that the executor warmup can be turned off"""
+    builder = make_mock_builder()
+    warmup = CompilationWarmup(CompilationWarmupConfig(warmup_executor=False))
+    warmup.on_building_executor_end(builder=builder)
+
+    assert builder.store.num_traces == 0
+    assert not hasattr(builder.store, "select_actions_compile_time")
+
+
+def test_on_building_executor_end_inference_server() -> None:
+    """Test that executors selecting actions on an inference server are skipped"""
+    builder = make_mock_builder()
+    del builder.store.select_actions_fn
+    CompilationWarmup().on_building_executor_end(builder=builder)
+
+    assert not hasattr(builder.store, "select_actions_compile_time")
@@ -17,18 +17,24 @@
 
 from dataclasses import dataclass
 from types import SimpleNamespace
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 import chex
+import haiku as hk
 import jax
 import jax.numpy as jnp
 import pytest
+import tensorflow_probability.substrates.jax.distributions as tfd
 from acme.jax import networks as networks_lib
 
 from mava import constants
 from mava.components.executing.action_selection import (
     FeedforwardExecutorSelectAction,
+    InferenceServerExecutorSelectAction,
+    QuantisedFeedforwardExecutorSelectAction,
     RecurrentExecutorSelectAction,
+    VectorisedFeedforwardExecutorSelectAction,
+    VectorisedRecurrentExecutorSelectAction,
 )
 from mava.components.normalisation.observation_normalisation import (
     ObservationNormalisation,
@@ -36,6 +42,7 @@ from mava.components.normalisation.observation_normalisation import (
 from mava.components.normalisation.value_normalisation import ValueNormalisation
 from mava.systems.executor import Executor
 from mava.types import OLT, NestedArray
+from mava.utils.jax_quantisation_utils import quantise_params
 
 
 @dataclass
@@ -203,17 +210,18 @@ class MockFeedForwardExecutor(Executor):
         action_info = "action_info_test"
         policy_info = "policy_info_test"
 
+        # The stats of the agents are stacked in a single group.
+        num_agents, obs_shape = 3, 3
         norm_params: Any = {
-            constants.OBS_NORM_STATE_DICT_KEY: {},
+            constants.OBS_NORM_STATE_DICT_KEY: {
+                "agent_0,agent_1,agent_2": dict(
+                    mean=jnp.zeros(shape=(num_agents, obs_shape)),
+                    var=jnp.ones(shape=(num_agents, obs_shape)) * 4,
+                    std=jnp.ones(shape=(num_agents, obs_shape)) * 2,
+                    count=jnp.full((num_agents, 1), 10),
+                )
+            },
         }
-        for agent in ["agent_0", "agent_1", "agent_2"]:
-            obs_shape = 3
-            norm_params[constants.OBS_NORM_STATE_DICT_KEY][agent] = dict(
-                mean=jnp.zeros(shape=obs_shape),
-                var=jnp.ones(shape=obs_shape) * 4,
-                std=jnp.ones(shape=obs_shape) * 2,
-                count=jnp.array([10]),
-            )
 
         store = SimpleNamespace(
             is_evaluator=None,
@@ -311,6 +319,49 @@ def test_on_execution_select_actions_ff(
         )
 
 
+def test_on_execution_select_actions_ff_caches_params(
+    mock_feedforward_executor: Executor,
+    ff_executor_select_action: FeedforwardExecutorSelectAction,
+) -> None:
+    """Test that the params are only refreshed when new values are received.
+
+    Args:
+        ff_executor_select_action: FeedforwardExecutorSelectAction
+        mock_feedforward_executor: Executor
+    """
+    store = mock_feedforward_executor.store
+    store.executor_parameter_client = SimpleNamespace(update_count=0)
+
+    ff_executor_select_action.on_execution_select_actions(
+        executor=mock_feedforward_executor
+    )
+    current_params = store.current_params
+    assert sorted(current_params.keys()) == [
+        "network_agent_0",
+        "network_agent_1",
+        "network_agent_2",
+    ]
+
+    ff_executor_select_action.on_execution_select_actions(
+        executor=mock_feedforward_executor
+    )
+    assert store.current_params is current_params
+
+    store.executor_parameter_client.update_count = 1
+    ff_executor_select_action.on_execution_select_actions(
+        executor=mock_feedforward_executor
+    )
+    assert store.current_params is not current_params
+
+    # Agents that switch networks also refresh the params.
+    current_params = store.current_params
+    store.agent_net_keys = {agent: "network_agent_0" for agent in store.observations}
+    ff_executor_select_action.on_execution_select_actions(
+        executor=mock_feedforward_executor
+    )
+    assert list(store.current_params.keys()) == ["network_agent_0"]
+
+
 #######################
 # Recurrent executors  #
 #######################
@@ -384,17 +435,18 @@ class MockRecurrentExecutor(Executor):  # type: ignore # noqa: E501
         action_info = "action_info_test"
         policy_info = "policy_info_test"
 
+        # The stats of the agents are stacked in a single group.
+        num_agents, obs_shape = 3, 3
         norm_params: Any = {
-            constants.OBS_NORM_STATE_DICT_KEY: {},
+            constants.OBS_NORM_STATE_DICT_KEY: {
+                "agent_0,agent_1,agent_2": dict(
+                    mean=jnp.zeros(shape=(num_agents, obs_shape)),
+                    var=jnp.ones(shape=(num_agents, obs_shape)) * 4,
+                    std=jnp.ones(shape=(num_agents, obs_shape)) * 2,
+                    count=jnp.full((num_agents, 1), 10),
+                )
+            },
         }
-        for agent in ["agent_0", "agent_1", "agent_2"]:
-            obs_shape = 3
-            norm_params[constants.OBS_NORM_STATE_DICT_KEY][agent] = dict(
-                mean=jnp.zeros(shape=obs_shape),
-                var=jnp.ones(shape=obs_shape) * 4,
-                std=jnp.ones(shape=obs_shape) * 2,
-                count=jnp.array([10]),
-            )
 
         store = SimpleNamespace(
             is_evaluator=None,
@@ -488,3 +540,335 @@ def test_on_execution_select_actions_recurrent(  # type: ignore # noqa: E501
             mock_recurrent_executor.store.policies_info[agent] == "policy_info_" + agent
         )
         assert mock_recurrent_executor.store.policy_states[agent] == agent
+
+
+##########################
+# Vectorised executors    #
+##########################
+def vectorised_get_action(
+    observations: networks_lib.Observation,
+    params: Dict[str, jnp.ndarray],
+    base_key: networks_lib.PRNGKey,
+    mask: chex.Array,
+    policy_state: Any = None,
+) -> Any:
+    """Traceable get_action used to test the vectorised action selection.
+
+    Returns:
+        action_info, policy info and, if given, the next policy state
+    """
+    actions = observations * params["scale"] * mask
+    policy_info = {"log_prob": jax.random.uniform(base_key, (1,))}
+    if policy_state is None:
+        return actions, policy_info
+    return actions, policy_info, policy_state + 1
+
+
+@pytest.fixture
+def mock_vectorised_executor() -> Executor:
+    """Mock executor where agent_0 and agent_1 share a network."""
+    observations = {
+        agent: OLT(
+            observation=jnp.array([0.1, 0.5, 0.7]) * (i + 1),
+            legal_actions=jnp.array([1.0, 0.0, 1.0]),
+            terminal=jnp.array([0.0]),
+        )
+        for i, agent in enumerate(["agent_0", "agent_1", "agent_2"])
+    }
+    agent_net_keys = {
+        "agent_0": "network_0",
+        "agent_1": "network_0",
+        "agent_2": "network_1",
+    }
+    networks = {
+        "network_0": SimpleNamespace(get_action=vectorised_get_action),
+        "network_1": SimpleNamespace(get_action=vectorised_get_action),
+    }
+    store = SimpleNamespace(
+        is_evaluator=None,
+        observations=observations,
+        # Policy states of the agents stacked in sorted agent order.
+        policy_states=jnp.array([[0.0], [1.0], [2.0]]),
+        params={
+            "network_0": {"scale": jnp.array(2.0)},
+            "network_1": {"scale": jnp.array(3.0)},
+        },
+        networks=networks,
+        agent_net_keys=agent_net_keys,
+        base_key=jax.random.PRNGKey(5),
+    )
+    return Executor(store=store)
+
+
+def test_vectorised_select_actions_ff(mock_vectorised_executor: Executor) -> None:
+    """Test that vectorised action selection calls each network once per agent.
+
+    Args:
+        mock_vectorised_executor: Executor
+    """
+    VectorisedFeedforwardExecutorSelectAction().on_execution_init_end(
+        executor=mock_vectorised_executor
+    )
+    store = mock_vectorised_executor.store
+    actions_info, policies_info, base_key = store.select_actions_fn(
+        store.observations, store.params, store.base_key
+    )
+
+    assert sorted(actions_info.keys()) == ["agent_0", "agent_1", "agent_2"]
+    for agent, observation in store.observations.items():
+        scale = store.params[store.agent_net_keys[agent]]["scale"]
+        expected = observation.observation * scale * observation.legal_actions
+        assert jnp.allclose(actions_info[agent], expected[None])
+        assert policies_info[agent]["log_prob"].shape == (1,)
+
+    # Every agent gets its own key and the base key is advanced.
+    log_probs = [float(policies_info[agent]["log_prob"][0]) for agent in actions_info]
+    assert len(set(log_probs)) == 3
+    assert not jnp.array_equal(base_key, store.base_key)
+
+
+def test_vectorised_select_actions_recurrent(
+    mock_vectorised_executor: Executor,
+) -> None:
+    """Test that vectorised recurrent action selection updates each policy state.
+
+    Args:
+        mock_vectorised_executor: Executor
+    """
+    VectorisedRecurrentExecutorSelectAction().on_execution_init_end(
+        executor=mock_vectorised_executor
+    )
+    store = mock_vectorised_executor.store
+    actions_info, _, policy_states, _ = store.select_actions_fn(
+        store.observations, store.params, store.policy_states, store.base_key
+    )
+
+    for agent, observation in store.observations.items():
+        scale = store.params[store.agent_net_keys[agent]]["scale"]
+        expected = observation.observation * scale * observation.legal_actions
+        assert jnp.allclose(actions_info[agent], expected[None])
+    assert jnp.array_equal(policy_states, store.policy_states + 1)
+
+
+def test_select_actions_recurrent_stacked_states(
+    mock_vectorised_executor: Executor,
+) -> None:
+    """Test that only the stacked states of the observed agents are updated.
+
+    Args:
+        mock_vectorised_executor: Executor
+    """
+    store = mock_vectorised_executor.store
+    del store.observations["agent_1"]
+    for select_action in [
+        RecurrentExecutorSelectAction(),
+        VectorisedRecurrentExecutorSelectAction(),
+    ]:
+        select_action.on_execution_init_end(executor=mock_vectorised_executor)
+        _, _, policy_states, _ = store.select_actions_fn(
+            store.observations, store.params, store.policy_states, store.base_key
+        )
+
+        assert jnp.array_equal(policy_states, jnp.array([[1.0], [1.0], [3.0]]))
+
+
+def test_vectorised_select_actions_with_empty_observations(
+    mock_vectorised_executor: Executor,
+) -> None:
+    """Test vectorised action selection when no agents are observed.
+
+    Args:
+        mock_vectorised_executor: Executor
+    """
+    VectorisedFeedforwardExecutorSelectAction().on_execution_init_end(
+        executor=mock_vectorised_executor
+    )
+    store = mock_vectorised_executor.store
+    actions_info, policies_info, base_key = store.select_actions_fn(
+        {}, store.params, store.base_key
+    )
+
+    assert actions_info == {}
+    assert policies_info == {}
+    assert jnp.array_equal(base_key, store.base_key)
+
+
+class MockInferenceServerClient:
+    """Mock inference server client recording its requests"""
+
+    def __init__(self) -> None:
+        """Init mock inference server client"""
+        self.requests: List[Tuple[Dict[str, Any], Dict[str, str]]] = []
+
+    def select_actions(
+        self, observations: Dict[str, Any], agent_net_keys: Dict[str, str]
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Record the request and return dummy actions"""
+        self.requests.append((observations, agent_net_keys))
+        return (
+            {agent: "server_action_" + agent for agent in observations},
+            {agent: "server_policy_" + agent for agent in observations},
+        )
+
+
+def test_inference_server_select_actions(
+    mock_feedforward_executor: Executor,
+) -> None:
+    """Test that the actions are selected on the inference server.
+
+    Args:
+        mock_feedforward_executor: Executor
+    """
+    store = mock_feedforward_executor.store
+    store.inference_server_client = MockInferenceServerClient()
+    del store.select_actions_fn
+    # Executor.has checks for component instances.
+    mock_feedforward_executor.callbacks = [ObservationNormalisation()]
+    select_action = InferenceServerExecutorSelectAction()
+
+    select_action.on_execution_init_end(executor=mock_feedforward_executor)
+    assert not hasattr(store, "select_actions_fn")
+
+    raw_observations = {
+        agent: olt.observation for agent, olt in store.observations.items()
+    }
+    select_action.on_execution_select_actions(executor=mock_feedforward_executor)
+
+    ((observations, agent_net_keys),) = store.inference_server_client.requests
+    assert agent_net_keys == store.agent_net_keys
+    for agent in store.observations.keys():
+        # The observations are normalised before they are sent.
+        assert jnp.allclose(
+            observations[agent].observation, raw_observations[agent] / 2
+        )
+        assert store.actions_info[agent] == "server_action_" + agent
+        assert store.policies_info[agent] == "server_policy_" + agent
+    assert not hasattr(store, "current_params")
+
+
+def test_inference_server_select_actions_locally(
+    mock_feedforward_executor: Executor,
+) -> None:
+    """Test that nodes without an inference server select actions locally.
+
+    Args:
+        mock_feedforward_executor: Executor
+    """
+    store = mock_feedforward_executor.store
+    store.inference_server_client = None
+
+    InferenceServerExecutorSelectAction().on_execution_select_actions(
+        executor=mock_feedforward_executor
+    )
+
+    for agent in store.observations.keys():
+        assert store.actions_info[agent] == "action_info_" + agent
+        assert store.policies_info[agent] == "policy_info_" + agent
+
+
+#######################
+# Quantised executors #
+#######################
+class MockPolicyNetworks:
+    """Networks with a haiku policy and fp32 and int8 params."""
+
+    def __init__(self, seed: int) -> None:
+        """Init the policy network and its params."""
+
+        @hk.without_apply_rng
+        @hk.transform
+        def policy_fn(inputs: jnp.ndarray) -> tfd.Categorical:
+            """MLP policy over three actions."""
+            logits = hk.nets.MLP([16, 3])(inputs)
+            return tfd.Categorical(logits=logits)
+
+        self.policy_network = policy_fn
+        self.policy_params = policy_fn.init(jax.random.PRNGKey(seed), jnp.zeros((1, 3)))
+        self.quantise_calls = 0
+
+    def get_action(
+        self,
+        observations: networks_lib.Observation,
+        params: Dict[str, Any],
+        base_key: networks_lib.PRNGKey,
+        mask: chex.Array,
+    ) -> Tuple[jnp.ndarray, Dict]:
+        """Sample masked actions and return the policy logits."""
+        distribution = self.policy_network.apply(params["policy_network"], observations)
+        return distribution.sample(seed=base_key), {"logits": distribution.logits}
+
+    def get_params(self) -> Dict[str, Any]:
+        """Return the fp32 params."""
+        return {"policy_network": self.policy_params}
+
+    def get_quantised_params(self) -> Dict[str, Any]:
+        """Return the quantised params."""
+        self.quantise_calls += 1
+        return {"policy_network": quantise_params(self.policy_params)}
+
+
+@pytest.fixture
+def mock_quantised_executor() -> Executor:
+    """Mock executor with haiku policy networks."""
+    observations = {
+        agent: OLT(
+            observation=jnp.array([0.1, -0.5, 0.7]) * (i + 1),
+            legal_actions=jnp.array([1.0, 1.0, 0.0]),
+            terminal=jnp.array([0.0]),
+        )
+        for i, agent in enumerate(["agent_0", "agent_1"])
+    }
+    store = SimpleNamespace(
+        is_evaluator=None,
+        observations=observations,
+        networks={
+            "network_0": MockPolicyNetworks(0),
+            "network_1": MockPolicyNetworks(1),
+        },
+        agent_net_keys={"agent_0": "network_0", "agent_1": "network_1"},
+        base_key=jax.random.PRNGKey(5),
+        executor_parameter_client=SimpleNamespace(update_count=0),
+        global_config=SimpleNamespace(normalise_observations=False),
+    )
+    return Executor(store=store)
+
+
+def test_quantised_select_actions(mock_quantised_executor: Executor) -> None:
+    """Test that actions are selected with int8 params quantised on refresh.
+
+    Args:
+        mock_quantised_executor: Executor
+    """
+    store = mock_quantised_executor.store
+    select_action = QuantisedFeedforwardExecutorSelectAction()
+    select_action.on_execution_init_end(executor=mock_quantised_executor)
+
+    select_action.on_execution_select_actions(executor=mock_quantised_executor)
+    assert (
+        store.current_params["network_0"]["policy_network"]["mlp/~/linear_0"]["w"].dtype
+        == jnp.int8
+    )
+    for agent, olt in store.observations.items():
+        network = store.networks[store.agent_net_keys[agent]]
+        fp32_logits = network.policy_network.apply(
+            network.policy_params, olt.observation[None]
+        ).logits
+        logits = store.policies_info[agent]["logits"]
+        assert logits.shape == fp32_logits.shape
+        assert not jnp.array_equal(logits, fp32_logits)
+        assert jnp.allclose(logits, fp32_logits, atol=0.05)
+
+    # The divergence is small but the quantised policy is not the fp32 one.
+    kl = store.quantised_policy_kl
+    assert 0.0 < kl < 1e-3
+
+    # The params are quantised and the divergence reported on refresh only.
+    del store.quantised_policy_kl
+    select_action.on_execution_select_actions(executor=mock_quantised_executor)
+    assert store.networks["network_0"].quantise_calls == 1
+    assert not hasattr(store, "quantised_policy_kl")
+
+    store.executor_parameter_client.update_count = 1
+    select_action.on_execution_select_actions(executor=mock_quantised_executor)
+    assert store.networks["network_0"].quantise_calls == 2
+    assert store.quantised_policy_kl == pytest.approx(kl)
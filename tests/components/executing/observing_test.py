@@ -20,6 +20,7 @@ from types import SimpleNamespace
 from typing import Any, Dict
 
 import jax.numpy as jnp
+import numpy as np
 import pytest
 from dm_env import StepType, TimeStep
 
@@ -141,8 +142,8 @@ class MockExecutor(Executor):
         )
         # extras
         extras: Dict[str, Any] = {}
-        # Policy states
-        policy_states = 1234
+        # Policy states stacked in sorted agent order
+        policy_states = jnp.array([[1234], [1235], [1236]])
         # Adder
         adder = MockAdder()
         # actions_info
@@ -538,7 +539,43 @@ def test_on_execution_observe_recurrent(
     assert mock_executor.store.adder.test_next_extras == mock_executor.store.next_extras
 
     # Test that policy_states are set correctly in extras
-    assert mock_executor.store.adder.test_next_extras["policy_states"] == 1234
+    policy_states = mock_executor.store.adder.test_next_extras["policy_states"]
+    assert list(policy_states.keys()) == ["agent_0", "agent_1", "agent_2"]
+    for value, agent_policy_states in zip([1234, 1235, 1236], policy_states.values()):
+        assert isinstance(agent_policy_states, np.ndarray)
+        assert agent_policy_states.tolist() == [value]
+
+
+def test_on_execution_observe_first_resets_policy_states_recurrent(
+    recurrent_executor_observe: RecurrentExecutorObserve,
+    mock_executor_fixed_net: MockExecutor,
+) -> None:
+    """Test that the stacked policy states are reset from a device-resident cache
+
+    Args:
+        recurrent_executor_observe: RecurrentExecutorObserve,
+        mock_executor_fixed_net: Executor with fixed network sampling setup
+    """
+    store = mock_executor_fixed_net.store
+    recurrent_executor_observe.on_execution_observe_first(
+        executor=mock_executor_fixed_net
+    )
+
+    assert isinstance(store.policy_states, jnp.ndarray)
+    assert store.policy_states.tolist() == [12345, 12345, 12345]
+    assert store.extras["policy_states"] == {
+        "agent_0": 12345,
+        "agent_1": 12345,
+        "agent_2": 12345,
+    }
+
+    # The initial states are reused in the next episodes.
+    init_policy_states = store.policy_states
+    store.policy_states = store.policy_states + 1
+    recurrent_executor_observe.on_execution_observe_first(
+        executor=mock_executor_fixed_net
+    )
+    assert store.policy_states is init_policy_states
 
 
 def test_on_execution_update_recurrent(
@@ -21,8 +21,13 @@ from typing import Callable, List, Tuple
 import jax
 import jax.numpy as jnp
 import pytest
+import rlax
 
-from mava.components.training.advantage_estimation import GAE, GAEConfig
+from mava.components.training.advantage_estimation import (
+    GAE,
+    GAEConfig,
+    associative_scan_gae,
+)
 from mava.systems.trainer import Trainer
 
 
@@ -282,3 +287,74 @@ def test_gae_function_stop_gradient(
     # Gradient of zero means gradient was stopped
     assert jnp.array_equal(gradients_1, jnp.array([0, 0, 0, 0]))
     assert jnp.array_equal(gradients_2, jnp.array([0, 0, 0, 0]))
+
+
+def test_associative_scan_gae_matches_rlax() -> None:
+    """Test that the associative scan GAE matches the sequential rlax GAE"""
+    keys = jax.random.split(jax.random.PRNGKey(0), 3)
+    sequence_length = 65
+    rewards = jax.random.normal(keys[0], (sequence_length,))
+    discounts = 0.99 * (jax.random.uniform(keys[1], (sequence_length,)) > 0.1)
+    values = jax.random.normal(keys[2], (sequence_length + 1,))
+
+    advantages = associative_scan_gae(rewards, discounts, 0.95, values)
+    expected_advantages = rlax.truncated_generalized_advantage_estimation(
+        rewards, discounts, 0.95, values
+    )
+
+    assert jnp.allclose(advantages, expected_advantages, atol=1e-5)
+
+
+def test_associative_scan_gae_stacked_sequences() -> None:
+    """Test that trailing dimensions are treated as independent sequences"""
+    keys = jax.random.split(jax.random.PRNGKey(1), 2)
+    num_agents = 3
+    rewards = jax.random.normal(keys[0], (10, num_agents))
+    discounts = jnp.full((10, num_agents), 0.99)
+    values = jax.random.normal(keys[1], (11, num_agents))
+
+    advantages = associative_scan_gae(rewards, discounts, 0.9, values)
+
+    assert advantages.shape == (10, num_agents)
+    for agent in range(num_agents):
+        assert jnp.allclose(
+            advantages[:, agent],
+            rlax.truncated_generalized_advantage_estimation(
+                rewards[:, agent], discounts[:, agent], 0.9, values[:, agent]
+            ),
+            atol=1e-5,
+        )
+
+
+@pytest.mark.parametrize(
+    "rewards_1,rewards_2,discounts,values", different_reward_values()
+)
+def test_gae_function_associative_scan(
+    rewards_1: jnp.ndarray,
+    rewards_2: jnp.ndarray,
+    discounts: jnp.ndarray,
+    values: jnp.ndarray,
+    gae_without_reward_clipping: GAE,
+    mock_trainer: Trainer,
+) -> None:
+    """Test that the associative scan gae_fn matches the default gae_fn"""
+
+    gae_without_reward_clipping.on_training_utility_fns(trainer=mock_trainer)
+    gae_fn = mock_trainer.store.gae_fn
+    assert not mock_trainer.store.gae_over_stacked_agents
+
+    GAE(config=GAEConfig(use_associative_scan=True)).on_training_utility_fns(
+        trainer=mock_trainer
+    )
+    associative_gae_fn = mock_trainer.store.gae_fn
+    assert mock_trainer.store.gae_over_stacked_agents
+
+    for rewards in [rewards_1, rewards_2]:
+        advantages, target_values = gae_fn(
+            rewards=rewards, discounts=discounts, values=values
+        )
+        associative_advantages, associative_target_values = associative_gae_fn(
+            rewards=rewards, discounts=discounts, values=values
+        )
+        assert jnp.allclose(advantages, associative_advantages)
+        assert jnp.allclose(target_values, associative_target_values)
@@ -30,6 +30,7 @@ from mava.components.training.losses import (
     SquaredErrorValueLoss,
 )
 from mava.systems.trainer import Trainer
+from mava.types import OLT
 
 
 class MockNet:
@@ -60,6 +61,20 @@ class MockPolicyNet:
             return observation_state[0]  # type: ignore
 
 
+class MockRecurrentPolicyNet:
+    """Creates a mock recurrent policy network that depends on its parameters"""
+
+    @staticmethod
+    def apply(
+        parameters: Dict[str, jnp.ndarray],
+        observation_state: List[jnp.ndarray],
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """Mock function to apply one recurrent step to training data"""
+        observation, state = observation_state
+        new_state = jnp.tanh(state * parameters["w"] + observation)
+        return new_state[:, 0], new_state
+
+
 class MockCriticNet:
     """Creates a mock critic network for loss function"""
 
@@ -269,6 +284,10 @@ def test_mapg_loss(
     low_loss_policy = feedforward_policy_loss_info["agent_0"]["loss_policy"]
     assert low_loss_policy < loss_policy
 
+    # The approximate KL estimate is never negative.
+    for loss_info in [recurrent_policy_loss_info, feedforward_policy_loss_info]:
+        assert loss_info["agent_0"]["approx_kl"] >= 0
+
     _, critic_loss_info = critic_grad_fn(
         critic_params=mock_trainer.store.parameters,
         observations=mock_trainer.store.observations,
@@ -386,3 +405,148 @@ def test_mapg_huber_loss(
 
     assert low_loss_policy < loss_policy
     assert low_loss_critic < loss_critic
+
+
+def test_mapg_vectorised_loss(mock_trainer: Trainer) -> None:
+    """Test that the vectorised loss matches the mean of the per agent losses"""
+    SquaredErrorValueLoss().on_training_utility_fns(trainer=mock_trainer)
+    MAPGWithTrustRegionClippingLoss().on_training_loss_fns(trainer=mock_trainer)
+    agent_policy_grad_fn = mock_trainer.store.policy_grad_fn
+    agent_critic_grad_fn = mock_trainer.store.critic_grad_fn
+
+    MAPGWithTrustRegionClippingLoss(
+        config=MAPGTrustRegionClippingLossConfig(vectorise_agents=True)
+    ).on_training_loss_fns(trainer=mock_trainer)
+    assert mock_trainer.store.vectorise_agents
+    network_policy_grad_fn = mock_trainer.store.policy_grad_fn
+    network_critic_grad_fn = mock_trainer.store.critic_grad_fn
+
+    agents = ["agent_0", "agent_1", "agent_2"]
+    actions = {agent: jnp.array([1.0, 1.0, 1.0, 1.0]) for agent in agents}
+    behaviour_log_probs = {
+        agent: jnp.array([-2.0, -2.0, -2.0, -2.0]) for agent in agents
+    }
+    advantages = {
+        agent: jnp.array([1.0, 2.0, 3.0, 4.0]) * (i + 1)
+        for i, agent in enumerate(agents)
+    }
+    target_values = {
+        agent: jnp.array([3.0, 3.0, 3.0, 3.0]) * (i + 1)
+        for i, agent in enumerate(agents)
+    }
+    behavior_values = {agent: jnp.array([1.0, 1.0, 1.0, 1.0]) for agent in agents}
+    policy_states = {agent: None for agent in agents}
+
+    # Give every agent a different observation.
+    observations = {
+        agent: OLT(
+            observation=jnp.array([[0.5], [0.5], [0.7], [0.2]]) * (i + 1),
+            legal_actions=jnp.array([[1], [1], [1], [1]]),
+            terminal=jnp.array([[0], [0], [0], [0]]),
+        )
+        for i, agent in enumerate(agents)
+    }
+
+    policy_inputs = dict(
+        policy_params=mock_trainer.store.parameters,
+        observations=observations,
+        actions=actions,
+        behaviour_log_probs=behaviour_log_probs,
+        advantages=advantages,
+        policy_states=policy_states,
+    )
+    critic_inputs = dict(
+        critic_params=mock_trainer.store.parameters,
+        observations=observations,
+        target_values=target_values,
+        behavior_values=behavior_values,
+    )
+
+    agent_policy_grads, agent_policy_info = agent_policy_grad_fn(**policy_inputs)
+    network_policy_grads, network_policy_info = network_policy_grad_fn(**policy_inputs)
+    agent_critic_grads, agent_critic_info = agent_critic_grad_fn(**critic_inputs)
+    network_critic_grads, network_critic_info = network_critic_grad_fn(**critic_inputs)
+
+    # Gradients are returned per network and equal the mean over its agents.
+    assert list(network_policy_grads.keys()) == ["network_agent"]
+    assert list(network_critic_grads.keys()) == ["network_agent"]
+    for agent_grads, network_grads in [
+        (agent_policy_grads, network_policy_grads),
+        (agent_critic_grads, network_critic_grads),
+    ]:
+        mean_grads = jax.tree_util.tree_map(
+            lambda *x: jnp.mean(jnp.stack(x), axis=0),
+            *[agent_grads[agent] for agent in agents],
+        )
+        assert jax.tree_util.tree_all(
+            jax.tree_util.tree_map(
+                lambda x, y: jnp.allclose(x, y, rtol=1e-6),
+                mean_grads,
+                network_grads["network_agent"],
+            )
+        )
+
+    # Loss info is still reported per agent.
+    for agent in agents:
+        for key, value in agent_policy_info[agent].items():
+            assert jnp.isclose(network_policy_info[agent][key], value)
+        for key, value in agent_critic_info[agent].items():
+            assert jnp.isclose(network_critic_info[agent][key], value)
+
+
+@pytest.mark.parametrize(
+    "use_dynamic_unroll,remat_recurrent_core", [(True, False), (True, True)]
+)
+def test_mapg_recurrent_unroll(
+    mock_trainer: Trainer, use_dynamic_unroll: bool, remat_recurrent_core: bool
+) -> None:
+    """Test that the scan unroll and rematerialisation match the static unroll"""
+    agents = ["agent_0", "agent_1", "agent_2"]
+    mock_trainer.store.networks["network_agent"].policy_network = MockRecurrentPolicyNet
+    # Two sequences of sequence_length - 1 steps.
+    num_steps = 2 * (mock_trainer.store.sequence_length - 1)
+    observations = {
+        agent: OLT(
+            observation=jnp.linspace(-1.0, 1.0, num_steps).reshape(-1, 1),
+            legal_actions=jnp.ones((num_steps, 1)),
+            terminal=jnp.zeros((num_steps, 1)),
+        )
+        for agent in agents
+    }
+    policy_states = {
+        agent: [jnp.full((num_steps, 1), 0.1 * i)] for i, agent in enumerate(agents)
+    }
+    actions = {agent: jnp.ones((num_steps,)) for agent in agents}
+    behaviour_log_probs = {agent: jnp.ones((num_steps,)) for agent in agents}
+    advantages = {agent: jnp.linspace(0.0, 1.0, num_steps) for agent in agents}
+    policy_params = {"network_agent": {"w": jnp.array(0.5)}}
+
+    SquaredErrorValueLoss().on_training_utility_fns(trainer=mock_trainer)
+    grads_and_info = []
+    for config in [
+        MAPGTrustRegionClippingLossConfig(),
+        MAPGTrustRegionClippingLossConfig(
+            use_dynamic_unroll=use_dynamic_unroll,
+            remat_recurrent_core=remat_recurrent_core,
+        ),
+    ]:
+        MAPGWithTrustRegionClippingLoss(config=config).on_training_loss_fns(
+            trainer=mock_trainer
+        )
+        grads_and_info.append(
+            jax.jit(mock_trainer.store.policy_grad_fn)(
+                policy_params,
+                policy_states,
+                observations,
+                actions,
+                behaviour_log_probs,
+                advantages,
+            )
+        )
+
+    (static_grads, static_info), (grads, info) = grads_and_info
+    for agent in agents:
+        assert jnp.allclose(grads[agent]["w"], static_grads[agent]["w"])
+        assert not jnp.isclose(grads[agent]["w"], 0.0)
+        for key, value in static_info[agent].items():
+            assert jnp.allclose(info[agent][key], value)
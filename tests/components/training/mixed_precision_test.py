@@ -0,0 +1,114 @@
+# python3
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""MixedPrecision unit tests"""
+
+from types import SimpleNamespace
+from typing import Any, Iterator, List
+
+import haiku as hk
+import jax
+import jax.numpy as jnp
+import pytest
+
+from mava.components.training.mixed_precision import (
+    MixedPrecision,
+    MixedPrecisionConfig,
+)
+from mava.systems.trainer import Trainer
+from mava.utils.networks_utils import MLP_NORM
+
+
+class DtypeRecorder(hk.Module):
+    """Module that records the dtype of its inputs"""
+
+    def __init__(self, dtypes: List[Any]) -> None:
+        """Initialize the recorder with the list to write to."""
+        super().__init__()
+        self.dtypes = dtypes
+
+    def __call__(self, inputs: jnp.ndarray) -> jnp.ndarray:
+        """Record the input dtype and return the inputs."""
+        self.dtypes.append(inputs.dtype)
+        return inputs
+
+
+@pytest.fixture
+def mock_trainer() -> Trainer:
+    """Creates mock trainer fixture"""
+    return Trainer(store=SimpleNamespace())
+
+
+@pytest.fixture(autouse=True)
+def clear_policies() -> Iterator[None]:
+    """Remove the global haiku precision policies after every test"""
+    yield
+    for module in [hk.Sequential, hk.DeepRNN, hk.LayerNorm]:
+        hk.mixed_precision.clear_policy(module)
+
+
+def test_mixed_precision_config() -> None:
+    """Test the default config of the MixedPrecision component"""
+    mixed_precision = MixedPrecision()
+
+    assert mixed_precision.config.mixed_precision_dtype == "bfloat16"
+    assert mixed_precision.config.mixed_precision_modules == [
+        hk.Sequential,
+        hk.DeepRNN,
+    ]
+
+
+def test_on_training_init_start(mock_trainer: Trainer) -> None:
+    """Test that networks compute in bfloat16 with float32 params and outputs"""
+    MixedPrecision().on_training_init_start(trainer=mock_trainer)
+    assert mock_trainer.store.mixed_precision_policy.compute_dtype == jnp.bfloat16
+
+    hidden_dtypes: List[Any] = []
+
+    @hk.without_apply_rng
+    @hk.transform
+    def network_fn(inputs: jnp.ndarray) -> jnp.ndarray:
+        """Small network with layer normalisation"""
+        return hk.Sequential(
+            [
+                MLP_NORM([8, 8], activate_final=True, layer_norm=True),
+                DtypeRecorder(hidden_dtypes),
+                hk.Linear(1),
+            ]
+        )(inputs)
+
+    inputs = jnp.ones((4, 5))
+    params = network_fn.init(jax.random.PRNGKey(0), inputs)
+    outputs = network_fn.apply(params, inputs)
+
+    assert hidden_dtypes[-1] == jnp.bfloat16
+    assert outputs.dtype == jnp.float32
+
+    # Master weights and their gradients stay in float32.
+    grads = jax.grad(lambda p: jnp.mean(network_fn.apply(p, inputs)))(params)
+    for leaf in jax.tree_util.tree_leaves((params, grads)):
+        assert leaf.dtype == jnp.float32
+
+
+def test_on_training_init_start_custom_modules(mock_trainer: Trainer) -> None:
+    """Test that only the configured modules get a precision policy"""
+    config = MixedPrecisionConfig(
+        mixed_precision_dtype="float16", mixed_precision_modules=[hk.Sequential]
+    )
+    MixedPrecision(config=config).on_training_init_start(trainer=mock_trainer)
+
+    assert mock_trainer.store.mixed_precision_policy.compute_dtype == jnp.float16
+    assert hk.mixed_precision.get_policy(hk.Sequential) is not None
+    assert hk.mixed_precision.get_policy(hk.DeepRNN) is None
@@ -20,12 +20,19 @@ from typing import Any, Callable, Dict, Tuple
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 import optax
 import pytest
 
 from mava import constants
 from mava.components.training import Batch
-from mava.components.training.model_updating import MAPGEpochUpdate, MAPGMinibatchUpdate
+from mava.components.training.model_updating import (
+    MAPGEpochUpdate,
+    MAPGEpochUpdateConfig,
+    MAPGMinibatchUpdate,
+    MAPGMinibatchUpdateConfig,
+    _fused_update,
+)
 from mava.systems.trainer import Trainer
 from mava.types import OLT
 
@@ -409,6 +416,78 @@ def test_minibatch_update_fn(
         )
 
 
+def fake_ppo_network_grad_fn(*args: Any, **kwargs: Any) -> Tuple[Dict, Dict]:
+    """Fake grad function returning one gradient per network
+
+    Mirrors the output of the losses when agents sharing a network are
+    vectorised. agent_1 and agent_2 share network_agent_1.
+
+    Returns:
+        gradient: fake gradient per network
+        agent_metrics: fake metrics dictionary per agent
+    """
+    gradient = {
+        "network_agent_0": jnp.array([5.0, 5.0, 5.0]),
+        "network_agent_1": jnp.array([5.0, 5.0, 5.0]),
+    }
+    agent_metrics: Dict[str, Any] = {
+        agent_key: {} for agent_key in ["agent_0", "agent_1", "agent_2"]
+    }
+    return (gradient, agent_metrics)
+
+
+def test_minibatch_update_fn_vectorised_agents(
+    mock_state_and_trainer: Tuple[Dict[str, Any], MockTrainer]
+) -> None:
+    """Test that vectorised agents update their shared network once
+
+    Args:
+        mock_state_and_trainer: tuple
+            include fake state and mock trainer
+    """
+    state = mock_state_and_trainer[0]
+    mock_trainer = mock_state_and_trainer[1]
+    mock_trainer.store.trainer_agent_net_keys["agent_2"] = "network_agent_1"
+    mock_trainer.store.policy_grad_fn = fake_ppo_network_grad_fn
+    mock_trainer.store.critic_grad_fn = fake_ppo_network_grad_fn
+    mock_trainer.store.vectorise_agents = True
+
+    carry = [
+        state["policy_params"],
+        state["critic_params"],
+        state["policy_opt_states"],
+        state["critic_opt_states"],
+    ]
+    (
+        new_policy_params,
+        new_critic_params,
+        _,
+        _,
+    ), metrics = mock_trainer.store.minibatch_update_fn(
+        carry=carry, minibatch=state["batch"]
+    )
+
+    # The shared network is updated once and the unused network is untouched.
+    assert list(new_policy_params["network_agent_0"]) == [5.0, 5.0, 5.0]
+    assert list(new_policy_params["network_agent_1"]) == [6.0, 6.0, 6.0]
+    assert list(new_policy_params["network_agent_2"]) == [2.0, 2.0, 2.0]
+    assert list(new_critic_params["network_agent_0"]) == [5.0, 5.0, 5.0]
+    assert list(new_critic_params["network_agent_1"]) == [6.0, 6.0, 6.0]
+    assert list(new_critic_params["network_agent_2"]) == [2.0, 2.0, 2.0]
+
+    assert sorted(list(metrics.keys())) == ["agent_0", "agent_1", "agent_2"]
+    for agent in metrics.keys():
+        assert list(metrics[agent].keys()) == [
+            "norm_policy_grad",
+            "norm_policy_updates",
+            "norm_critic_grad",
+            "norm_critic_updates",
+        ]
+        assert metrics[agent]["norm_policy_grad"] == optax.global_norm(
+            jnp.array([5.0, 5.0, 5.0])
+        )
+
+
 def test_on_training_utility_fns_epoch(
     mock_trainer: MockTrainer,
 ) -> None:
@@ -421,6 +500,7 @@ def test_on_training_utility_fns_epoch(
     mini_epoch_update.on_training_utility_fns(trainer=mock_trainer)
 
     assert callable(mock_trainer.store.epoch_update_fn)
+    assert mock_trainer.store.target_kl is None
 
 
 def test_epoch_update_fn(
@@ -486,3 +566,308 @@ def test_epoch_update_fn(
         assert list(metrics[agent]["norm_policy_updates"][0]) == [2, 2, 2]
         assert list(metrics[agent]["norm_critic_grad"][0]) == [2, 2, 2]
         assert list(metrics[agent]["norm_critic_updates"][0]) == [2, 2, 2]
+
+
+def test_epoch_update_fn_gathers_minibatches(mock_trainer: MockTrainer) -> None:
+    """Test that the minibatches are the shuffled sequences of the batch"""
+    mini_epoch_update = MAPGEpochUpdate(
+        config=MAPGEpochUpdateConfig(num_epochs=1, num_minibatches=2)
+    )
+    mini_epoch_update.on_training_utility_fns(trainer=mock_trainer)
+
+    def minibatch_update(carry: Any, minibatch: Batch) -> Tuple[Any, Any]:
+        """Return the minibatch advantages as metrics"""
+        return carry, minibatch.advantages
+
+    mock_trainer.store.minibatch_update_fn = minibatch_update
+
+    # Four sequences of three time steps.
+    advantages = jnp.reshape(jnp.arange(12.0), (4, 3))
+    batch = Batch(
+        observations={},
+        actions={},
+        advantages=advantages,
+        target_values=advantages,
+        behavior_values=advantages,
+        behavior_log_probs=advantages,
+        policy_states=None,
+    )
+    random_key = jax.random.PRNGKey(5)
+    carry = [random_key, {}, {}, {}, {}, batch]
+
+    _, minibatches = mock_trainer.store.epoch_update_fn(carry=carry, unused_t=None)
+
+    # Shuffling the sequences and splitting the flattened batch.
+    _, shuffle_key = jax.random.split(random_key)
+    permutation = jax.random.permutation(shuffle_key, 4)
+    expected = jnp.reshape(jnp.take(advantages, permutation, axis=0), (2, 6))
+    assert jnp.array_equal(minibatches, expected)
+
+
+def fake_ppo_policy_grad_fn_from_log_probs(
+    policy_params: Any,
+    policy_states: Any,
+    observations: Any,
+    actions: Dict[str, jnp.ndarray],
+    behaviour_log_probs: jnp.ndarray,
+    advantages: Dict[str, jnp.ndarray],
+) -> Tuple[Dict, Dict]:
+    """Fake policy grad function with a gradient that depends on the minibatch
+
+    Returns:
+        gradient: the mean behaviour log prob for every agent
+        agent_metrics: fake metrics dictionary
+    """
+    gradient = {
+        agent_key: jnp.full((3,), jnp.mean(behaviour_log_probs))
+        for agent_key in actions.keys()
+    }
+    agent_metrics: Dict[str, Any] = {agent_key: {} for agent_key in actions.keys()}
+    return (gradient, agent_metrics)
+
+
+def test_minibatch_update_fn_data_parallel(
+    mock_state_and_trainer: Tuple[Dict[str, Any], MockTrainer]
+) -> None:
+    """Test that data parallel minibatch updates average gradients over devices
+
+    Args:
+        mock_state_and_trainer: tuple
+            include fake state and mock trainer
+    """
+    state = mock_state_and_trainer[0]
+    mock_trainer = mock_state_and_trainer[1]
+    mock_trainer.store.data_parallel = True
+    mock_trainer.store.policy_grad_fn = fake_ppo_policy_grad_fn_from_log_probs
+    # Add the gradients to the parameters.
+    mock_trainer.store.policy_optimiser = optax.sgd(learning_rate=-1.0)
+    mock_trainer.store.critic_optimiser = optax.sgd(learning_rate=-1.0)
+    for opt_states, params in [
+        (state["policy_opt_states"], state["policy_params"]),
+        (state["critic_opt_states"], state["critic_params"]),
+    ]:
+        for net_key in opt_states.keys():
+            opt_states[net_key] = {
+                constants.OPT_STATE_DICT_KEY: optax.sgd(1.0).init(params[net_key])
+            }
+
+    # Two shards of the batch with different behaviour log probs.
+    minibatches = jax.tree_util.tree_map(
+        lambda x: jnp.stack([x, x]), state["batch"]
+    )._replace(behavior_log_probs=jnp.stack([jnp.full((3,), 1.0), jnp.full((3,), 3.0)]))
+    carry = (
+        state["policy_params"],
+        state["critic_params"],
+        state["policy_opt_states"],
+        state["critic_opt_states"],
+    )
+
+    # vmap with a named axis behaves like pmap over two devices.
+    (new_policy_params, new_critic_params, _, _), _ = jax.vmap(
+        mock_trainer.store.minibatch_update_fn,
+        in_axes=(None, 0),
+        axis_name=constants.DATA_PARALLEL_AXIS_NAME,
+    )(carry, minibatches)
+
+    for i, net_key in enumerate(
+        ["network_agent_0", "network_agent_1", "network_agent_2"]
+    ):
+        # Every shard applies the mean gradient, (1 + 3) / 2.
+        assert jnp.array_equal(new_policy_params[net_key], jnp.full((2, 3), i + 2.0))
+        assert jnp.array_equal(new_critic_params[net_key], jnp.full((2, 3), i + 5.0))
+
+
+@pytest.mark.parametrize("num_microbatches", [1, 2, 4])
+def test_minibatch_update_fn_microbatches(
+    mock_trainer: MockTrainer, num_microbatches: int
+) -> None:
+    """Test that accumulating micro-batch gradients matches one minibatch update
+
+    Args:
+        mock_trainer: Trainer
+        num_microbatches: number of micro-batches per minibatch
+    """
+    mock_trainer.store.policy_grad_fn = fake_ppo_policy_grad_fn_from_log_probs
+    # Add the gradients to the parameters.
+    mock_trainer.store.policy_optimiser = optax.sgd(learning_rate=-1.0)
+    mock_trainer.store.critic_optimiser = optax.sgd(learning_rate=-1.0)
+    mini_batch_update = MAPGMinibatchUpdate(
+        config=MAPGMinibatchUpdateConfig(
+            normalize_advantage=False, num_microbatches=num_microbatches
+        )
+    )
+    mini_batch_update.on_training_utility_fns(trainer=mock_trainer)
+
+    agents = ["agent_0", "agent_1", "agent_2"]
+    minibatch = Batch(
+        observations={agent: jnp.ones((4, 3)) for agent in agents},
+        actions={agent: jnp.zeros((4,)) for agent in agents},
+        advantages={agent: jnp.ones((4,)) for agent in agents},
+        target_values={agent: jnp.ones((4,)) for agent in agents},
+        behavior_values={agent: jnp.ones((4,)) for agent in agents},
+        behavior_log_probs=jnp.array([1.0, 2.0, 3.0, 4.0]),
+        policy_states={agent: None for agent in agents},
+    )
+    policy_params = {}
+    critic_params = {}
+    policy_opt_states = {}
+    critic_opt_states = {}
+    for net_key, network in mock_trainer.store.networks.items():
+        policy_params[net_key] = network.policy_params
+        critic_params[net_key] = network.critic_params
+        policy_opt_states[net_key] = {
+            constants.OPT_STATE_DICT_KEY: optax.sgd(1.0).init(network.policy_params)
+        }
+        critic_opt_states[net_key] = {
+            constants.OPT_STATE_DICT_KEY: optax.sgd(1.0).init(network.critic_params)
+        }
+
+    (new_policy_params, new_critic_params, _, _), metrics = jax.jit(
+        mock_trainer.store.minibatch_update_fn
+    )(
+        (policy_params, critic_params, policy_opt_states, critic_opt_states),
+        minibatch,
+    )
+
+    for i, net_key in enumerate(
+        ["network_agent_0", "network_agent_1", "network_agent_2"]
+    ):
+        # The mean behaviour log prob of the whole minibatch is 2.5.
+        assert jnp.allclose(new_policy_params[net_key], jnp.full((3,), i + 2.5))
+        assert jnp.allclose(new_critic_params[net_key], jnp.full((3,), i + 5.0))
+    assert sorted(list(metrics.keys())) == agents
+    assert jnp.isclose(
+        metrics["agent_0"]["norm_policy_grad"],
+        optax.global_norm(jnp.full((3,), 2.5)),
+    )
+
+
+def test_minibatch_update_fn_fused_network_updates(
+    mock_state_and_trainer: Tuple[Dict[str, Any], MockTrainer]
+) -> None:
+    """Test that the fused update matches the per network updates
+
+    The gradients are not clipped, as the fused update clips the networks
+    that share an optimiser by their joint gradient norm.
+
+    Args:
+        mock_state_and_trainer: tuple
+            include fake state and mock trainer
+    """
+    state = mock_state_and_trainer[0]
+
+    def make_optimiser(learning_rate: float) -> optax.GradientTransformation:
+        """Create an optimiser with a state"""
+        return optax.chain(
+            optax.clip_by_global_norm(100.0),
+            optax.scale_by_adam(),
+            optax.scale(-learning_rate),
+        )
+
+    results = []
+    for fuse_network_updates in [False, True]:
+        trainer = MockTrainer()
+        trainer.store.policy_optimiser = make_optimiser(0.1)
+        trainer.store.critic_optimiser = make_optimiser(0.1)
+        # network_agent_1 has its own policy learning rate.
+        trainer.store.policy_network_optimisers = {
+            "network_agent_1": make_optimiser(1.0)
+        }
+        trainer.store.critic_network_optimisers = {}
+        MAPGMinibatchUpdate(
+            config=MAPGMinibatchUpdateConfig(fuse_network_updates=fuse_network_updates)
+        ).on_training_utility_fns(trainer=trainer)
+
+        carry = [
+            {
+                net_key: network.policy_params
+                for net_key, network in trainer.store.networks.items()
+            },
+            {
+                net_key: network.critic_params
+                for net_key, network in trainer.store.networks.items()
+            },
+            {
+                net_key: {
+                    constants.OPT_STATE_DICT_KEY: make_optimiser(0.1).init(
+                        network.policy_params
+                    )
+                }
+                for net_key, network in trainer.store.networks.items()
+            },
+            {
+                net_key: {
+                    constants.OPT_STATE_DICT_KEY: make_optimiser(0.1).init(
+                        network.critic_params
+                    )
+                }
+                for net_key, network in trainer.store.networks.items()
+            },
+        ]
+        results.append(
+            jax.jit(trainer.store.minibatch_update_fn)(carry, state["batch"])
+        )
+
+    (reference_carry, reference_metrics), (fused_carry, fused_metrics) = results
+    jax.tree_util.tree_map(
+        lambda x, y: np.testing.assert_allclose(x, y, rtol=1e-6),
+        reference_carry,
+        fused_carry,
+    )
+    assert jnp.allclose(
+        fused_carry[0]["network_agent_1"] - 1.0,
+        10 * (fused_carry[0]["network_agent_0"] - 0.0),
+    )
+    jax.tree_util.tree_map(
+        lambda x, y: np.testing.assert_allclose(x, y, rtol=1e-6),
+        reference_metrics,
+        fused_metrics,
+    )
+
+
+def test_fused_update_shares_optimiser_updates() -> None:
+    """Test that networks sharing an optimiser are updated together"""
+    shared_optimiser = optax.chain(
+        optax.clip_by_global_norm(1.0), optax.scale_by_adam(), optax.scale(-0.1)
+    )
+    own_optimiser = optax.chain(optax.clip_by_global_norm(1.0), optax.scale(-1.0))
+    optimisers = {
+        "network_0": shared_optimiser,
+        "network_1": shared_optimiser,
+        "network_2": own_optimiser,
+    }
+    params = {
+        "network_0": {"w": jnp.zeros(2)},
+        "network_1": {"w": jnp.zeros(3)},
+        "network_2": {"w": jnp.zeros(2)},
+    }
+    opt_states = {
+        net_key: {constants.OPT_STATE_DICT_KEY: optimisers[net_key].init(net_params)}
+        for net_key, net_params in params.items()
+    }
+    gradients = {
+        "network_0": {"w": jnp.array([3.0, 0.0])},
+        "network_1": {"w": jnp.array([0.0, 4.0, 0.0])},
+        "network_2": {"w": jnp.array([3.0, 4.0])},
+    }
+
+    gradient_norms, _ = _fused_update(params, opt_states, gradients, optimisers)
+
+    assert jnp.allclose(gradient_norms["network_1"], 4.0)
+    # The networks that share the optimiser are clipped by their joint norm.
+    shared_state = opt_states["network_1"][constants.OPT_STATE_DICT_KEY]
+    assert jnp.allclose(shared_state[1].mu["w"], 0.1 * jnp.array([0.0, 0.8, 0.0]))
+    assert shared_state[1].count == 1
+    assert jnp.allclose(params["network_2"]["w"], -jnp.array([0.6, 0.8]))
+
+    # The optimiser states keep their per network layout.
+    for net_key, net_params in params.items():
+        assert jax.tree_util.tree_structure(
+            opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+        ) == jax.tree_util.tree_structure(optimisers[net_key].init(net_params))
+
+    # A second update carries on from the states of the first one.
+    _fused_update(params, opt_states, gradients, optimisers)
+    shared_state = opt_states["network_0"][constants.OPT_STATE_DICT_KEY]
+    assert shared_state[1].count == 2
+    assert jnp.allclose(shared_state[1].mu["w"], 0.19 * jnp.array([0.6, 0.0]))
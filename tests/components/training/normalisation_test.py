@@ -1,18 +1,27 @@
+from types import SimpleNamespace
 from typing import Any, List, Union
 
 import jax.numpy as jnp
 import numpy as np
 import pytest
 
+from mava import constants
 from mava.types import OLT
 from mava.utils.jax_training_utils import (
     compute_running_mean_var_count,
     construct_norm_axes_list,
     denormalize,
+    executor_normalize_observation,
+    get_agent_norm_params,
+    group_agents_by_observation,
+    init_agent_norm_params,
     normalize,
+    normalize_agent_observations,
     normalize_observations,
+    update_and_normalize_agent_observations,
     update_and_normalize_observations,
 )
+from mava.utils.jax_tree_utils import stack_trees
 
 
 def test_construct_norm_axes_list() -> None:
@@ -189,3 +198,149 @@ def test_normalize_observations() -> None:
     x_norm = normalize(stats, jnp.array(x))
 
     assert jnp.allclose(x_norm, obs_norm)
+
+
+def test_group_agents_by_observation() -> None:
+    """Test that agents are grouped by observation shape and dtype"""
+
+    observations = {
+        "agent_0": OLT(observation=np.zeros(15), legal_actions=[1], terminal=[0.0]),
+        "agent_1": OLT(observation=np.zeros(10), legal_actions=[1], terminal=[0.0]),
+        "agent_2": OLT(observation=np.zeros(15), legal_actions=[1], terminal=[0.0]),
+    }
+
+    groups = group_agents_by_observation(observations)
+
+    assert groups == [["agent_0", "agent_2"], ["agent_1"]]
+
+
+def test_init_agent_norm_params() -> None:
+    """Test that the stats of agents with the same observations are stacked"""
+
+    observation_specs = {
+        "agent_0": OLT(observation=np.zeros(15), legal_actions=[1], terminal=[0.0]),
+        "agent_1": OLT(observation=np.zeros(10), legal_actions=[1], terminal=[0.0]),
+        "agent_2": OLT(observation=np.zeros(15), legal_actions=[1], terminal=[0.0]),
+    }
+
+    stats = init_agent_norm_params(observation_specs)
+
+    assert list(stats.keys()) == ["agent_0,agent_2", "agent_1"]
+    assert stats["agent_0,agent_2"]["mean"].shape == (2, 15)
+    assert stats["agent_0,agent_2"]["count"].shape == (2, 1)
+    assert stats["agent_1"]["std"].shape == (1, 10)
+
+    agent_stats = get_agent_norm_params(stats, "agent_2")
+    assert agent_stats["mean"].shape == (15,)
+    with pytest.raises(KeyError):
+        get_agent_norm_params(stats, "agent_3")
+
+
+def test_update_and_normalize_agent_observations() -> None:
+    """Test that the vectorised update matches the update of each agent"""
+
+    axes = tuple([slice(0, 15)])
+    agent_stats = dict(
+        mean=jnp.zeros(15),
+        var=jnp.zeros(15),
+        count=jnp.array([1e-4]),
+        std=jnp.ones(15),
+    )
+    stats = {
+        "agent_0,agent_1": stack_trees([agent_stats, agent_stats]),
+        "agent_2": stack_trees([agent_stats]),
+    }
+    observations = {
+        agent: OLT(
+            observation=jnp.array(np.random.randn(4, 20, 15)),
+            legal_actions=jnp.ones((4, 20, 3)),
+            terminal=jnp.zeros((4, 20)),
+        )
+        for agent in ["agent_0", "agent_1"]
+    }
+
+    upd_stats, norm_observations = update_and_normalize_agent_observations(
+        stats, observations, axes=axes
+    )
+
+    for agent in ["agent_0", "agent_1"]:
+        expected_stats, agent_obs = update_and_normalize_observations(
+            agent_stats, observations[agent], axes=axes
+        )
+        agent_upd_stats = get_agent_norm_params(upd_stats, agent)
+        for key in ["mean", "var", "std", "count"]:
+            assert jnp.allclose(agent_upd_stats[key], expected_stats[key], atol=1e-6)
+        assert jnp.allclose(
+            norm_observations[agent].observation, agent_obs.observation, atol=1e-5
+        )
+        assert norm_observations[agent].legal_actions.shape == (4, 20, 3)
+
+    # The stats are kept stacked per group.
+    assert upd_stats["agent_0,agent_1"]["mean"].shape == (2, 15)
+    # Agents without observations keep their stats.
+    assert upd_stats["agent_2"] is stats["agent_2"]
+
+
+def test_executor_normalize_observation() -> None:
+    """Test that alive agents are normalised and death masked agents are not"""
+
+    agent_stats = dict(
+        mean=jnp.array([0.2]),
+        var=jnp.array([4]),
+        count=jnp.array([15]),
+        std=jnp.array([2]),
+    )
+    stats = {"agent_0,agent_1": stack_trees([agent_stats, agent_stats])}
+    executor = SimpleNamespace(
+        store=SimpleNamespace(
+            norm_params={constants.OBS_NORM_STATE_DICT_KEY: stats},
+            executor_environment=SimpleNamespace(death_masked_agents=["agent_1"]),
+        )
+    )
+    x = np.random.randn(15).astype(np.float32)
+    observations = {
+        agent: OLT(observation=x, legal_actions=[1], terminal=[0.0])
+        for agent in ["agent_0", "agent_1"]
+    }
+
+    observations = executor_normalize_observation(executor, observations)
+
+    assert jnp.allclose(observations["agent_0"].observation, normalize(agent_stats, x))
+    assert observations["agent_0"].observation.dtype == np.float32
+    assert observations["agent_1"].observation is x
+
+    # All agents are normalised in a single call.
+    norm_observations = normalize_agent_observations(stats, observations)
+    assert set(norm_observations.keys()) == {"agent_0", "agent_1"}
+
+
+def test_executor_normalize_observation_vectorised() -> None:
+    """Test that each environment of a vectorised executor uses its death masks"""
+
+    agent_stats = dict(
+        mean=jnp.array([0.2]),
+        var=jnp.array([4]),
+        count=jnp.array([15]),
+        std=jnp.array([2]),
+    )
+    stats = {"agent_0,agent_1": stack_trees([agent_stats, agent_stats])}
+    executor = SimpleNamespace(
+        store=SimpleNamespace(
+            norm_params={constants.OBS_NORM_STATE_DICT_KEY: stats},
+            executor_environment=SimpleNamespace(death_masked_agents=[]),
+            env_death_masked_agents=[[], ["agent_1"], []],
+        )
+    )
+    x = np.random.randn(3, 15).astype(np.float32)
+    observations = {
+        agent: OLT(observation=x, legal_actions=[1], terminal=[0.0])
+        for agent in ["agent_0", "agent_1"]
+    }
+
+    observations = executor_normalize_observation(executor, observations)
+
+    assert jnp.allclose(observations["agent_0"].observation, normalize(agent_stats, x))
+    agent_1_observation = observations["agent_1"].observation
+    assert jnp.allclose(agent_1_observation[1], x[1])
+    assert jnp.allclose(agent_1_observation[0], normalize(agent_stats, x[0]))
+    assert jnp.allclose(agent_1_observation[2], normalize(agent_stats, x[2]))
@@ -10,6 +10,7 @@ from mava.components.normalisation.observation_normalisation import (
 )
 from mava.systems.builder import Builder
 from mava.utils.jax_training_utils import init_norm_params
+from mava.utils.jax_tree_utils import stack_trees
 from tests.mocks import make_fake_env_specs
 
 
@@ -25,7 +26,9 @@ def trainer() -> MockCoreComponent:
     store = SimpleNamespace(
         obs_normalisation_start=0,
         norm_params={
-            constants.OBS_NORM_STATE_DICT_KEY: {"params": {"mean": np.zeros(1)}}
+            constants.OBS_NORM_STATE_DICT_KEY: {
+                "agent_0,agent_1": {"mean": np.zeros((2, 1))}
+            }
         },
     )
     return MockCoreComponent(store)
@@ -70,8 +73,9 @@ def test_on_building_init_end(
 
     expected_norm_params = {
         "obs_norm_params": {
-            "agent_0": init_norm_params((10,)),
-            "agent_1": init_norm_params((10,)),
+            "agent_0,agent_1": stack_trees(
+                [init_norm_params((10,)), init_norm_params((10,))]
+            ),
         }
     }
 
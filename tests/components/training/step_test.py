@@ -16,7 +16,7 @@
 """Tests for Step components jax-based Mava systems"""
 import copy
 from types import SimpleNamespace
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 import jax
 import jax.numpy as jnp
@@ -29,7 +29,13 @@ from mava.components.normalisation.observation_normalisation import (
     ObservationNormalisation,
 )
 from mava.components.normalisation.value_normalisation import ValueNormalisation
-from mava.components.training.step import DefaultTrainerStep, MAPGWithTrustRegionStep
+from mava.components.training.advantage_estimation import GAE, GAEConfig
+from mava.components.training.step import (
+    DefaultTrainerStep,
+    MAPGWithTrustRegionStep,
+    MAPGWithTrustRegionStepConfig,
+    TrainerStepConfig,
+)
 from mava.systems.trainer import Trainer
 from tests.components.training.step_test_data import dummy_sample
 
@@ -97,6 +103,20 @@ class MockTrainerLogger:
         self.written = results
 
 
+class MockPrefetchIterator:
+    """Mock of a prefetching dataset iterator"""
+
+    def __init__(self, samples: List[int]) -> None:
+        """Initialize mock prefetch iterator."""
+        self.samples = iter(samples)
+        self.wait_time = 0.0
+
+    def __next__(self) -> int:
+        """Return the next sample with a fixed wait time."""
+        self.wait_time = 0.5
+        return next(self.samples)
+
+
 class MockParameterClient:
     """Mock of ParameterClient to test DefaultTrainerStep component"""
 
@@ -107,6 +127,11 @@ class MockParameterClient:
             "trainer_walltime": -1,
         }
         self.call_set_and_get_async = False
+        self.sync_fn: Any = None
+
+    def register_sync_fn(self, sync_fn: Any) -> None:
+        """Mock register_sync_fn method."""
+        self.sync_fn = sync_fn
 
     def add_async(self, params: Any) -> None:
         """Mock add_async method."""
@@ -158,15 +183,17 @@ class MockTrainer(Trainer):
             constants.OBS_NORM_STATE_DICT_KEY: {},
             constants.VALUES_NORM_STATE_DICT_KEY: {},
         }
+        # The observation stats of the agents are stacked in a single group.
+        num_agents, obs_shape = len(trainer_agent_net_keys), 1  # something random
+        norm_params[constants.OBS_NORM_STATE_DICT_KEY][
+            ",".join(trainer_agent_net_keys.keys())
+        ] = dict(
+            mean=np.zeros(shape=(num_agents, obs_shape)),
+            var=np.zeros(shape=(num_agents, obs_shape)),
+            std=np.ones(shape=(num_agents, obs_shape)),
+            count=np.full((num_agents, 1), 1e-4),
+        )
         for agent in trainer_agent_net_keys.keys():
-            obs_shape = 1  # something random
-            norm_params[constants.OBS_NORM_STATE_DICT_KEY][agent] = dict(
-                mean=np.zeros(shape=obs_shape),
-                var=np.zeros(shape=obs_shape),
-                std=np.ones(shape=obs_shape),
-                count=np.array([1e-4]),
-            )
-
             norm_params[constants.VALUES_NORM_STATE_DICT_KEY][agent] = dict(
                 mean=np.array([0]),
                 var=np.array([0]),
@@ -197,6 +224,7 @@ class MockTrainer(Trainer):
                 sequence_length=3,
                 normalise_observations=False,
                 normalise_target_values=False,
+                multi_process=False,
             ),
         )
         self.store = store
@@ -267,6 +295,78 @@ def test_on_training_step_without_timestamp(
     assert mock_trainer.store.trainer_logger.written == {"next_sample": 2, "sample": 1}
 
 
+def test_on_training_step_logs_data_wait_time(
+    mock_trainer: Trainer,
+) -> None:
+    """Test on_training_step logs the data wait time of a prefetching iterator"""
+    trainer_step = DefaultTrainerStep()
+    mock_trainer.store.dataset_iterator = MockPrefetchIterator([1, 2, 3])
+    mock_trainer.store.log_data_wait_time = True
+
+    trainer_step.on_training_step(trainer=mock_trainer)
+
+    assert mock_trainer.store.trainer_logger.written == {
+        "next_sample": 2,
+        "sample": 1,
+        "data_wait_time": 0.5,
+    }
+
+
+def test_on_training_step_stacks_samples(
+    mock_trainer: Trainer,
+) -> None:
+    """Test on_training_step with several SGD steps per dispatch"""
+    trainer_step = DefaultTrainerStep()
+    mock_trainer.store.num_sgd_steps_per_dispatch = 2
+
+    trainer_step.on_training_step(trainer=mock_trainer)
+
+    assert mock_trainer.store.trainer_parameter_client.params["trainer_steps"] == 2
+    assert jnp.array_equal(
+        mock_trainer.store.trainer_logger.written["sample"], jnp.array([1, 2])
+    )
+    assert next(mock_trainer.store.dataset_iterator) == 3
+
+
+def test_on_training_step_logs_step_compile_time(
+    mock_trainer: Trainer,
+) -> None:
+    """Test on_training_step logs the warmup compile time"""
+    trainer_step = DefaultTrainerStep()
+    mock_trainer.store.step_compile_time = 3.0
+
+    trainer_step.on_training_step(trainer=mock_trainer)
+
+    assert mock_trainer.store.trainer_logger.written == {
+        "next_sample": 2,
+        "sample": 1,
+        "step_compile_time": 3.0,
+    }
+
+
+def test_on_training_step_accumulates_metrics(
+    mock_trainer: Trainer,
+) -> None:
+    """Test on_training_step only logs the mean metrics every interval"""
+    trainer_step = DefaultTrainerStep(config=TrainerStepConfig(metrics_log_interval=2))
+    trainer_step.on_training_init(trainer=mock_trainer)
+
+    trainer_step.on_training_step(trainer=mock_trainer)
+    assert mock_trainer.store.trainer_logger.written is None
+    assert mock_trainer.store.num_accumulated_steps == 1
+
+    trainer_step.on_training_step(trainer=mock_trainer)
+    assert mock_trainer.store.trainer_logger.written == {
+        "next_sample": 2,
+        "sample": 1.5,
+    }
+    assert mock_trainer.store.accumulated_metrics is None
+    assert mock_trainer.store.num_accumulated_steps == 0
+
+    # The parameter client is synced every step.
+    assert mock_trainer.store.trainer_parameter_client.call_set_and_get_async is True
+
+
 def test_mapg_with_trust_region_step_initiator() -> None:
     """Test constructor of MAPGWITHTrustRegionStep component"""
     mapg_with_trust_region_step = MAPGWithTrustRegionStep()
@@ -303,7 +403,9 @@ def test_on_training_step_fn(
 
 def test_step(mock_trainer: Trainer) -> None:
     """Test step function"""
-    mapg_with_trust_region_step = MAPGWithTrustRegionStep()
+    mapg_with_trust_region_step = MAPGWithTrustRegionStep(
+        config=MAPGWithTrustRegionStepConfig(log_batch_statistics=True)
+    )
     mock_trainer = mock_trainer
     del mock_trainer.store.step_fn
 
@@ -356,6 +458,9 @@ def test_step(mock_trainer: Trainer) -> None:
 
     # check that trainer random key has been updated
     assert list(mock_trainer.store.base_key) != list(old_key)
+
+    # The tracked params are synced when the parameter client reads them.
+    mock_trainer.store.trainer_parameter_client.sync_fn()
     num_expected_update_steps = (
         2
         * mock_trainer.store.global_config.num_epochs
@@ -410,3 +515,268 @@ def test_step(mock_trainer: Trainer) -> None:
             constants.OPT_STATE_DICT_KEY: 2 + num_expected_update_steps
         },
     }
+
+
+def test_step_with_donated_training_state(mock_trainer: Trainer) -> None:
+    """Test that the step swaps in a single training state when donating"""
+    mock_trainer.store.global_config.multi_process = True
+    mapg_with_trust_region_step = MAPGWithTrustRegionStep()
+    del mock_trainer.store.step_fn
+    mapg_with_trust_region_step.on_training_step_fn(trainer=mock_trainer)
+
+    assert mock_trainer.store.training_state is None
+    policy_params = mock_trainer.store.networks["network_agent_0"].policy_params
+
+    mock_trainer.store.step_fn(dummy_sample)
+    first_state = mock_trainer.store.training_state
+    mock_trainer.store.step_fn(dummy_sample)
+    second_state = mock_trainer.store.training_state
+
+    # The store holds a single training state that is replaced every step.
+    assert second_state is not first_state
+    assert mock_trainer.store.base_key is second_state.random_key
+
+    # The tracked parameter dicts keep their identity but point at the
+    # buffers of the latest training state once synced.
+    mock_trainer.store.sync_training_state_fn()
+    assert mock_trainer.store.networks["network_agent_0"].policy_params is policy_params
+    num_expected_update_steps = 2 * mock_trainer.store.global_config.num_epochs
+    for i, net_key in enumerate(mock_trainer.store.networks):
+        assert (
+            mock_trainer.store.networks[net_key].policy_params["key"]
+            is second_state.policy_params[net_key]["key"]
+        )
+        assert jnp.array_equal(
+            mock_trainer.store.networks[net_key].critic_params["key"],
+            jnp.full((3,), i + num_expected_update_steps),
+        )
+        assert (
+            mock_trainer.store.policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+            == i + num_expected_update_steps
+        )
+
+
+def test_step_syncs_tracked_params_lazily(mock_trainer: Trainer) -> None:
+    """Test that the tracked params are only synced when they are read"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+    MAPGWithTrustRegionStep().on_training_step_fn(trainer=mock_trainer)
+    parameter_client = mock_trainer.store.trainer_parameter_client
+    assert parameter_client.sync_fn is mock_trainer.store.sync_training_state_fn
+
+    policy_params = mock_trainer.store.networks["network_agent_0"].policy_params
+    old_params = policy_params["key"]
+    for _ in range(2):
+        mock_trainer.store.step_fn(sample)
+
+    # The steps only update the training state.
+    assert not mock_trainer.store.training_state_synced
+    assert policy_params["key"] is old_params
+
+    parameter_client.sync_fn()
+    assert mock_trainer.store.training_state_synced
+    training_state = mock_trainer.store.training_state
+    assert (
+        policy_params["key"] is training_state.policy_params["network_agent_0"]["key"]
+    )
+    assert (
+        mock_trainer.store.norm_params[constants.VALUES_NORM_STATE_DICT_KEY]["agent_0"][
+            "mean"
+        ]
+        is training_state.target_value_stats["agent_0"]["mean"]
+    )
+
+
+def test_step_data_parallel(mock_trainer: Trainer) -> None:
+    """Test that the data parallel step matches the single device step"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+    # Double the batch so that it can be split across two devices.
+    sample = jax.tree_util.tree_map(lambda x: jnp.concatenate([x, x]), sample)
+    batch_size = sample.data.rewards["agent_0"].shape[0]
+    num_devices = jax.local_device_count()
+    if batch_size % num_devices != 0 or batch_size // num_devices < 2:
+        pytest.skip("The local devices can not split the sample batch.")
+
+    reference_trainer = MockTrainer()
+    for trainer in [reference_trainer, mock_trainer]:
+        for network in trainer.store.networks.values():
+            # Each device only sees its shard of the batch.
+            network.critic_network = SimpleNamespace(
+                apply=lambda params, observations: jnp.full(observations.shape[:1], 0.3)
+            )
+    reference_step = MAPGWithTrustRegionStep()
+    reference_step.on_training_step_fn(trainer=reference_trainer)
+
+    data_parallel_step = MAPGWithTrustRegionStep(
+        config=MAPGWithTrustRegionStepConfig(data_parallel=True)
+    )
+    data_parallel_step.on_training_step_fn(trainer=mock_trainer)
+    assert mock_trainer.store.data_parallel
+
+    for _ in range(2):
+        reference_metrics = reference_trainer.store.step_fn(sample)
+        metrics = mock_trainer.store.step_fn(sample)
+    reference_trainer.store.sync_training_state_fn()
+    mock_trainer.store.sync_training_state_fn()
+
+    # The parameter client sees a single, unreplicated copy of the parameters.
+    for net_key in mock_trainer.store.networks:
+        for params_name in ["policy_params", "critic_params"]:
+            params = getattr(mock_trainer.store.networks[net_key], params_name)
+            reference_params = getattr(
+                reference_trainer.store.networks[net_key], params_name
+            )
+            assert params["key"].shape == reference_params["key"].shape
+            assert jnp.allclose(params["key"], reference_params["key"])
+
+    assert jnp.array_equal(
+        mock_trainer.store.base_key, reference_trainer.store.base_key
+    )
+    assert sorted(metrics.keys()) == sorted(reference_metrics.keys())
+    assert jnp.isclose(
+        metrics["norm_policy_params"], reference_metrics["norm_policy_params"]
+    )
+
+
+def test_step_multiple_sgd_steps_per_dispatch(mock_trainer: Trainer) -> None:
+    """Test that a fused dispatch matches consecutive single steps"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+
+    reference_trainer = MockTrainer()
+    reference_step = MAPGWithTrustRegionStep()
+    reference_step.on_training_step_fn(trainer=reference_trainer)
+
+    fused_step = MAPGWithTrustRegionStep(
+        config=MAPGWithTrustRegionStepConfig(num_sgd_steps_per_dispatch=2)
+    )
+    fused_step.on_training_step_fn(trainer=mock_trainer)
+    assert mock_trainer.store.num_sgd_steps_per_dispatch == 2
+
+    for _ in range(2):
+        reference_metrics = reference_trainer.store.step_fn(sample)
+    stacked_sample = jax.tree_util.tree_map(lambda x: jnp.stack([x, x]), sample)
+    metrics = mock_trainer.store.step_fn(stacked_sample)
+    reference_trainer.store.sync_training_state_fn()
+    mock_trainer.store.sync_training_state_fn()
+
+    for net_key in mock_trainer.store.networks:
+        for params_name in ["policy_params", "critic_params"]:
+            params = getattr(mock_trainer.store.networks[net_key], params_name)
+            reference_params = getattr(
+                reference_trainer.store.networks[net_key], params_name
+            )
+            assert jnp.allclose(params["key"], reference_params["key"])
+        assert (
+            mock_trainer.store.policy_opt_states[net_key][constants.OPT_STATE_DICT_KEY]
+            == reference_trainer.store.policy_opt_states[net_key][
+                constants.OPT_STATE_DICT_KEY
+            ]
+        )
+
+    # The metrics are averaged over the fused steps.
+    assert sorted(metrics.keys()) == sorted(reference_metrics.keys())
+    assert jnp.shape(metrics["norm_policy_params"]) == ()
+
+
+def test_warmup_step_fn(mock_trainer: Trainer) -> None:
+    """Test that the warmup compiles the step without updating the store"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+    mapg_with_trust_region_step = MAPGWithTrustRegionStep()
+    mapg_with_trust_region_step.on_training_step_fn(trainer=mock_trainer)
+
+    old_key = mock_trainer.store.base_key
+    old_policy_params = copy.deepcopy(
+        mock_trainer.store.networks["network_agent_0"].policy_params
+    )
+
+    compile_time = mock_trainer.store.warmup_step_fn(sample)
+
+    assert compile_time > 0
+    assert mock_trainer.store.training_state is None
+    assert jnp.array_equal(mock_trainer.store.base_key, old_key)
+    assert jnp.array_equal(
+        mock_trainer.store.networks["network_agent_0"].policy_params["key"],
+        old_policy_params["key"],
+    )
+
+
+def test_step_without_batch_statistics(mock_trainer: Trainer) -> None:
+    """Test that the whole batch statistics are not computed by default"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+    mapg_with_trust_region_step = MAPGWithTrustRegionStep()
+    mapg_with_trust_region_step.on_training_step_fn(trainer=mock_trainer)
+
+    metrics = mock_trainer.store.step_fn(sample)
+
+    assert sorted(list(metrics.keys())) == [
+        "norm_critic_params",
+        "norm_policy_params",
+    ]
+
+
+def test_step_kl_early_stopping(mock_trainer: Trainer) -> None:
+    """Test that the epochs stop once the approximate KL exceeds the target"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+    mock_trainer.store.global_config.num_epochs = 5
+    mock_trainer.store.target_kl = 1.5
+
+    def epoch_update_with_kl(carry: Tuple, unused_t: Tuple[()]) -> Tuple:
+        """Mock epoch update with a KL that grows by one every epoch."""
+        results = jax.tree_util.tree_map(lambda x: x + 1, carry)
+        kl = carry[1]["network_agent_0"]["key"][0]
+        return results, {
+            agent: {"approx_kl": kl} for agent in mock_trainer.store.agents
+        }
+
+    mock_trainer.store.epoch_update_fn = epoch_update_with_kl
+    MAPGWithTrustRegionStep().on_training_step_fn(trainer=mock_trainer)
+
+    metrics = mock_trainer.store.step_fn(sample)
+    mock_trainer.store.sync_training_state_fn()
+
+    # The KL of the third epoch is above the target.
+    assert metrics["num_epochs_run"] == 3
+    assert metrics["agent_0"]["approx_kl"] == 1.0
+    assert list(
+        mock_trainer.store.networks["network_agent_0"].policy_params["key"]
+    ) == [3.0, 3.0, 3.0]
+
+
+def test_step_gae_over_stacked_agents(mock_trainer: Trainer) -> None:
+    """Test that the stacked agents GAE matches the per agent GAE"""
+    sample = copy.deepcopy(dummy_sample)
+    sample.data.extras.pop("policy_states", None)
+
+    reference_trainer = MockTrainer()
+    GAE().on_training_utility_fns(trainer=reference_trainer)
+    GAE(config=GAEConfig(use_associative_scan=True)).on_training_utility_fns(
+        trainer=mock_trainer
+    )
+    assert mock_trainer.store.gae_over_stacked_agents
+
+    def epoch_update_with_advantages(carry: Tuple, unused_t: Tuple[()]) -> Tuple:
+        """Mock epoch update that reports the advantages as metrics."""
+        results = jax.tree_util.tree_map(lambda x: x + 1, carry)
+        trajectories = carry[-1]
+        return results, {
+            "advantages": trajectories.advantages,
+            "target_values": trajectories.target_values,
+        }
+
+    for trainer in [reference_trainer, mock_trainer]:
+        trainer.store.epoch_update_fn = epoch_update_with_advantages
+        MAPGWithTrustRegionStep().on_training_step_fn(trainer=trainer)
+
+    reference_metrics = reference_trainer.store.step_fn(sample)
+    metrics = mock_trainer.store.step_fn(sample)
+
+    for metric in ["advantages", "target_values"]:
+        for agent in mock_trainer.store.agents:
+            assert jnp.isclose(
+                metrics[metric][agent], reference_metrics[metric][agent], atol=1e-6
+            )
@@ -141,6 +141,22 @@ def test_update_store(
     assert test_executor.store._wait
 
 
+def test_get_stats(
+    test_executor: Executor,
+) -> None:
+    """Test that the stats recorded in the store are returned"""
+    assert test_executor.get_stats() == {}
+
+    test_executor.store.quantised_policy_kl = 0.01
+    assert test_executor.get_stats() == {"quantised_policy_kl": 0.01}
+
+    test_executor.store.select_actions_compile_time = 2.5
+    assert test_executor.get_stats() == {
+        "select_actions_compile_time": 2.5,
+        "quantised_policy_kl": 0.01,
+    }
+
+
 def test_init_hook_order(test_executor: MockExecutor) -> None:
     """Test if init hooks are called in the correct order"""
     assert test_executor.hook_list == [
@@ -0,0 +1,146 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for inference server class for Jax-based Mava systems"""
+
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+from mava.systems.inference_server import InferenceRequest, InferenceServer
+from mava.types import OLT
+
+
+class MockNetwork:
+    """Mock network whose actions are the sum of the observations"""
+
+    def __init__(self, scale: float) -> None:
+        """Initialise the mock network"""
+        self.policy_params = {"linear": {"w": jnp.array(scale)}}
+        self.batch_sizes: List[int] = []
+
+    def get_params(self) -> Dict[str, Any]:
+        """Return the network params"""
+        return {"policy_network": self.policy_params}
+
+    def get_action(
+        self,
+        observations: jnp.ndarray,
+        params: Dict[str, Any],
+        base_key: jnp.ndarray,
+        mask: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, Dict[str, jnp.ndarray]]:
+        """Record the batch size and select the actions"""
+        self.batch_sizes.append(observations.shape[0])
+        actions = params["policy_network"]["linear"]["w"] * observations.sum(-1)
+        return actions, {"log_prob": jnp.zeros(observations.shape[0])}
+
+
+def make_observations(value: float, agents: List[str]) -> Dict[str, OLT]:
+    """Observations of an executor filled with a value"""
+    return {
+        agent: OLT(
+            observation=np.full(2, value, dtype=np.float32),
+            legal_actions=np.ones(3, dtype=np.float32),
+            terminal=np.zeros(1, dtype=np.float32),
+        )
+        for agent in agents
+    }
+
+
+@pytest.fixture
+def inference_server() -> InferenceServer:
+    """Inference server with two networks and no parameter server"""
+    store = SimpleNamespace(
+        global_config=SimpleNamespace(
+            inference_server_max_batch_size=8,
+            inference_server_batch_timeout=0.05,
+            inference_server_parameter_update_period=1,
+            multi_process=False,
+        ),
+        networks={"network_0": MockNetwork(1.0), "network_1": MockNetwork(10.0)},
+        base_key=jax.random.PRNGKey(0),
+    )
+    return InferenceServer(store=store)
+
+
+def test_select_actions_batch(inference_server: InferenceServer) -> None:
+    """Test that requests are batched per network and split back per agent"""
+    agent_net_keys = {"agent_0": "network_0", "agent_1": "network_1"}
+    requests = [
+        InferenceRequest(
+            make_observations(1.0, ["agent_0", "agent_1"]), agent_net_keys
+        ),
+        InferenceRequest(make_observations(2.0, ["agent_0"]), agent_net_keys),
+    ]
+
+    results = inference_server.select_actions_batch(requests)
+
+    actions_info, policies_info = results[0]
+    assert actions_info["agent_0"].tolist() == [2.0]
+    assert actions_info["agent_1"].tolist() == [20.0]
+    assert policies_info["agent_0"]["log_prob"].shape == (1,)
+    actions_info, _ = results[1]
+    assert list(actions_info.keys()) == ["agent_0"]
+    assert actions_info["agent_0"].tolist() == [4.0]
+
+    # The batches are padded to powers of two.
+    networks = inference_server.store.networks
+    assert networks["network_0"].batch_sizes == [2]
+    assert networks["network_1"].batch_sizes == [1]
+
+
+def test_select_actions_padded_batch(inference_server: InferenceServer) -> None:
+    """Test that batches of different sizes reuse the padded compilations"""
+    agent_net_keys = {"agent_0": "network_0"}
+    for num_requests in [3, 4]:
+        requests = [
+            InferenceRequest(make_observations(i, ["agent_0"]), agent_net_keys)
+            for i in range(num_requests)
+        ]
+        results = inference_server.select_actions_batch(requests)
+        assert [r[0]["agent_0"].tolist() for r in results] == [
+            [2.0 * i] for i in range(num_requests)
+        ]
+
+    # The traced batch size is 4 for both calls.
+    assert inference_server.store.networks["network_0"].batch_sizes == [4]
+
+
+def test_select_actions_concurrent(inference_server: InferenceServer) -> None:
+    """Test that concurrent executors receive their own actions"""
+    agent_net_keys = {"agent_0": "network_0", "agent_1": "network_0"}
+    results: Dict[int, Any] = {}
+
+    def executor(executor_id: int) -> None:
+        """Select the actions of one executor"""
+        results[executor_id] = inference_server.select_actions(
+            make_observations(executor_id, ["agent_0", "agent_1"]), agent_net_keys
+        )
+
+    threads = [threading.Thread(target=executor, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for executor_id, (actions_info, _) in results.items():
+        assert actions_info["agent_0"].tolist() == [2.0 * executor_id]
+        assert actions_info["agent_1"].tolist() == [2.0 * executor_id]
@@ -63,6 +63,7 @@ def test_initiator_non_multi_process() -> None:
     assert launcher._node_dict == {
         "data_server": None,
         "parameter_server": None,
+        "inference_server": None,
         "executor": None,
         "evaluator": None,
         "trainer": None,
@@ -223,6 +223,24 @@ def test_set_and_wait(parameter_client: ParameterClient) -> None:
     }
 
 
+def test_set_and_wait_with_sync_fn(parameter_client: ParameterClient) -> None:
+    """Test that the sync function updates the set parameters before they are sent"""
+
+    def sync_fn() -> None:
+        """Increment the set parameters, as their owner would sync them"""
+        increment_set_parameters(
+            params=parameter_client._parameters, names=parameter_client._set_keys
+        )
+
+    parameter_client.register_sync_fn(sync_fn)
+    parameter_client.set_and_wait()
+
+    assert parameter_client._server.store._set_params == {
+        "key_0": np.array(1, dtype=np.int32),
+        "key_2": np.array(3, dtype=np.int32),
+    }
+
+
 def test_get_async(parameter_client: ParameterClient) -> None:
     """Test get async method"""
 
@@ -368,20 +386,43 @@ def test__copy_not_implemented_error(parameter_client: ParameterClient) -> None:
         )
 
 
-def test__copy_device_not_implemented_error(parameter_client: ParameterClient) -> None:
-    """Test that NotImplementedError is raised when a new parameter of the wrong \
-        type is passed in."""
-
-    parameter_client._devices = {"device_1": "dummy_device"}
+def test_copy_nested_dict_with_device(parameter_client: ParameterClient) -> None:
+    """Test that nested parameters are set on a device when a device \
+        is given."""
+    local_devices = jax.local_devices()
+    parameter_client._devices = {"policy_network-network_key_0": local_devices[0]}
 
-    with pytest.raises(NotImplementedError):
-        parameter_client._copy(
-            new_parameters={
-                "policy_network-network_key_0": {
-                    "layer_0": {"weights": "new_weights", "biases": "new_biases"}
-                }
+    parameter_client._copy(
+        new_parameters={
+            "policy_network-network_key_0": {
+                "layer_0": {"weights": np.array([1.0]), "biases": np.array([2.0])}
             },
-        )
+            "critic_network-network_key_1": {
+                "layer_0": {"weights": np.array([3.0]), "biases": np.array([4.0])}
+            },
+        },
+    )
+
+    policy_params = parameter_client._parameters["policy_network-network_key_0"]
+    assert isinstance(policy_params["layer_0"]["weights"], jax.numpy.ndarray)
+    assert policy_params["layer_0"]["weights"].device() == local_devices[0]
+    assert policy_params["layer_0"]["biases"] == jax.numpy.array([2.0])
+
+    # Parameters without a device are copied as they are.
+    critic_params = parameter_client._parameters["critic_network-network_key_1"]
+    assert isinstance(critic_params["layer_0"]["weights"], np.ndarray)
+
+
+def test_update_count(parameter_client: ParameterClient) -> None:
+    """Test that the update count tracks the copies of new parameters"""
+    assert parameter_client.update_count == 0
+
+    parameter_client.get_and_wait()
+    parameter_client.set_and_wait()
+    assert parameter_client.update_count == 1
+
+    parameter_client._copy(new_parameters={"key_2": np.array(20, dtype=np.int32)})
+    assert parameter_client.update_count == 2
 
 
 def test_copy_array_with_device(parameter_client: ParameterClient) -> None:
@@ -397,25 +438,27 @@ def test_copy_array_with_device(parameter_client: ParameterClient) -> None:
 
 
 def test_copy_tuple_with_device(parameter_client: ParameterClient) -> None:
-    """Test that new parameters are set on a device when a device \
-        is given."""
+    """Test that each new parameter of a tuple is set on the device of its key."""
     parameter_client._parameters.update({"tuple_key_0": [1, 2]})
     local_devices = jax.local_devices()
-    parameter_client._devices = {
-        "tuple_key_0": (local_devices[0], local_devices[0])  # type: ignore
-    }
+    parameter_client._devices = {"tuple_key_0": local_devices[0]}
 
     parameter_client._copy(
         new_parameters={"tuple_key_0": (np.array([11]), np.array([22]))}
     )
 
-    assert (
-        type(parameter_client._parameters["tuple_key_0"][0]).__name__ == "DeviceArray"
-    )
-    assert (
-        type(parameter_client._parameters["tuple_key_0"][1]).__name__ == "DeviceArray"
-    )
-    assert parameter_client._parameters["tuple_key_0"] == [
-        jax.numpy.array([11]),
-        jax.numpy.array([22]),
-    ]
+    tuple_params = parameter_client._parameters["tuple_key_0"]
+    assert all(param.device() == local_devices[0] for param in tuple_params)
+    assert tuple_params == [jax.numpy.array([11]), jax.numpy.array([22])]
+
+
+def test_copy_tuple_without_device(parameter_client: ParameterClient) -> None:
+    """Test that new parameters of a tuple are copied as they are without a \
+        device."""
+    parameter_client._parameters.update({"tuple_key_0": [1, 2]})
+    new_params = (np.array([11]), np.array([22]))
+
+    parameter_client._copy(new_parameters={"tuple_key_0": new_params})
+
+    assert parameter_client._parameters["tuple_key_0"][0] is new_params[0]
+    assert parameter_client._parameters["tuple_key_0"][1] is new_params[1]
@@ -0,0 +1,177 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared memory environment pool unit test"""
+
+import functools
+import os
+from typing import Any, Dict, Iterator, List, Tuple
+
+import dm_env
+import numpy as np
+import pytest
+from acme import specs
+
+from mava.environment_pool import SharedMemoryEnvironmentPool
+from mava.types import OLT
+
+AGENTS = ["agent_0", "agent_1"]
+
+
+class MockEnvironment:
+    """Mock environment echoing the actions and process in the observations"""
+
+    def __init__(self, episode_length: int) -> None:
+        """Init mock environment"""
+        self.episode_length = episode_length
+        self.num_steps = 0
+
+    def _observations(self, actions: Dict[str, Any]) -> Dict[str, OLT]:
+        """Observations holding the step, action and process id"""
+        return {
+            agent: OLT(
+                observation=np.array(
+                    [self.num_steps, actions[agent], os.getpid()], dtype=np.float32
+                ),
+                legal_actions=np.ones(2, dtype=np.int32),
+                terminal=np.zeros(1, dtype=np.float32),
+            )
+            for agent in AGENTS
+        }
+
+    def reset(self) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Start a new episode"""
+        self.num_steps = 0
+        observations = self._observations({agent: -1 for agent in AGENTS})
+        return dm_env.restart(observations), {"s_t": np.zeros(3, np.float32)}
+
+    def step(self, actions: Dict[str, Any]) -> Tuple[dm_env.TimeStep, Dict[str, Any]]:
+        """Step the environment, failing on negative actions"""
+        if actions["agent_0"] < 0:
+            raise ValueError("Negative action.")
+        self.num_steps += 1
+        rewards = {agent: np.float32(actions[agent]) for agent in AGENTS}
+        discounts = {agent: np.float32(1.0) for agent in AGENTS}
+        observations = self._observations(actions)
+        if self.num_steps == self.episode_length:
+            timestep = dm_env.termination(rewards, observations)
+            timestep = timestep._replace(
+                discount={agent: np.float32(0.0) for agent in AGENTS}
+            )
+        else:
+            timestep = dm_env.transition(rewards, observations, discounts)
+        return timestep, {"s_t": np.full(3, self.num_steps, np.float32)}
+
+    @property
+    def death_masked_agents(self) -> List[str]:
+        """agent_1 is death masked once the episode has started"""
+        return ["agent_1"] if self.num_steps > 0 else []
+
+    def action_spec(self) -> Dict[str, specs.DiscreteArray]:
+        """Action spec of every agent"""
+        return {agent: specs.DiscreteArray(2, dtype=np.int32) for agent in AGENTS}
+
+    def reward_spec(self) -> Dict[str, specs.Array]:
+        """Reward spec of every agent"""
+        return {agent: specs.Array((), np.float32) for agent in AGENTS}
+
+    def discount_spec(self) -> Dict[str, specs.BoundedArray]:
+        """Discount spec of every agent"""
+        return {
+            agent: specs.BoundedArray((), np.float32, minimum=0.0, maximum=1.0)
+            for agent in AGENTS
+        }
+
+
+def make_environment(episode_length: int) -> Tuple[MockEnvironment, str]:
+    """Environment factory returning the environment and its name"""
+    return MockEnvironment(episode_length), "mock"
+
+
+@pytest.fixture
+def pool() -> Iterator[SharedMemoryEnvironmentPool]:
+    """Pool of two environments"""
+    pool = SharedMemoryEnvironmentPool(
+        functools.partial(make_environment, episode_length=2), num_envs=2
+    )
+    yield pool
+    pool.close()
+
+
+def test_pool_steps_environments_in_workers(pool: SharedMemoryEnvironmentPool) -> None:
+    """Test that the environments are stepped in their own processes.
+
+    Args:
+        pool: SharedMemoryEnvironmentPool
+    """
+    assert len(pool) == len(pool.environments) == 2
+    assert pool.environments[0].reward_spec() == pool.environment.reward_spec()
+
+    first_timesteps = [pool.reset(env_index) for env_index in range(2)]
+    for timestep, extras in first_timesteps:
+        assert timestep.first()
+        assert timestep.reward is None and timestep.discount is None
+        assert np.array_equal(extras["s_t"], np.zeros(3))
+    assert pool.environments[0].death_masked_agents == []
+
+    actions = [{agent: np.int32(env_index) for agent in AGENTS} for env_index in [0, 1]]
+    timesteps = pool.step(actions)
+
+    pids = set()
+    for env_index, (timestep, extras) in enumerate(timesteps):
+        assert timestep.mid()
+        observation = timestep.observation["agent_1"].observation
+        assert observation.dtype == np.float32
+        assert observation[:2].tolist() == [1, env_index]
+        assert timestep.observation["agent_1"].legal_actions.dtype == np.int32
+        assert timestep.reward["agent_0"] == np.float32(env_index)
+        assert timestep.discount["agent_0"] == np.float32(1.0)
+        assert np.array_equal(extras["s_t"], np.ones(3))
+        pids.add(int(observation[2]))
+    assert len(pids) == 2 and os.getpid() not in pids
+    # The death masks are those of the environments in the workers.
+    assert pool.environments[0].death_masked_agents == ["agent_1"]
+    assert pool.environment.death_masked_agents == []
+
+    # The timesteps are copies that are not overwritten by the next step.
+    timesteps_copy = [
+        timestep.observation["agent_0"].observation.copy() for timestep, _ in timesteps
+    ]
+    last_timesteps = pool.step(actions)
+    for (timestep, _), observation in zip(timesteps, timesteps_copy):
+        assert np.array_equal(timestep.observation["agent_0"].observation, observation)
+    for timestep, _ in last_timesteps:
+        assert timestep.last()
+        assert timestep.discount["agent_1"] == np.float32(0.0)
+
+    # A single environment can be stepped through its handle.
+    pool.environments[1].reset()
+    timestep, _ = pool.environments[1].step({agent: np.int32(1) for agent in AGENTS})
+    assert timestep.observation["agent_0"].observation[:2].tolist() == [1, 1]
+
+
+def test_pool_raises_environment_errors(pool: SharedMemoryEnvironmentPool) -> None:
+    """Test that the errors of the environments are raised by the pool.
+
+    Args:
+        pool: SharedMemoryEnvironmentPool
+    """
+    pool.reset(0)
+    with pytest.raises(RuntimeError, match="Negative action"):
+        pool.environments[0].step({agent: np.int32(-1) for agent in AGENTS})
+
+    # The worker keeps running after the error.
+    timestep, _ = pool.environments[0].step({agent: np.int32(1) for agent in AGENTS})
+    assert timestep.mid()
@@ -0,0 +1,597 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorised environment loop unit test"""
+
+import functools
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import dm_env
+import jax.numpy as jnp
+import numpy as np
+import pytest
+from acme import specs
+
+from mava.environment_loop import (
+    ParallelEnvironmentLoop,
+    PipelinedEnvironmentLoop,
+    SharedMemoryEnvironmentLoop,
+    VectorisedEnvironmentLoop,
+)
+from mava.environment_pool import SharedMemoryEnvironmentPool
+from mava.types import OLT
+from mava.utils.loggers import Logger
+from mava.wrappers import DetailedPerAgentStatistics
+from mava.wrappers.environment_loop_wrappers import EnvironmentLoopStatisticsBase
+
+AGENTS = ["agent_0", "agent_1"]
+
+
+class MockEnvironment:
+    """Mock environment with a fixed episode length"""
+
+    possible_agents = AGENTS
+
+    def __init__(self, env_id: int, episode_length: int) -> None:
+        """Init mock environment"""
+        self.env_id = env_id
+        self.episode_length = episode_length
+        self.num_steps = 0
+        self.actions: List[Dict[str, Any]] = []
+
+    def _observations(self) -> Dict[str, OLT]:
+        """Observations that hold the environment id and step"""
+        return {
+            agent: OLT(
+                observation=np.array([self.env_id, self.num_steps], dtype=np.float32),
+                legal_actions=np.ones(2, dtype=np.int32),
+                terminal=np.zeros(1, dtype=np.float32),
+            )
+            for agent in AGENTS
+        }
+
+    def reset(self) -> dm_env.TimeStep:
+        """Start a new episode"""
+        self.num_steps = 0
+        return dm_env.restart(self._observations())
+
+    def step(self, actions: Dict[str, Any]) -> dm_env.TimeStep:
+        """Step the environment"""
+        self.actions.append(actions)
+        self.num_steps += 1
+        rewards = {agent: np.float32(1.0) for agent in AGENTS}
+        if self.num_steps == self.episode_length:
+            return dm_env.termination(rewards, self._observations())
+        return dm_env.transition(rewards, self._observations())
+
+    def reward_spec(self) -> Dict[str, specs.Array]:
+        """Reward spec of every agent"""
+        return {agent: specs.Array((), np.float32) for agent in AGENTS}
+
+    def discount_spec(self) -> specs.BoundedArray:
+        """Discount spec shared by the agents"""
+        return specs.BoundedArray((), np.float64, minimum=0.0, maximum=1.0)
+
+    def action_spec(self) -> Dict[str, specs.DiscreteArray]:
+        """Action spec of every agent"""
+        return {agent: specs.DiscreteArray(2, dtype=np.int32) for agent in AGENTS}
+
+
+class MockAdder:
+    """Mock adder recording the steps of a single environment"""
+
+    def __init__(self) -> None:
+        """Init mock adder"""
+        self.steps: List[Tuple[str, Any]] = []
+
+    def add_first(self, timestep: dm_env.TimeStep, extras: Dict) -> None:
+        """Record the first step of an episode"""
+        self.steps.append(("first", timestep.observation["agent_0"].observation))
+
+    def add(self, actions: Dict, timestep: dm_env.TimeStep, extras: Dict) -> None:
+        """Record a step"""
+        self.steps.append(("step", timestep.observation["agent_0"].observation))
+
+
+class MockExecutor:
+    """Mock executor that selects the actions of all environments at once"""
+
+    def __init__(self) -> None:
+        """Init mock executor"""
+        self.store = SimpleNamespace(agent_net_keys={"agent_0": "network"})
+        self.num_select_actions = 0
+        self.num_updates = 0
+
+    def observe_first(self, timestep: dm_env.TimeStep, extras: Dict = {}) -> None:
+        """Give the first step to the adder of the environment"""
+        self.store.adder.add_first(timestep, extras)
+
+    def observe(
+        self, actions: Any, next_timestep: dm_env.TimeStep, next_extras: Dict = {}
+    ) -> None:
+        """Give the step to the adder of the environment"""
+        self.store.adder.add(self.store.actions_info, next_timestep, next_extras)
+
+    def select_actions(self, observations: Dict[str, OLT]) -> Tuple[Dict, Dict]:
+        """Use the environment id of the stacked observations as action"""
+        self.num_select_actions += 1
+        actions_info = {
+            agent: observation.observation[:, 0].astype(np.int32)
+            for agent, observation in observations.items()
+        }
+        policies_info = {
+            agent: np.zeros(len(observation.observation), dtype=np.float32)
+            for agent, observation in observations.items()
+        }
+        return actions_info, policies_info
+
+    def update(self) -> None:
+        """Count the executor updates"""
+        self.num_updates += 1
+
+
+@pytest.fixture
+def environments() -> List[MockEnvironment]:
+    """Environments with different episode lengths"""
+    return [MockEnvironment(0, episode_length=3), MockEnvironment(1, episode_length=2)]
+
+
+def test_run_episode(environments: List[MockEnvironment]) -> None:
+    """Test that environments are stepped together and reset on their own"""
+    executor = MockExecutor()
+    adders = [MockAdder(), MockAdder()]
+    env_loop = VectorisedEnvironmentLoop(
+        environments=environments,  # type: ignore
+        executor=executor,  # type: ignore
+        adders=adders,
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    # The shorter environment ends its episode first.
+    result = env_loop.run_episode()
+    assert result["episode_length"] == 2
+    assert result["mean_episode_return"] == 2.0
+    assert executor.num_select_actions == 2
+    assert executor.num_updates == 2
+
+    # The longer environment carries on with its episode.
+    result = env_loop.run_episode()
+    assert result["episode_length"] == 3
+    assert executor.num_select_actions == 3
+
+    # Each environment received its own actions.
+    assert all(actions["agent_0"] == 0 for actions in environments[0].actions)
+    assert all(actions["agent_0"] == 1 for actions in environments[1].actions)
+
+    # Each adder received the trajectories of its environment, with the first
+    # step of the new episodes after a reset.
+    assert all(observation[0] == 0 for _, observation in adders[0].steps)
+    assert all(observation[0] == 1 for _, observation in adders[1].steps)
+    assert [kind for kind, _ in adders[1].steps] == [
+        "first",
+        "step",
+        "step",
+        "first",
+        "step",
+    ]
+    assert [kind for kind, _ in adders[0].steps] == [
+        "first",
+        "step",
+        "step",
+        "step",
+        "first",
+    ]
+
+
+def test_run_episode_keeps_env_state(environments: List[MockEnvironment]) -> None:
+    """Test that the executor state of each environment is kept separately"""
+    executor = MockExecutor()
+    env_loop = VectorisedEnvironmentLoop(
+        environments=environments,  # type: ignore
+        executor=executor,  # type: ignore
+        adders=[MockAdder(), MockAdder()],
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    env_loop.run_episode()
+    executor.store.agent_net_keys = {"agent_0": "other_network"}
+    env_loop._save_env_state(1)
+
+    env_loop._load_env_state(0)
+    assert executor.store.agent_net_keys == {"agent_0": "network"}
+    env_loop._load_env_state(1)
+    assert executor.store.agent_net_keys == {"agent_0": "other_network"}
+
+
+def test_run_episode_death_masks(environments: List[MockEnvironment]) -> None:
+    """Test that the executor gets the death masked agents of each environment"""
+    executor = MockExecutor()
+    environments[1].death_masked_agents = ["agent_0"]  # type: ignore
+    env_loop = VectorisedEnvironmentLoop(
+        environments=environments,  # type: ignore
+        executor=executor,  # type: ignore
+        adders=[MockAdder(), MockAdder()],
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    env_loop.run_episode()
+    assert executor.store.env_death_masked_agents == [[], ["agent_0"]]
+
+
+class MockStatsExecutor(MockExecutor):
+    """Mock executor that records stats and keeps the episode counts"""
+
+    def __init__(self, stats: Dict[str, float]) -> None:
+        """Init mock stats executor"""
+        super().__init__()
+        self.stats = stats
+        self.store.executor_counts = {}
+        self.store.executor_parameter_client = SimpleNamespace(
+            add_async=lambda counts: None
+        )
+
+    def observe_first(self, timestep: dm_env.TimeStep, extras: Dict = {}) -> None:
+        """Ignore the first step"""
+
+    def observe(
+        self, actions: Any, next_timestep: dm_env.TimeStep, next_extras: Dict = {}
+    ) -> None:
+        """Ignore the step"""
+
+    def select_actions(self, observations: Dict[str, OLT]) -> Tuple[Dict, Dict]:
+        """Use the environment id of the observations as action"""
+        self.num_select_actions += 1
+        actions_info = {
+            agent: observation.observation[..., 0].astype(np.int32)
+            for agent, observation in observations.items()
+        }
+        return actions_info, {}
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return the recorded stats"""
+        return self.stats
+
+
+def make_stats_env_loop(
+    env_loop: ParallelEnvironmentLoop, tmp_path: Path
+) -> DetailedPerAgentStatistics:
+    """Wrap an environment loop with the default stats wrapper"""
+    env_loop._logger = Logger(
+        label="executor_0",
+        directory=str(tmp_path),
+        to_terminal=False,
+        time_stamp="stats",
+    )
+    return DetailedPerAgentStatistics(env_loop)
+
+
+def test_run_episode_executor_stats(
+    environments: List[MockEnvironment], tmp_path: Path
+) -> None:
+    """Test that the executor stats are logged with the default stats wrapper"""
+    executor = MockStatsExecutor({"select_actions_compile_time": 1.5})
+    env_loop = make_stats_env_loop(
+        VectorisedEnvironmentLoop(
+            environments=environments,  # type: ignore
+            executor=executor,  # type: ignore
+            adders=[MockAdder(), MockAdder()],
+        ),
+        tmp_path,
+    )
+
+    result = env_loop.run_episode()
+    assert result["episode_length"] == 2
+    assert result["select_actions_compile_time"] == 1.5
+
+
+def test_parallel_run_episode_executor_stats(tmp_path: Path) -> None:
+    """Test that the parallel loop logs the executor stats with the stats wrapper"""
+    executor = MockStatsExecutor({"select_actions_compile_time": 1.5})
+    env_loop = make_stats_env_loop(
+        ParallelEnvironmentLoop(
+            environment=MockEnvironment(0, episode_length=3),  # type: ignore
+            executor=executor,  # type: ignore
+        ),
+        tmp_path,
+    )
+
+    result = env_loop.run_episode()
+    assert result["episode_length"] == 3
+    assert result["select_actions_compile_time"] == 1.5
+
+
+def test_run_episode_quantised_policy_kl(
+    environments: List[MockEnvironment], tmp_path: Path
+) -> None:
+    """Test that the latest quantised policy KL is in the episode results"""
+    executor = MockStatsExecutor({"quantised_policy_kl": 0.0})
+    env_loop = make_stats_env_loop(
+        VectorisedEnvironmentLoop(
+            environments=environments,  # type: ignore
+            executor=executor,  # type: ignore
+            adders=[MockAdder(), MockAdder()],
+        ),
+        tmp_path,
+    )
+
+    # The executor measures the KL again when it selects actions.
+    select_actions = executor.select_actions
+
+    def select_actions_with_kl(observations: Dict[str, OLT]) -> Tuple[Dict, Dict]:
+        executor.stats["quantised_policy_kl"] = 0.01 * (executor.num_select_actions + 1)
+        return select_actions(observations)
+
+    executor.select_actions = select_actions_with_kl  # type: ignore
+
+    assert env_loop.run_episode()["quantised_policy_kl"] == pytest.approx(0.02)
+    assert env_loop.run_episode()["quantised_policy_kl"] == pytest.approx(0.03)
+
+
+class MockEpisodeStatistics(EnvironmentLoopStatisticsBase):
+    """Mock stats wrapper that only records the episode length"""
+
+    def _compute_step_statistics(self, rewards: Dict[str, float]) -> None:
+        """Ignore the step rewards"""
+
+    def _compute_episode_statistics(
+        self,
+        episode_returns: Dict[str, float],
+        episode_steps: int,
+        start_time: float,
+    ) -> None:
+        """Record the episode length"""
+        self._running_statistics["episode_length"] = episode_steps
+
+
+def test_run_episode_executor_stats_custom_wrapper(
+    environments: List[MockEnvironment],
+) -> None:
+    """Test that the executor stats are logged with any stats wrapper"""
+    executor = MockStatsExecutor({"select_actions_compile_time": 1.5})
+    env_loop = MockEpisodeStatistics(
+        VectorisedEnvironmentLoop(
+            environments=environments,  # type: ignore
+            executor=executor,  # type: ignore
+            adders=[MockAdder(), MockAdder()],
+            logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+        )
+    )
+
+    result = env_loop.run_episode()
+    assert result == {"episode_length": 2, "select_actions_compile_time": 1.5}
+
+
+class MockRecurrentExecutor(MockExecutor):
+    """Mock executor that counts the steps in its policy states"""
+
+    def __init__(self) -> None:
+        """Init mock recurrent executor"""
+        super().__init__()
+        self.observed_policy_states: List[np.ndarray] = []
+
+    def observe_first(self, timestep: dm_env.TimeStep, extras: Dict = {}) -> None:
+        """Reset the policy states of both agents"""
+        self.store.policy_states = jnp.zeros((len(AGENTS), 1))
+        super().observe_first(timestep, extras)
+
+    def observe(
+        self, actions: Any, next_timestep: dm_env.TimeStep, next_extras: Dict = {}
+    ) -> None:
+        """Record the policy states of the environment"""
+        self.observed_policy_states.append(self.store.policy_states)
+        super().observe(actions, next_timestep, next_extras)
+
+    def select_actions(self, observations: Dict[str, OLT]) -> Tuple[Dict, Dict]:
+        """Increment the stacked policy states of every environment"""
+        self.store.policy_states = self.store.policy_states + 1
+        return super().select_actions(observations)
+
+
+def test_run_episode_resets_policy_states(
+    environments: List[MockEnvironment],
+) -> None:
+    """Test that the policy states of an environment are reset on their own"""
+    executor = MockRecurrentExecutor()
+    env_loop = VectorisedEnvironmentLoop(
+        environments=environments,  # type: ignore
+        executor=executor,  # type: ignore
+        adders=[MockAdder(), MockAdder()],
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    # The second environment ends its episode after two steps.
+    env_loop.run_episode()
+    assert env_loop._policy_states.shape == (2, len(AGENTS), 1)
+    assert env_loop._policy_states[:, 0, 0].tolist() == [2.0, 0.0]
+
+    # The states are given to the executor on host for each environment.
+    assert all(
+        isinstance(states, np.ndarray) and states.shape == (len(AGENTS), 1)
+        for states in executor.observed_policy_states
+    )
+
+    env_loop.run_episode()
+    assert env_loop._policy_states[:, 0, 0].tolist() == [0.0, 1.0]
+
+
+def test_shared_memory_run_episode() -> None:
+    """Test that the environments of a pool are stepped by the loop"""
+    pool = SharedMemoryEnvironmentPool(
+        functools.partial(MockEnvironment, 1, episode_length=2), num_envs=2
+    )
+    executor = MockExecutor()
+    adders = [MockAdder(), MockAdder()]
+    env_loop = SharedMemoryEnvironmentLoop(
+        environment_pool=pool,
+        executor=executor,  # type: ignore
+        adders=adders,
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    try:
+        result = env_loop.run_episode()
+    finally:
+        pool.close()
+
+    assert result["episode_length"] == 2
+    assert result["mean_episode_return"] == 2.0
+    assert executor.num_select_actions == 2
+    for adder in adders:
+        assert [kind for kind, _ in adder.steps] == ["first", "step", "step", "first"]
+        assert [observation[1] for _, observation in adder.steps] == [0, 1, 2, 0]
+
+
+def test_shared_memory_close(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the loop closes its pool when it stops
+
+    Args:
+        monkeypatch: pytest fixture making the loop stop with an error.
+    """
+    pool = SharedMemoryEnvironmentPool(
+        functools.partial(MockEnvironment, 1, episode_length=2), num_envs=2
+    )
+    env_loop = SharedMemoryEnvironmentLoop(
+        environment_pool=pool,
+        executor=MockExecutor(),  # type: ignore
+        adders=[MockAdder(), MockAdder()],
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+    workers = list(pool._workers)
+
+    def stop() -> None:
+        """Stop the loop as when its node is interrupted"""
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(VectorisedEnvironmentLoop, "run", lambda _: stop())
+    with pytest.raises(KeyboardInterrupt):
+        env_loop.run()
+
+    assert pool._closed
+    assert not any(worker.is_alive() for worker in workers)
+    # Closing the pool again does nothing.
+    env_loop.close()
+
+
+class ThreadRecordingAdder(MockAdder):
+    """Mock adder recording the threads it writes from"""
+
+    def __init__(self) -> None:
+        """Init thread recording adder"""
+        super().__init__()
+        self.threads: List[str] = []
+
+    def add(self, actions: Dict, timestep: dm_env.TimeStep, extras: Dict) -> None:
+        """Record a step and its thread"""
+        self.threads.append(threading.current_thread().name)
+        super().add(actions, timestep, extras)
+
+
+class GroupRecordingExecutor(MockExecutor):
+    """Mock executor recording the keys and sizes of its action selections"""
+
+    def __init__(self, num_envs: int) -> None:
+        """Init group recording executor"""
+        super().__init__()
+        self.store.base_key = np.arange(num_envs)
+        self.selections: List[Tuple[List[int], int]] = []
+
+    def select_actions(self, observations: Dict[str, OLT]) -> Tuple[Dict, Dict]:
+        """Record the keys and number of environments, and advance the keys"""
+        self.selections.append(
+            (self.store.base_key.tolist(), len(observations["agent_0"].observation))
+        )
+        self.store.base_key = self.store.base_key + 10
+        return super().select_actions(observations)
+
+
+def test_pipelined_run_episode() -> None:
+    """Test that the environment groups are stepped in turn"""
+    pool = SharedMemoryEnvironmentPool(
+        functools.partial(MockEnvironment, 1, episode_length=2), num_envs=4
+    )
+    executor = GroupRecordingExecutor(num_envs=4)
+    adders = [ThreadRecordingAdder() for _ in range(4)]
+    env_loop = PipelinedEnvironmentLoop(
+        environment_pool=pool,
+        executor=executor,  # type: ignore
+        adders=adders,  # type: ignore
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    try:
+        result = env_loop.run_episode()
+        for adder in env_loop._adders:
+            adder.wait()  # type: ignore
+    finally:
+        pool.close()
+
+    assert result["episode_length"] == 2
+    assert executor.num_updates == 2
+
+    # Each group selects its actions with its own keys, and launches its next
+    # step once it has observed the previous one.
+    assert executor.selections == [
+        ([0, 1], 2),
+        ([2, 3], 2),
+        ([10, 11], 2),
+        ([12, 13], 2),
+        ([20, 21], 2),
+        ([22, 23], 2),
+    ]
+
+    # The transitions are written on a background thread.
+    for adder in adders:
+        assert [kind for kind, _ in adder.steps] == ["first", "step", "step", "first"]
+        assert [observation[1] for _, observation in adder.steps] == [0, 1, 2, 0]
+        assert adder.threads and all(
+            thread != threading.current_thread().name for thread in adder.threads
+        )
+
+
+def test_pipelined_run_episode_policy_states() -> None:
+    """Test that the policy states of each group are updated on their own"""
+    pool = SharedMemoryEnvironmentPool(
+        functools.partial(MockEnvironment, 1, episode_length=2), num_envs=4
+    )
+    executor = MockRecurrentExecutor()
+    executor.store.base_key = np.arange(4)
+    env_loop = PipelinedEnvironmentLoop(
+        environment_pool=pool,
+        executor=executor,  # type: ignore
+        adders=[MockAdder() for _ in range(4)],
+        logger=SimpleNamespace(write=lambda _: None),  # type: ignore
+    )
+
+    try:
+        # Launching the groups increments the states of their environments.
+        env_loop._reset(0)
+        env_loop._timesteps = [env_loop._timesteps[0]] * 4
+        env_loop._group_base_keys = [np.arange(2), np.arange(2, 4)]
+        env_loop._launch_group(1)
+        assert env_loop._policy_states[:, 0, 0].tolist() == [0.0, 0.0, 1.0, 1.0]
+        env_loop._launch_group(0)
+        assert env_loop._policy_states[:, 0, 0].tolist() == [1.0, 1.0, 1.0, 1.0]
+        pool.step_wait()
+    finally:
+        pool.close()
+
+    # The states are given to the executor on host for each environment.
+    assert all(
+        states.shape == (2, 2, 1)
+        for _, _, states in env_loop._in_flight  # type: ignore
+    )
@@ -22,6 +22,7 @@ import pytest
 
 from mava.components.building.adders import ParallelTransitionAdderSignature
 from mava.components.building.environments import EnvironmentSpec
+from mava.components.building.optimisers import DefaultOptimisers
 from mava.components.building.system_init import FixedNetworkSystemInit
 from mava.specs import DesignSpec
 from mava.systems import ParameterServer, Trainer
@@ -56,6 +57,19 @@ class MockSystem(System):
         return components, {}
 
 
+class MockSystemWithOptimisers(MockSystem):
+    @staticmethod
+    def design() -> Tuple[DesignSpec, Dict]:
+        """Mock system design with the default optimisers.
+
+        Returns:
+            system callback components
+        """
+        components, _ = MockSystem.design()
+        components.set({"optimisers": DefaultOptimisers})
+        return components, {}
+
+
 @pytest.fixture
 def test_system() -> System:
     """Dummy system with zero components."""
@@ -108,3 +122,18 @@ def test_builder(
     # assert train_logger == 1
     # assert train_dataset == 5
     # assert train_param_client == (2, "param")
+
+
+def test_builder_network_learning_rates() -> None:
+    """Test that a system builds with per network learning rates."""
+    test_system = MockSystemWithOptimisers()
+    test_system.build(
+        environment_factory=mocks.make_fake_environment_factory(),
+        trainer_parameter_update_period=1,
+        policy_network_learning_rates=(("network_agent_1", 1e-2),),
+        critic_network_learning_rates=(("network_agent_0", 1e-3),),
+    )
+
+    store = test_system._builder.store
+    assert list(store.policy_network_optimisers.keys()) == ["network_agent_1"]
+    assert list(store.critic_network_optimisers.keys()) == ["network_agent_0"]
@@ -20,6 +20,7 @@ import pytest
 
 from mava import constants
 from mava.systems import System
+from mava.utils.jax_training_utils import get_agent_norm_params
 from tests.systems.systems_test_data import (
     ippo_system_single_process,
     ippo_system_single_process_norm,
@@ -111,9 +112,9 @@ def test_trainer_single_process_norm(test_system_sp_norm: System) -> None:
 
     # Check normalisation parameters
     for agent in trainer.store.trainer_agent_net_keys.keys():
-        obs_norm_params = trainer.store.norm_params[constants.OBS_NORM_STATE_DICT_KEY][
-            agent
-        ]
+        obs_norm_params = get_agent_norm_params(
+            trainer.store.norm_params[constants.OBS_NORM_STATE_DICT_KEY], agent
+        )
         assert jnp.all(obs_norm_params["mean"] == 0)
         assert jnp.all(obs_norm_params["var"] == 0)
         assert jnp.all(obs_norm_params["std"] == 1)
@@ -144,9 +145,9 @@ def test_trainer_single_process_norm(test_system_sp_norm: System) -> None:
             assert not jnp.all(categorical_value_head["w"] == 0)
 
     for agent in trainer.store.trainer_agent_net_keys.keys():
-        obs_norm_params = trainer.store.norm_params[constants.OBS_NORM_STATE_DICT_KEY][
-            agent
-        ]
+        obs_norm_params = get_agent_norm_params(
+            trainer.store.norm_params[constants.OBS_NORM_STATE_DICT_KEY], agent
+        )
         assert not jnp.all(obs_norm_params["mean"] == 0)
         assert not jnp.all(obs_norm_params["var"] == 0)
         assert not jnp.all(obs_norm_params["std"] == 1)
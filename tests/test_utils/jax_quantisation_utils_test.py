@@ -0,0 +1,90 @@
+# python3
+# Copyright 2021 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the int8 quantisation utils."""
+
+from typing import Any
+
+import haiku as hk
+import jax
+import jax.numpy as jnp
+import pytest
+
+from mava.utils.jax_quantisation_utils import (
+    INT8_MAX,
+    quantise_params,
+    quantise_weights,
+    quantised_apply,
+)
+
+
+@pytest.fixture
+def mlp() -> Any:
+    """Transformed MLP with a layer norm between the linear layers."""
+
+    @hk.without_apply_rng
+    @hk.transform
+    def mlp_fn(inputs: jnp.ndarray) -> jnp.ndarray:
+        """MLP forward pass."""
+        outputs = hk.Linear(32)(inputs)
+        outputs = hk.LayerNorm(-1, create_scale=True, create_offset=True)(outputs)
+        outputs = jax.nn.relu(outputs)
+        return hk.Linear(4, with_bias=False)(outputs)
+
+    return mlp_fn
+
+
+def test_quantise_weights() -> None:
+    """Test that the weights are quantised per output channel."""
+    weights = jnp.array([[1.0, -0.5, 0.0], [-2.0, 0.25, 0.0]])
+
+    int8_weights, scale = quantise_weights(weights)
+
+    assert int8_weights.dtype == jnp.int8
+    # Channels of zeros keep a scale of one.
+    assert jnp.allclose(scale, jnp.array([2.0 / INT8_MAX, 0.5 / INT8_MAX, 1.0]))
+    assert jnp.array_equal(int8_weights[1], jnp.array([-INT8_MAX, 64, 0]))
+    assert jnp.all(jnp.abs(int8_weights * scale - weights) <= scale / 2)
+
+
+def test_quantise_params(mlp: Any) -> None:
+    """Test that only the linear layer weights are quantised."""
+    params = mlp.init(jax.random.PRNGKey(0), jnp.zeros((1, 8)))
+
+    quantised_params = quantise_params(params)
+
+    assert quantised_params["linear"]["w"].dtype == jnp.int8
+    assert quantised_params["linear"]["w_scale"].shape == (32,)
+    assert quantised_params["linear"]["b"].dtype == params["linear"]["b"].dtype
+    assert quantised_params["linear_1"]["w"].dtype == jnp.int8
+    assert "b" not in quantised_params["linear_1"]
+    assert quantised_params["layer_norm"].keys() == params["layer_norm"].keys()
+    assert "w_scale" not in quantised_params["layer_norm"]
+
+
+def test_quantised_apply(mlp: Any) -> None:
+    """Test that the quantised forward pass is close to the fp32 one."""
+    params = mlp.init(jax.random.PRNGKey(0), jnp.zeros((1, 8)))
+    inputs = jax.random.normal(jax.random.PRNGKey(1), (16, 8))
+
+    outputs = mlp.apply(params, inputs)
+    quantised_outputs = jax.jit(quantised_apply(mlp.apply))(
+        quantise_params(params), inputs
+    )
+
+    assert quantised_outputs.shape == outputs.shape
+    assert quantised_outputs.dtype == outputs.dtype
+    assert not jnp.array_equal(quantised_outputs, outputs)
+    assert jnp.allclose(quantised_outputs, outputs, atol=0.05)